@@ -0,0 +1,552 @@
+"""Benchmarks for the MT940 engines
+
+Usage:
+    python bench_mt940.py [statement.sta] [--engines gui conv parser ...]
+    python bench_mt940.py --generate 1000000 --statements 100 --json run.json
+    python bench_mt940.py --generate 100000 --compare run.json
+    python bench_mt940.py [statement.sta] --tokenizer
+
+Each engine runs in a fresh process so its peak RSS is its own, and the
+best of --repeat runs is reported as lines/s and MB/s with per-stage
+timings. The legacy engines are frozen copies of the parsers the GUI and
+conv.py started from, kept as the baseline the other engines are
+measured against. --json saves the results; --compare prints the speedup against a
+previous run.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from types import SimpleNamespace
+
+from mt940_fields import tokenize_balance, tokenize_statement_line
+
+# Number of timed passes over the sample lines
+REPEAT = 5
+
+# Number of timed runs per engine; the fastest is reported
+ENGINE_REPEAT = 3
+
+
+def legacy_extract_currency(line):
+    """Currency lookup as done by MT940Converter before the tokenizer"""
+    match = re.search(r'[DC](\d{6})([A-Z]{3})', line)
+    if match:
+        return match.group(2)
+    return None
+
+
+def legacy_parse_amount(amount_str):
+    """Amount parsing as done by MT940Converter before the tokenizer"""
+    debit = 'D' in amount_str
+    credit = 'C' in amount_str
+    if not (debit or credit):
+        return 0.0
+    amount_match = re.search(r'[DC]N?(\d+,\d*|\d*\.\d*|\d+)', amount_str)
+    if not amount_match:
+        amount_match = re.search(r'NONREF//.*?(\d+,\d*|\d*\.\d*|\d+)', amount_str)
+    if amount_match:
+        amount = float(amount_match.group(1).replace(',', '.'))
+        return -amount if debit else amount
+    return 0.0
+
+
+def legacy_parse_reference(line):
+    """Reference lookup as done by MT940Converter before the tokenizer"""
+    ref = ''
+    if 'NTRFNONREF//' in line:
+        parts = line.split('//')
+        if len(parts) > 1:
+            ref = parts[-1].strip()
+    elif 'NERRNONREF//' in line:
+        parts = line.split('//')
+        if len(parts) > 1:
+            ref = parts[1].split()[0].strip()
+    elif '//' in line:
+        ref = line.split('//')[-1].strip()
+    return ref
+
+
+def legacy_conv_parse_amount(amount_str):
+    """Amount parsing as done by conv.py before the shared parser"""
+    try:
+        parts = amount_str.split('N')
+        if len(parts) < 2:
+            return 0.0
+        amount_part = parts[1].split('N')[0]
+        amount_part = amount_part.replace(',', '.')
+        return float(amount_part)
+    except (ValueError, IndexError):
+        print(f"Error parsing amount: {amount_str}")
+        return 0.0
+
+
+def legacy_parse_gui(file_path, update_ui):
+    """MT940Converter.parse_mt940 as it was before the shared parser"""
+    transactions = []
+    current_transaction = None
+    description = []
+    currency = None
+
+    transaction_start = ':61:'
+    currency_markers = [':60F:', ':60M:', ':62F:', ':62M:']
+    description_start = ':86:'
+    desc_markers = {'<00', '<20', '<21', '<22', '<23', '<27', '<28', '<29'}
+
+    with open(file_path, 'r', encoding='iso-8859-1') as file:
+        lines = file.readlines()
+
+    total_lines = len(lines)
+    for i, line in enumerate(lines):
+        if i % 100 == 0:
+            update_ui(f"Processing line {i}/{total_lines}...", 10 + (i/total_lines * 65))
+
+        line = line.strip()
+        if not line:
+            continue
+
+        if not currency:
+            for marker in currency_markers:
+                if line.startswith(marker):
+                    found_currency = legacy_extract_currency(line)
+                    if found_currency:
+                        currency = found_currency
+                        break
+
+        if line.startswith(transaction_start):
+            if current_transaction:
+                current_transaction['Description'] = ' '.join(description)
+                transactions.append(current_transaction)
+                description = []
+
+            try:
+                date_str = line[4:10]
+                amount = legacy_parse_amount(line[10:])
+                current_transaction = {
+                    'Date': datetime.strptime(date_str, '%y%m%d'),
+                    'Amount': amount,
+                    'Currency': currency or 'Unknown',
+                    'Bank Reference': legacy_parse_reference(line)
+                }
+            except Exception as e:
+                print(f"Warning: Error parsing transaction line: {line}")
+                print(f"Error details: {str(e)}")
+                continue
+
+        elif line.startswith(description_start):
+            continue
+
+        elif current_transaction:
+            if line.startswith('<'):
+                marker = line[:3]
+                if marker in desc_markers:
+                    description.append(line[3:].strip())
+            else:
+                description.append(line.strip())
+
+    if current_transaction:
+        current_transaction['Description'] = ' '.join(description)
+        transactions.append(current_transaction)
+
+    return transactions
+
+
+def legacy_parse_conv(file_path):
+    """conv.py's parse_mt940 as it was before the shared parser"""
+    transactions = []
+
+    with open(file_path, 'r', encoding='iso-8859-1') as file:
+        lines = file.readlines()
+
+    for i, line in enumerate(lines):
+        line = line.strip()
+        if line.startswith(':61:'):
+            parts = line[4:].split('N')
+            date_str = parts[0][:6]
+
+            amount_str = line[4:]
+            # The original printed every :61: line; the cost is part of the baseline
+            print(f"Processing amount string: {amount_str}")
+
+            if 'D' in amount_str:
+                amount = legacy_conv_parse_amount(amount_str)
+            elif 'C' in amount_str:
+                amount = -legacy_conv_parse_amount(amount_str)
+            else:
+                continue
+
+            date = datetime.strptime(date_str, '%y%m%d')
+
+            description = []
+            j = i + 1
+            while j < len(lines):
+                next_line = lines[j].strip()
+                if not next_line or next_line.startswith(':61:'):
+                    break
+                if next_line.startswith(':86:'):
+                    j += 1
+                    while j < len(lines):
+                        desc_line = lines[j].strip()
+                        if not desc_line or desc_line.startswith(':61:'):
+                            break
+                        if desc_line.startswith(('<00', '<20', '<21', '<22', '<23', '<27', '<28', '<29')):
+                            description.append(desc_line[3:])
+                        j += 1
+                    break
+                else:
+                    description.append(next_line)
+                j += 1
+
+            desc = ' '.join(description).replace('<', ' ').replace('>', ' ')
+            transactions.append({
+                'Date': date,
+                'Amount': amount,
+                'Currency': 'PLN',
+                'Bank Reference': parts[0].split('//')[-1] if '//' in parts[0] else '',
+                'Description': ' '.join(desc.split())
+            })
+
+    return transactions
+
+
+def load_lines(file_path):
+    with open(file_path, 'r', encoding='iso-8859-1') as file:
+        lines = [line.strip() for line in file]
+    statement_lines = [line for line in lines if line.startswith(':61:')]
+    balance_lines = [line for line in lines if line.startswith((':60F:', ':62F:', ':64:'))]
+    return statement_lines, balance_lines
+
+
+def bench_tokenizer(statement_lines, balance_lines, repeat=REPEAT):
+    """Time the :61:/balance tokenizers against the legacy regex path"""
+    # Both sides produce the value date, amount, reference and currency
+    def legacy():
+        for line in statement_lines:
+            datetime.strptime(line[4:10], '%y%m%d')
+            legacy_parse_amount(line[10:])
+            legacy_parse_reference(line)
+        for line in balance_lines:
+            legacy_extract_currency(line)
+
+    def tokenizer():
+        for line in statement_lines:
+            tokenize_statement_line(line)
+        for line in balance_lines:
+            tokenize_balance(line)
+
+    count = len(statement_lines) + len(balance_lines)
+    results = {}
+    for name, func in (('legacy', legacy), ('tokenizer', tokenizer)):
+        number = max(1, 200000 // max(count, 1))
+        best = min(timeit.repeat(func, number=number, repeat=repeat))
+        results[name] = count * number / best
+    return results
+
+
+class StageTimer:
+    """Accumulates wall time per named stage of one engine run"""
+
+    def __init__(self):
+        self.seconds = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+
+
+def engine_gui(file_path, timer):
+    """MT940Converter.parse_mt940 as called by Show/Convert, with a cold cache"""
+    from mt940_cache import ParseCache
+    from mt940_converter import MT940Converter
+
+    viewer = SimpleNamespace(cache=ParseCache(max_entries=1))
+    with timer.stage('hash'):
+        viewer.cache.key(file_path)
+    with timer.stage('parse'):
+        parsed = MT940Converter.parse_mt940(viewer, file_path, lambda message, progress: None)
+    with timer.stage('total'):
+        parsed.summary.currency_summary()
+    return len(parsed.transactions)
+
+
+def engine_conv(file_path, timer):
+    """conv.py's parser, then its CSV writer"""
+    from conv import parse_mt940
+    from mt940_csv import write_csv
+
+    with timer.stage('parse'):
+        transactions = parse_mt940(file_path)
+    with timer.stage('csv'), open(os.devnull, 'w', newline='') as output:
+        write_csv(transactions, output)
+    return len(transactions)
+
+
+def engine_legacy(file_path, timer):
+    """Frozen copy of the GUI's original parser, the baseline for gui"""
+    with timer.stage('parse'):
+        transactions = legacy_parse_gui(file_path, lambda message, progress: None)
+    return len(transactions)
+
+
+def engine_legacy_conv(file_path, timer):
+    """Frozen copy of conv.py's original parser, then the CSV writer (baseline for conv)"""
+    from mt940_csv import write_csv
+
+    with timer.stage('parse'), open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        transactions = legacy_parse_conv(file_path)
+    with timer.stage('csv'), open(os.devnull, 'w', newline='') as output:
+        write_csv(transactions, output)
+    return len(transactions)
+
+
+def engine_parser(file_path, timer):
+    """Line-based engine into dicts, then the CSV writer"""
+    from mt940_csv import write_csv
+    from mt940_parser import parse_file
+
+    with timer.stage('parse'):
+        transactions = parse_file(file_path)
+    with timer.stage('csv'), open(os.devnull, 'w', newline='') as output:
+        write_csv(transactions, output)
+    return len(transactions)
+
+
+def engine_mmap(file_path, timer):
+    """Memory-mapped byte scanner"""
+    from mt940_scan import parse_file_mmap
+
+    with timer.stage('parse'):
+        transactions = parse_file_mmap(file_path)
+    return len(transactions)
+
+
+def engine_parallel(file_path, timer):
+    """Statement index plus process-pool parsing"""
+    from mt940_statements import batch_ranges, index_statements, parse_file_parallel
+
+    with timer.stage('index'):
+        batch_ranges(index_statements(file_path))
+    with timer.stage('parse'):
+        transactions = parse_file_parallel(file_path)
+    return len(transactions)
+
+
+def engine_columns(file_path, timer):
+    """Columnar parser, then a DataFrame if pandas is installed"""
+    from mt940_columns import read_columns
+
+    with timer.stage('parse'), open(file_path, 'rb') as file:
+        columns = read_columns(file)
+    try:
+        import pandas  # noqa: F401
+    except ImportError:
+        return len(columns)
+
+    with timer.stage('dataframe'):
+        columns.to_dataframe()
+    return len(columns)
+
+
+def engine_csv(file_path, timer):
+    """Streaming conversion straight from statement to CSV rows"""
+    from mt940_csv import convert_to_csv
+
+    with tempfile.TemporaryDirectory() as directory:
+        with timer.stage('convert'):
+            count = convert_to_csv(file_path, os.path.join(directory, 'out.csv'))
+    return count
+
+
+def engine_view(file_path, timer):
+    """Transaction view: sort indexes, then every re-sort and a range filter"""
+    from mt940_parser import COLUMNS, parse_file
+    from mt940_view import TransactionView
+
+    with timer.stage('parse'):
+        transactions = parse_file(file_path)
+    with timer.stage('sort index'):
+        view = TransactionView(transactions)
+    with timer.stage('sort'):
+        for column in COLUMNS:
+            view.sort(column)
+            view.sort(column, descending=True)
+    with timer.stage('filter'):
+        view.filter(date_from=transactions[len(transactions) // 2]['Date'], amount_min=0)
+        view.sort('Amount')
+        view.filter()
+    return len(transactions)
+
+
+ENGINES = {
+    'legacy': engine_legacy,
+    'legacy-conv': engine_legacy_conv,
+    'gui': engine_gui,
+    'conv': engine_conv,
+    'parser': engine_parser,
+    'mmap': engine_mmap,
+    'parallel': engine_parallel,
+    'columns': engine_columns,
+    'csv': engine_csv,
+    'view': engine_view,
+}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unknown"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_engine(name, file_path, repeat=ENGINE_REPEAT):
+    """Time one engine on one file, returning its best run
+
+    Only the stages count towards the time, so module imports and other
+    setup done by the engine are left out.
+    """
+    best = None
+    for _ in range(repeat):
+        timer = StageTimer()
+        transactions = ENGINES[name](file_path, timer)
+        seconds = sum(timer.seconds.values())
+        if best is None or seconds < best['seconds']:
+            best = {'seconds': seconds, 'transactions': transactions, 'stages': timer.seconds}
+    best['peak_rss_mb'] = peak_rss_mb()
+    return best
+
+
+def run_isolated(name, file_path, repeat=ENGINE_REPEAT):
+    """run_engine in a freshly spawned process so peak RSS is not shared"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+        return pool.submit(run_engine, name, file_path, repeat).result()
+
+
+def count_lines(file_path):
+    lines = 0
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            lines += chunk.count(b'\n')
+    return lines
+
+
+def bench_engines(file_path, engines, repeat=ENGINE_REPEAT, isolate=True, report=print):
+    """Benchmark engines on file_path and return a JSON-ready results dict"""
+    size = os.path.getsize(file_path)
+    lines = count_lines(file_path)
+    results = {}
+    for name in engines:
+        try:
+            if isolate:
+                result = run_isolated(name, file_path, repeat)
+            else:
+                result = run_engine(name, file_path, repeat)
+        except Exception as e:
+            report(f"{name:>11}: failed - {str(e)}")
+            results[name] = {'error': str(e)}
+            continue
+        result['lines_per_s'] = lines / result['seconds']
+        result['mb_per_s'] = size / 1e6 / result['seconds']
+        results[name] = result
+        report(format_result(name, result))
+
+    return {
+        'file': os.path.abspath(file_path),
+        'size': size,
+        'lines': lines,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'results': results,
+    }
+
+
+def format_result(name, result):
+    rss = result['peak_rss_mb']
+    stages = ', '.join(f"{stage} {seconds:.3f}s" for stage, seconds in result['stages'].items())
+    return (f"{name:>11}: {result['seconds']:8.3f}s {result['lines_per_s']:>12,.0f} lines/s "
+            f"{result['mb_per_s']:7.1f} MB/s  peak RSS {'?' if rss is None else f'{rss:.0f}'} MB  ({stages})")
+
+
+def compare(current, previous, report=print):
+    """Print the speedup of each engine against a previous results dict"""
+    report(f"Compared with {previous['timestamp']} ({previous['file']}):")
+    for name, result in current['results'].items():
+        before = previous['results'].get(name)
+        if 'seconds' not in result or not before or 'seconds' not in before:
+            continue
+        # Compare throughput so runs on different corpus sizes stay meaningful
+        speedup = result['lines_per_s'] / before['lines_per_s']
+        report(f"{name:>11}: {speedup:.2f}x")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the MT940 engines")
+    parser.add_argument('file', nargs='?', default='f.mt940', help="statement to benchmark")
+    parser.add_argument('--generate', type=int, metavar='N',
+                        help="benchmark a synthetic file with N transactions instead")
+    parser.add_argument('--statements', type=int, default=1, help="statements in the synthetic file")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--long-descriptions', action='store_true')
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument('--repeat', type=int, default=ENGINE_REPEAT)
+    parser.add_argument('--json', help="save results to this file")
+    parser.add_argument('--compare', help="results file of an earlier run")
+    parser.add_argument('--tokenizer', action='store_true',
+                        help="only compare the :61: tokenizer with the legacy regexes")
+    args = parser.parse_args(argv[1:])
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = args.file
+        if args.generate:
+            from mt940_synth import generate_file
+
+            file_path = os.path.join(directory, 'synthetic.sta')
+            generate_file(file_path, args.generate, args.statements, args.seed,
+                          long_descriptions=args.long_descriptions)
+
+        if args.tokenizer:
+            statement_lines, balance_lines = load_lines(file_path)
+            print(f"{len(statement_lines)} :61: lines, {len(balance_lines)} balance lines from {file_path}")
+            rates = bench_tokenizer(statement_lines, balance_lines)
+            for name, rate in rates.items():
+                print(f"{name:>10}: {rate:,.0f} lines/s")
+            print(f"   speedup: {rates['tokenizer'] / rates['legacy']:.2f}x")
+            return 0
+
+        size = os.path.getsize(file_path)
+        print(f"{file_path}: {size / 1e6:.1f} MB")
+        results = bench_engines(file_path, args.engines, args.repeat)
+
+    if args.generate:
+        results['corpus'] = {'transactions': args.generate, 'statements': args.statements,
+                             'seed': args.seed, 'long_descriptions': args.long_descriptions}
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            compare(results, json.load(file))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+        print(f"Results saved to {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,150 @@
+"""Cold-start benchmark for the application window
+
+Usage:
+    python bench_startup.py [--runs 5] [--json startup.json] [--compare startup.json]
+    python bench_startup.py --frozen dist/MT940_Converter/MT940_Converter
+    python bench_startup.py --imports-only
+
+Each run launches the application in a fresh process with
+MT940_STARTUP_REPORT set. The application records when its window has
+been drawn and which heavy modules were loaded by then, and quits. The
+first (coldest) and median times from launch to window are reported.
+
+The exit status is 1 when the median is over --budget, when a heavy module
+(numpy, pandas, pyarrow or an engine module) was loaded before the window,
+or when the median is more than --tolerance slower than a --compare run.
+--imports-only times the interpreter plus `import mt940_converter`
+instead, which needs no display.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Median seconds from launch to window allowed for each kind of run
+BUDGETS = {'source': 2.0, 'frozen': 3.0, 'imports': 0.5}
+
+# Allowed slowdown of the median against a --compare run
+TOLERANCE = 0.25
+
+RUNS = 5
+
+# Seconds a launch may take before it is treated as hung
+LAUNCH_TIMEOUT = 60
+
+# Child for --imports-only: writes the same record the application does
+IMPORT_PROBE = """
+import json, sys, time
+import mt940_converter
+with open(sys.argv[1], 'w', encoding='utf-8') as file:
+    json.dump({'shown': time.time(),
+               'loaded': [name for name in mt940_converter.HEAVY_MODULES if name in sys.modules]}, file)
+"""
+
+
+def command_for(kind, frozen=None):
+    if kind == 'frozen':
+        return [frozen]
+    if kind == 'imports':
+        return [sys.executable, '-c', IMPORT_PROBE]
+    return [sys.executable, os.path.join(HERE, 'mt940_converter.py')]
+
+
+def launch(command, kind, timeout=LAUNCH_TIMEOUT):
+    """Start the application once; returns {'seconds', 'loaded'}"""
+    with tempfile.TemporaryDirectory() as directory:
+        report_path = os.path.join(directory, 'startup.json')
+        env = dict(os.environ, MT940_STARTUP_REPORT=report_path)
+        if kind == 'imports':
+            command = command + [report_path]
+        started = time.time()
+        process = subprocess.run(command, cwd=HERE, env=env, capture_output=True, timeout=timeout)
+        try:
+            with open(report_path, 'r', encoding='utf-8') as file:
+                record = json.load(file)
+        except (OSError, ValueError):
+            error = process.stderr.decode('utf-8', errors='replace').strip()
+            raise RuntimeError(f"no startup report from {command[0]} (exit {process.returncode}): {error}")
+    return {'seconds': record['shown'] - started, 'loaded': record['loaded']}
+
+
+def bench_startup(kind='source', frozen=None, runs=RUNS, report=print):
+    """Launch runs times and summarise the time to window"""
+    command = command_for(kind, frozen)
+    seconds = []
+    loaded = set()
+    for run in range(runs):
+        result = launch(command, kind)
+        seconds.append(result['seconds'])
+        loaded.update(result['loaded'])
+        report(f"run {run + 1}: {result['seconds']:.3f}s")
+    return {
+        'kind': kind,
+        'command': command,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'first': seconds[0],
+        'median': statistics.median(seconds),
+        'max': max(seconds),
+        'runs': seconds,
+        'loaded': sorted(loaded),
+    }
+
+
+def check(summary, budget, previous=None, tolerance=TOLERANCE):
+    """Return a list of problems with a summary; empty when it passes"""
+    problems = []
+    if summary['median'] > budget:
+        problems.append(f"median {summary['median']:.3f}s is over the {budget:.3f}s budget")
+    if summary['loaded']:
+        problems.append(f"loaded before the window: {', '.join(summary['loaded'])}")
+    if previous is not None and summary['median'] > previous['median'] * (1 + tolerance):
+        problems.append(f"median {summary['median']:.3f}s is more than {tolerance:.0%} slower "
+                        f"than {previous['median']:.3f}s on {previous['timestamp']}")
+    return problems
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Measure how long the application takes to show its window")
+    parser.add_argument('--frozen', metavar='EXECUTABLE', help="time a PyInstaller build instead of the source")
+    parser.add_argument('--imports-only', action='store_true',
+                        help="time interpreter start plus imports only (no display needed)")
+    parser.add_argument('--runs', type=int, default=RUNS)
+    parser.add_argument('--budget', type=float, help="median seconds allowed (default depends on the kind)")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="allowed slowdown against --compare, as a fraction")
+    parser.add_argument('--json', help="save the summary to this file")
+    parser.add_argument('--compare', help="summary file of an earlier run")
+    args = parser.parse_args(argv[1:])
+
+    kind = 'frozen' if args.frozen else 'imports' if args.imports_only else 'source'
+    try:
+        summary = bench_startup(kind, args.frozen, args.runs)
+    except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+        print(f"FAIL: {str(e)}")
+        return 1
+    print(f"{kind}: first {summary['first']:.3f}s, median {summary['median']:.3f}s, max {summary['max']:.3f}s")
+
+    previous = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            previous = json.load(file)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(summary, file, indent=2)
+        print(f"Results saved to {args.json}")
+
+    budget = BUDGETS[kind] if args.budget is None else args.budget
+    problems = check(summary, budget, previous, args.tolerance)
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -60,6 +60,16 @@ pyinstaller --name "MT940_Converter" \
             --noconfirm \
             mt940_converter.py
 
+# Check the frozen build still shows its window within the startup budget
+if [ -n "$DISPLAY" ]; then
+    if ! python3 bench_startup.py --frozen dist/MT940_Converter/MT940_Converter --runs 3; then
+        echo "Startup time check failed. See bench_startup.py."
+        exit 1
+    fi
+else
+    echo "No display available, skipping the startup time check"
+fi
+
 # Create a more user-friendly executable
 cd dist
 rm -rf mt940_converter
@@ -81,6 +81,13 @@ python3 -m PyInstaller \
     --collect-all pillow \
     mt940_converter.py
 
+# Check the frozen build still shows its window within the startup budget
+if ! python3 bench_startup.py --frozen "dist/MT940 Converter.app/Contents/MacOS/MT940 Converter" --runs 3; then
+    echo "Startup time check failed. See bench_startup.py."
+    deactivate
+    exit 1
+fi
+
 # Create a more user-friendly app bundle
 cd dist
 mv "MT940 Converter.app" "MT940_Converter.app"
@@ -0,0 +1,122 @@
+"""Running totals per account, currency, day and month
+
+An Aggregator is attached to a parser (parser.aggregator) and fed one
+transaction at a time while the file streams, from the integer amount in
+hundredths, so totals are exact. Only one bucket per account, currency and
+value date is kept; account, currency and month summaries are rolled up
+from those buckets when asked for, which touches a few hundred buckets
+rather than the rows.
+
+    aggregator = Aggregator()
+    transactions = parse_file('statement.sta', aggregator=aggregator)
+    aggregator.totals('currency')      # {('PLN',): Totals(...)}
+    aggregator.monthly_report()        # rows per account, currency and month
+"""
+from collections import namedtuple
+
+from mt940_fields import AMOUNT_SCALE
+
+# Amounts are signed hundredths: debits negative, credits positive
+Totals = namedtuple('Totals', ['count', 'debit_count', 'credit_count', 'debits', 'credits', 'net'])
+
+MonthlyRow = namedtuple('MonthlyRow', ['account', 'currency', 'month'] + list(Totals._fields))
+
+# Ways totals() can roll the per-day buckets up
+GROUPINGS = ('account', 'currency', 'day', 'month', 'total')
+
+
+def _group_key(grouping, account, currency, date):
+    if grouping == 'account':
+        return account, currency
+    if grouping == 'currency':
+        return (currency,)
+    if grouping == 'day':
+        return account, currency, date.strftime('%Y-%m-%d')
+    if grouping == 'month':
+        return account, currency, date.strftime('%Y-%m')
+    return ()
+
+
+class Aggregator:
+    """Per-day buckets of counts and debit/credit sums, fed during parsing"""
+
+    def __init__(self):
+        # (account, currency, value date) -> [count, debit count, debit sum, credit sum]
+        self.buckets = {}
+
+    def __len__(self):
+        return sum(bucket[0] for bucket in self.buckets.values())
+
+    def add(self, account, currency, date, amount_minor):
+        key = (account, currency, date)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = [0, 0, 0, 0]
+        bucket[0] += 1
+        if amount_minor < 0:
+            bucket[1] += 1
+            bucket[2] += amount_minor
+        else:
+            bucket[3] += amount_minor
+
+    def add_transaction(self, fields, statement):
+        """Parser hook: count one tokenized :61: line of statement"""
+        self.add(statement.account, statement.currency or 'Unknown', fields.value_date, fields.amount_minor)
+
+    def merge(self, other):
+        """Add another Aggregator's buckets (e.g. from a parallel worker) to this one"""
+        for key, (count, debit_count, debits, credits) in other.buckets.items():
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                self.buckets[key] = [count, debit_count, debits, credits]
+            else:
+                bucket[0] += count
+                bucket[1] += debit_count
+                bucket[2] += debits
+                bucket[3] += credits
+        return self
+
+    def totals(self, grouping='account'):
+        """Roll the buckets up into {key: Totals}, sorted by key
+
+        grouping is one of GROUPINGS; keys are (account, currency),
+        (currency,), (account, currency, 'YYYY-MM-DD'),
+        (account, currency, 'YYYY-MM') or () for the grand total.
+        Amounts are in hundredths.
+        """
+        if grouping not in GROUPINGS:
+            raise ValueError(f"unknown grouping {grouping!r}")
+        sums = {}
+        for (account, currency, date), (count, debit_count, debits, credits) in self.buckets.items():
+            key = _group_key(grouping, account, currency, date)
+            total = sums.get(key)
+            if total is None:
+                sums[key] = [count, debit_count, debits, credits]
+            else:
+                total[0] += count
+                total[1] += debit_count
+                total[2] += debits
+                total[3] += credits
+        return {
+            key: Totals(count, debit_count, count - debit_count, debits, credits, debits + credits)
+            for key, (count, debit_count, debits, credits) in sorted(sums.items(), key=_sort_key)
+        }
+
+    def monthly_report(self):
+        """List of MonthlyRow, one per account, currency and month"""
+        return [MonthlyRow(*key, *totals) for key, totals in self.totals('month').items()]
+
+    def currency_summary(self):
+        """One line per currency for status bars, e.g. 'PLN: 39 tx, net -2,846.28'"""
+        parts = []
+        for (currency,), totals in self.totals('currency').items():
+            parts.append(
+                f"{currency}: {totals.count} tx, debits {totals.debits / AMOUNT_SCALE:,.2f}, "
+                f"credits {totals.credits / AMOUNT_SCALE:,.2f}, net {totals.net / AMOUNT_SCALE:,.2f}"
+            )
+        return ' | '.join(parts)
+
+
+def _sort_key(item):
+    # Headerless statements have no account; sort them first
+    return tuple('' if part is None else part for part in item[0])
@@ -0,0 +1,192 @@
+"""asyncio API for ingesting statements in async services
+
+    async for transaction in aiter_transactions(request.stream):
+        ...
+
+The stream can be anything that yields bytes asynchronously: an object
+with an async read(n) method (asyncio.StreamReader, aiohttp's
+StreamReader, aiofiles) or an async iterator of byte chunks (Starlette's
+request.stream()). Chunks are split at line boundaries on the event loop,
+which is cheap, while decoding and parsing of each run of complete lines
+happens in an executor. The parser's state (the open statement and
+transaction) is carried from one chunk to the next, so nothing is buffered
+beyond one chunk. Each executor job returns the parser it worked on, so
+this also holds for a process pool, where a job only sees a copy.
+
+An Ingestor bounds how many chunks are parsed at once across all the
+uploads it serves, so one process can take many uploads concurrently
+without the parsing starving the event loop.
+"""
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from mt940_bounded import decode_lines, split_chunk
+from mt940_encoding import SAMPLE_BYTES, detect_encoding
+from mt940_parser import ENCODING, MT940ParseError, MT940Parser
+
+# Bytes read from the stream per executor job
+CHUNK_BYTES = 256 * 1024
+
+# Chunks parsed at the same time by a default Ingestor
+DEFAULT_CONCURRENCY = 4
+
+
+def parse_lines(parser, data):
+    """Executor job: feed complete lines to parser
+
+    Returns (parser, transactions); under a process pool the parser is a
+    copy, and the caller continues with the one returned.
+    """
+    transactions = []
+    for line in decode_lines(data):
+        transaction = parser.feed(line)
+        if transaction is not None:
+            transactions.append(transaction)
+    return parser, transactions
+
+
+def finish_parser(parser, carry):
+    """Executor job: feed the unterminated last line and close the parser
+
+    Returns (parser, transactions), as parse_lines() does.
+    """
+    transactions = []
+    if carry:
+        transaction = parser.feed(carry.decode(ENCODING))
+        if transaction is not None:
+            transactions.append(transaction)
+    transaction = parser.close()
+    if transaction is not None:
+        transactions.append(transaction)
+    return parser, transactions
+
+
+async def aiter_chunks(stream, chunk_bytes=CHUNK_BYTES):
+    """Yield byte chunks from an async reader or async iterator of bytes"""
+    read = getattr(stream, 'read', None)
+    if read is not None:
+        while True:
+            chunk = await read(chunk_bytes)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        async for chunk in stream:
+            if chunk:
+                yield chunk
+
+
+async def detect_ahead(parser, chunks):
+    """Pass chunks on once SAMPLE_BYTES (or the whole stream) have set parser.text_encoding"""
+    held = []
+    size = 0
+    async for chunk in chunks:
+        if held is None:
+            yield chunk
+            continue
+        held.append(chunk)
+        size += len(chunk)
+        if size >= SAMPLE_BYTES:
+            parser.text_encoding = detect_encoding(b''.join(held)[:SAMPLE_BYTES])
+            for chunk in held:
+                yield chunk
+            held = None
+    if held is not None:
+        parser.text_encoding = detect_encoding(b''.join(held))
+        for chunk in held:
+            yield chunk
+
+
+class Ingestor:
+    """Parses async byte streams in an executor, at most concurrency chunks at once
+
+    executor defaults to a thread pool of concurrency workers; the event
+    loop stays responsive because it only waits on them. A
+    ProcessPoolExecutor also works and parses chunks of different uploads
+    in parallel, at the cost of pickling the parser to and from every job.
+    The parser must then be picklable, and whatever it collects (rows
+    stored by make_transaction(), an aggregator) ends up in the copies,
+    not in the instance passed to aiter_transactions().
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, executor=None, chunk_bytes=CHUNK_BYTES):
+        self.concurrency = concurrency
+        self.chunk_bytes = chunk_bytes
+        self.owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix='mt940-ingest'
+        )
+        # One semaphore per event loop; asyncio primitives belong to a single loop
+        self.semaphores = weakref.WeakKeyDictionary()
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        semaphore = self.semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self.semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        async with semaphore:
+            return await loop.run_in_executor(self.executor, func, *args)
+
+    async def aiter_transactions(self, stream, parser=None):
+        """Yield transactions from an async byte stream as each chunk is parsed
+
+        parser, an MT940Parser (or subclass) instance, decides what is
+        yielded; it must not be shared between streams. Unless it has a
+        text_encoding, the code page is detected from the first
+        SAMPLE_BYTES of the stream before parsing starts. A line longer
+        than the chunk size raises MT940ParseError.
+        """
+        parser = MT940Parser() if parser is None else parser
+        chunks = aiter_chunks(stream, self.chunk_bytes)
+        if parser.text_encoding is None:
+            chunks = detect_ahead(parser, chunks)
+        carry = b''
+        try:
+            async for chunk in chunks:
+                data, carry = split_chunk(carry, chunk, self.chunk_bytes)
+                if not data:
+                    continue
+                parser, transactions = await self._run(parse_lines, parser, data)
+                for transaction in transactions:
+                    yield transaction
+            parser, transactions = await self._run(finish_parser, parser, carry)
+        except (OSError, ValueError) as e:
+            raise MT940ParseError(f"Error parsing MT940 file: {str(e)}") from e
+        for transaction in transactions:
+            yield transaction
+
+    async def parse(self, stream, parser=None):
+        """Collect every transaction of a stream into a list
+
+        Raises MT940ParseError if the stream has no transactions.
+        """
+        transactions = [transaction async for transaction in self.aiter_transactions(stream, parser)]
+        if not transactions:
+            raise MT940ParseError("Error parsing MT940 file: No transactions found in the file")
+        return transactions
+
+    def close(self):
+        if self.owns_executor:
+            self.executor.shutdown(wait=False)
+
+
+_default_ingestor = None
+
+
+def default_ingestor():
+    """Process-wide Ingestor used by the module-level functions"""
+    global _default_ingestor
+    if _default_ingestor is None:
+        _default_ingestor = Ingestor()
+    return _default_ingestor
+
+
+def aiter_transactions(stream, parser=None):
+    """Yield transactions from an async byte stream (see Ingestor.aiter_transactions)"""
+    return default_ingestor().aiter_transactions(stream, parser)
+
+
+async def parse_stream(stream, parser=None):
+    """Async counterpart of mt940_parser.parse_file for a byte stream"""
+    return await default_ingestor().parse(stream, parser)
@@ -0,0 +1,183 @@
+"""Bounded-memory conversion for files larger than RAM
+
+convert_bounded() works to an explicit memory budget instead of relying on
+line iteration and file buffering defaults. Part of the budget is the input
+chunk: the file is read chunk_bytes at a time, complete lines are fed to
+the parser, and the partial line at the end of each chunk is carried over
+to the next. The parser itself carries the one transaction that is still
+open across chunk boundaries. Another part is the output batch: CSV rows
+are collected until they reach the batch size and then written and flushed.
+
+Nothing grows with the size of the input, so peak memory stays flat for a
+100 MB or a 100 GB statement. An empty input is only detected at the end;
+the partial output is removed then.
+"""
+import csv
+import os
+import time
+
+from mt940_csv import CsvRowParser, open_output
+from mt940_encoding import detect_file_encoding
+from mt940_parser import COLUMNS, ENCODING, MT940ParseError
+
+# Default budget for input chunk plus output batch
+DEFAULT_MEMORY_BUDGET = 8 * 1024 * 1024
+
+# Parts of the budget given to each of the input chunk and the output batch;
+# the rest covers the Python objects built from them (see split_budget)
+BUDGET_SHARES = 12
+
+# Smaller budgets spend more time in read() and write() calls than parsing
+MIN_MEMORY_BUDGET = 64 * 1024
+
+
+def split_budget(memory_budget):
+    """Return (input chunk bytes, output batch characters) for a budget
+
+    Each side gets a twelfth of the budget: a chunk is held as bytes, as
+    decoded text and as a list of line strings at once, and a batch of
+    rows costs about three times its characters in tuple and str objects.
+    """
+    if memory_budget < MIN_MEMORY_BUDGET:
+        raise ValueError(f"memory budget must be at least {MIN_MEMORY_BUDGET} bytes")
+    share = memory_budget // BUDGET_SHARES
+    return share, share
+
+
+def split_chunk(carry, chunk, limit):
+    """Split carry + chunk into (bytes of complete lines, new carry)
+
+    The complete lines end with their newline; the unterminated tail is the
+    new carry. Raises ValueError if the carry grows past limit bytes.
+    """
+    end = chunk.rfind(b'\n') + 1
+    if not end:
+        carry += chunk
+        if len(carry) > limit:
+            raise ValueError(f"line longer than {limit} bytes")
+        return b'', carry
+    return carry + chunk[:end], chunk[end:]
+
+
+def decode_lines(data):
+    """Decode complete lines from split_chunk() into a list of lines"""
+    # ENCODING is single-byte, so any complete run of lines decodes on its own
+    lines = data.decode(ENCODING).split('\n')
+    lines.pop()
+    return lines
+
+
+def iter_line_chunks(fileobj, chunk_bytes, progress=None):
+    """Yield lists of decoded lines from a binary file read chunk_bytes at a time
+
+    The unterminated tail of each chunk is kept and prefixed to the next.
+    A single line longer than chunk_bytes raises ValueError rather than
+    growing without bound. progress, if given, is called after each chunk
+    with the number of bytes read so far.
+    """
+    carry = b''
+    consumed = 0
+    while True:
+        chunk = fileobj.read(chunk_bytes)
+        if not chunk:
+            break
+        consumed += len(chunk)
+        data, carry = split_chunk(carry, chunk, chunk_bytes)
+        if data:
+            yield decode_lines(data)
+        if progress is not None:
+            progress(consumed)
+    if carry:
+        yield [carry.decode(ENCODING)]
+
+
+class BatchWriter:
+    """csv writer that holds at most batch_chars of rows before writing them"""
+
+    def __init__(self, fileobj, batch_chars):
+        self.fileobj = fileobj
+        self.writer = csv.writer(fileobj, lineterminator=os.linesep)
+        self.batch_chars = batch_chars
+        self.rows = []
+        self.size = 0
+        self.count = 0
+
+    def writeheader(self):
+        self.writer.writerow(COLUMNS)
+
+    def add(self, row):
+        self.rows.append(row)
+        # Close enough to the formatted length; quoting adds a few characters
+        self.size += sum(map(len, row)) + len(row)
+        if self.size >= self.batch_chars:
+            self.flush()
+
+    def flush(self):
+        self.writer.writerows(self.rows)
+        self.fileobj.flush()
+        self.count += len(self.rows)
+        self.rows = []
+        self.size = 0
+
+
+def timed_chunks(profile, chunks):
+    """Pass line chunks on, adding the time to read and decode each to profile's 'read' stage"""
+    clock = time.perf_counter
+    while True:
+        started = clock()
+        lines = next(chunks, None)
+        profile.add('read', clock() - started)
+        if lines is None:
+            return
+        profile.count('lines', len(lines))
+        yield lines
+
+
+def convert_bounded(input_path, output_path, memory_budget=DEFAULT_MEMORY_BUDGET, progress=None,
+                    profile=None):
+    """Convert an MT940 file to CSV within memory_budget bytes of buffers
+
+    Writes the same bytes as mt940_csv.convert_to_csv(). progress, if
+    given, is called with the number of bytes read after each input chunk.
+    profile, an mt940_profile.Profile, times reading, the parser's stages
+    and writing batches. Returns the number of transactions written. Raises MT940ParseError if
+    the file cannot be read, has a line longer than the input chunk, or
+    has no transactions; the output file is removed in each case.
+    """
+    chunk_bytes, batch_chars = split_budget(memory_budget)
+    parser = CsvRowParser()
+    try:
+        parser.text_encoding = detect_file_encoding(input_path)
+        with open(input_path, 'rb', buffering=0) as source, \
+                open_output(output_path, buffering=batch_chars) as target:
+            batch = BatchWriter(target, batch_chars)
+            batch.writeheader()
+            chunks = iter_line_chunks(source, chunk_bytes, progress)
+            if profile is not None:
+                profile.instrument(parser)
+                batch.flush = profile.timed('write', batch.flush)
+                chunks = timed_chunks(profile, chunks)
+            feed = parser.feed
+            for lines in chunks:
+                for line in lines:
+                    row = feed(line)
+                    if row is not None:
+                        batch.add(row)
+            row = parser.close()
+            if row is not None:
+                batch.add(row)
+            batch.flush()
+            if profile is not None:
+                profile.count('bytes', source.tell())
+                profile.count('transactions', batch.count)
+    except (OSError, ValueError) as e:
+        # Don't leave a truncated CSV behind
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise MT940ParseError(f"Error parsing MT940 file: {str(e)}") from e
+
+    if not batch.count:
+        os.remove(output_path)
+        raise MT940ParseError("Error parsing MT940 file: No transactions found in the file")
+
+    return batch.count
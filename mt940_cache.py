@@ -0,0 +1,195 @@
+"""Parse-once cache for MT940 statements
+
+Parsed results are keyed by path, size, modification time and a content
+hash. Entries live in an in-memory LRU for the session and, when a cache
+directory is given, in a pickle store on disk so that reopening a
+statement skips tokenizing. Entries hold the transaction dicts
+themselves, so loading one still costs time in proportion to its rows.
+
+Each entry is a ParsedFile: the transactions together with the
+mt940_aggregate.Aggregator filled while they were parsed, so totals are
+cached with the rows.
+"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict, namedtuple
+
+from mt940_aggregate import Aggregator
+from mt940_parser import parse_file
+from mt940_profile import stage
+from mt940_statements import PARALLEL_MIN_BYTES, parse_file_parallel
+
+# Number of parsed statements kept in memory
+DEFAULT_MAX_ENTRIES = 8
+
+# Read size used when hashing statement contents
+HASH_CHUNK_SIZE = 1024 * 1024
+
+INDEX_NAME = 'index.json'
+
+# Bump whenever the parser's output changes so stale disk entries are ignored
+CACHE_VERSION = 5
+
+ParsedFile = namedtuple('ParsedFile', ['transactions', 'summary'])
+
+
+def file_digest(file_path):
+    """Return the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """Thread-safe LRU of parsed statements with an optional disk store"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.entries = OrderedDict()
+        # (path, size, mtime) -> content digest, so unchanged files are not rehashed
+        self.digests = {}
+        self.lock = threading.Lock()
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.digests.update(self._load_index())
+
+    def parse(self, file_path, progress=None, profile=None):
+        """Return parsed transactions for file_path, parsing only on a miss
+
+        profile, an mt940_profile.Profile, times hashing, cache lookup and
+        parsing, and counts cache hits.
+        """
+        return self.parse_summary(file_path, progress, profile).transactions
+
+    def parse_summary(self, file_path, progress=None, profile=None):
+        """Like parse(), but return a ParsedFile with the file's totals"""
+        with stage(profile, 'hash'):
+            key = self.key(file_path)
+        with stage(profile, 'cache'):
+            parsed = self.get(key)
+        if parsed is None:
+            parsed = self._parse(file_path, key[1], progress, profile)
+            with stage(profile, 'cache'):
+                self.put(key, parsed)
+        elif profile is not None:
+            profile.count('cache hits')
+            profile.count('transactions', len(parsed.transactions))
+        return parsed
+
+    def _parse(self, file_path, size, progress, profile=None):
+        aggregator = Aggregator()
+        # Large multi-statement files are split across cores
+        if size >= PARALLEL_MIN_BYTES and (os.cpu_count() or 1) > 1:
+            report = None if progress is None else lambda done, total: progress(done)
+            with stage(profile, 'parallel parse'):
+                transactions = parse_file_parallel(file_path, progress=report, aggregator=aggregator)
+            if profile is not None:
+                profile.count('bytes', size)
+                profile.count('transactions', len(transactions))
+        else:
+            transactions = parse_file(file_path, progress=progress, profile=profile, aggregator=aggregator)
+        return ParsedFile(transactions, aggregator)
+
+    def key(self, file_path):
+        """Build the cache key for a file as it is on disk right now"""
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        stat_key = (path, stat.st_size, stat.st_mtime_ns)
+
+        with self.lock:
+            digest = self.digests.get(stat_key)
+        if digest is None:
+            digest = file_digest(path)
+            with self.lock:
+                # Forget digests of earlier versions of this file
+                for stale in [k for k in self.digests if k[0] == path]:
+                    del self.digests[stale]
+                self.digests[stat_key] = digest
+                if self.cache_dir:
+                    self._save_index()
+
+        return stat_key + (digest,)
+
+    def get(self, key):
+        """Look a key up in memory, then on disk; returns a ParsedFile or None"""
+        with self.lock:
+            parsed = self.entries.get(key)
+            if parsed is not None:
+                self.entries.move_to_end(key)
+                return parsed
+
+        parsed = self._load(key)
+        if parsed is not None:
+            self._remember(key, parsed)
+        return parsed
+
+    def put(self, key, parsed):
+        """Store a ParsedFile in memory and on disk"""
+        self._remember(key, parsed)
+        self._store(key, parsed)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def _remember(self, key, parsed):
+        with self.lock:
+            self.entries[key] = parsed
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def _entry_path(self, key):
+        # Contents decide the entry; the same statement under two names is stored once
+        return os.path.join(self.cache_dir, f"{key[-1]}-v{CACHE_VERSION}.pickle")
+
+    def _load(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._entry_path(key), 'rb') as file:
+                return pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            print(f"Warning: Ignoring unreadable cache entry for {key[0]}: {str(e)}")
+            return None
+
+    def _store(self, key, parsed):
+        if not self.cache_dir:
+            return
+        entry_path = self._entry_path(key)
+        temp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'wb') as file:
+                pickle.dump(parsed, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, entry_path)
+        except OSError as e:
+            print(f"Warning: Could not write cache entry for {key[0]}: {str(e)}")
+
+    def _load_index(self):
+        try:
+            with open(os.path.join(self.cache_dir, INDEX_NAME), 'r', encoding='utf-8') as file:
+                records = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        return {(path, size, mtime): digest for path, size, mtime, digest in records}
+
+    def _save_index(self):
+        # Caller holds self.lock
+        index_path = os.path.join(self.cache_dir, INDEX_NAME)
+        temp_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        records = [list(stat_key) + [digest] for stat_key, digest in self.digests.items()]
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(records, file)
+            os.replace(temp_path, index_path)
+        except OSError as e:
+            print(f"Warning: Could not write cache index: {str(e)}")
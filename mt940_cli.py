@@ -0,0 +1,270 @@
+"""Command-line batch converter
+
+Usage: python mt940_cli.py in/*.sta -o out/ --jobs 8
+
+Converts many statements to CSV across a process pool. Outputs whose
+source contents have not changed since the last run (by SHA-256, recorded
+in a manifest next to the outputs) are skipped.
+
+With --sqlite DB the statements are imported into one SQLite database
+instead; files already in the database are skipped.
+
+With --memory-budget MB each file is converted in fixed-size chunks that
+keep memory use flat whatever the file size (see mt940_bounded).
+
+With --profile REPORT.json every conversion is timed stage by stage (see
+mt940_profile) and the per-file reports are written to REPORT.json.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from mt940_bounded import convert_bounded
+from mt940_cache import file_digest
+from mt940_csv import convert_to_csv
+from mt940_inputs import expand_inputs
+from mt940_profile import Profile
+from mt940_sqlite import export_to_sqlite
+
+MANIFEST_NAME = '.mt940-manifest.json'
+
+
+def output_path_for(input_path, output_dir):
+    base = os.path.splitext(os.path.basename(input_path))[0] + '.csv'
+    directory = output_dir if output_dir else os.path.dirname(input_path)
+    return os.path.join(directory, base)
+
+
+def load_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST_NAME)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def convert_one(input_path, output_path, previous_digest, force=False, use_mmap=False,
+                profile=False, trace_memory=False, memory_budget=None):
+    """Worker: convert one file unless its output is already up to date
+
+    Returns a dict describing the outcome; never raises, so one bad file
+    does not abort the batch. With profile=True the dict also has a
+    'profile' report of the conversion. memory_budget, in bytes, selects
+    the bounded-memory converter.
+    """
+    started = time.perf_counter()
+    result = {
+        'input': input_path,
+        'output': output_path,
+        'status': 'converted',
+        'digest': None,
+        'transactions': 0,
+        'bytes': 0,
+        'seconds': 0.0,
+        'error': None,
+    }
+    try:
+        result['bytes'] = os.path.getsize(input_path)
+        result['digest'] = file_digest(input_path)
+        if not force and result['digest'] == previous_digest and os.path.exists(output_path):
+            result['status'] = 'skipped'
+        else:
+            timer = Profile(trace_memory) if profile else None
+            try:
+                with timer or nullcontext():
+                    if memory_budget:
+                        result['transactions'] = convert_bounded(input_path, output_path, memory_budget,
+                                                                 profile=timer)
+                    else:
+                        result['transactions'] = convert_to_csv(input_path, output_path, use_mmap, timer)
+            finally:
+                if timer is not None:
+                    result['profile'] = timer.report()
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = str(e)
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def run_batch(inputs, output_dir=None, jobs=None, force=False, report=print, use_mmap=False,
+              profile=False, trace_memory=False, memory_budget=None):
+    """Convert inputs in parallel and return the list of per-file results"""
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    tasks = []
+    results = []
+    manifests = {}
+    claimed = set()
+    for input_path in inputs:
+        output_path = output_path_for(input_path, output_dir)
+        key = os.path.abspath(output_path)
+        if key in claimed:
+            # Two inputs with the same name would overwrite each other
+            results.append({
+                'input': input_path, 'output': output_path, 'status': 'failed',
+                'digest': None, 'transactions': 0, 'bytes': 0, 'seconds': 0.0,
+                'error': f"output {output_path} already produced by another input",
+            })
+            continue
+        claimed.add(key)
+        directory = os.path.dirname(key)
+        manifest = manifests.setdefault(directory, load_manifest(directory))
+        entry = manifest.get(os.path.basename(output_path), {})
+        tasks.append((input_path, output_path, entry.get('source'), force, use_mmap,
+                      profile, trace_memory, memory_budget))
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(convert_one, *task) for task in tasks]
+        for future in futures:
+            result = future.result()
+            results.append(result)
+            report(f"{result['status']:>9}  {result['input']}"
+                   + (f": {result['error']}" if result['error'] else ''))
+
+            if result['status'] == 'converted':
+                directory = os.path.dirname(os.path.abspath(result['output']))
+                manifests[directory][os.path.basename(result['output'])] = {
+                    'source': result['digest'],
+                    'input': os.path.abspath(result['input']),
+                }
+
+    for directory, manifest in manifests.items():
+        save_manifest(directory, manifest)
+
+    return results
+
+
+def run_import(inputs, db_path, report=print, use_mmap=False):
+    """Import inputs one after another into a SQLite database
+
+    SQLite has a single writer, so files are imported in this process.
+    Results have the same shape as run_batch()'s.
+    """
+    results = []
+    for input_path in inputs:
+        started = time.perf_counter()
+        result = {
+            'input': input_path, 'output': db_path, 'status': 'converted', 'digest': None,
+            'transactions': 0, 'bytes': 0, 'seconds': 0.0, 'error': None,
+        }
+        try:
+            result['bytes'] = os.path.getsize(input_path)
+            outcome = export_to_sqlite(input_path, db_path, use_mmap)
+            result['transactions'] = outcome['transactions']
+            if outcome['status'] == 'skipped':
+                result['status'] = 'skipped'
+        except Exception as e:
+            result['status'] = 'failed'
+            result['error'] = str(e)
+        result['seconds'] = time.perf_counter() - started
+        results.append(result)
+        report(f"{result['status']:>9}  {result['input']}"
+               + (f": {result['error']}" if result['error'] else ''))
+    return results
+
+
+def summarize(results, elapsed):
+    """Build the aggregate throughput and error summary"""
+    converted = [r for r in results if r['status'] == 'converted']
+    skipped = [r for r in results if r['status'] == 'skipped']
+    failed = [r for r in results if r['status'] == 'failed']
+    transactions = sum(r['transactions'] for r in converted)
+    megabytes = sum(r['bytes'] for r in converted) / (1024 * 1024)
+    elapsed = max(elapsed, 1e-9)
+
+    lines = [
+        f"Files: {len(converted)} converted, {len(skipped)} up to date, {len(failed)} failed",
+        f"Transactions: {transactions:,} in {elapsed:.2f}s "
+        f"({transactions / elapsed:,.0f} tx/s, {megabytes / elapsed:,.2f} MB/s)",
+    ]
+    if failed:
+        lines.append("Errors:")
+        lines.extend(f"  {r['input']}: {r['error']}" for r in failed)
+    return '\n'.join(lines)
+
+
+def save_profile(report_path, results, elapsed):
+    """Write the per-file profile reports of a batch as JSON"""
+    report = {
+        'elapsed_seconds': elapsed,
+        'files': [
+            {'input': r['input'], 'status': r['status'], 'profile': r.get('profile')}
+            for r in results
+        ],
+    }
+    with open(report_path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog='mt940-convert',
+        description="Convert MT940 statements (.sta) to CSV in parallel."
+    )
+    parser.add_argument('inputs', nargs='+', help="input files or glob patterns")
+    parser.add_argument('-o', '--output-dir', help="directory for CSV files (default: next to each input)")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument('-f', '--force', action='store_true',
+                        help="convert even if the output is up to date")
+    parser.add_argument('--mmap', action='store_true',
+                        help="scan inputs through a memory map (for very large files)")
+    parser.add_argument('--sqlite', metavar='DB',
+                        help="import into this SQLite database instead of writing CSV files")
+    parser.add_argument('--memory-budget', type=float, metavar='MB',
+                        help="convert each file within this many megabytes of buffers")
+    parser.add_argument('--profile', metavar='REPORT',
+                        help="time each conversion stage and write the reports to this JSON file")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="with --profile, also record peak memory (slower)")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    inputs = expand_inputs(args.inputs)
+    if not inputs:
+        print("No input files matched", file=sys.stderr)
+        return 2
+
+    if args.memory_budget and args.mmap:
+        print("--mmap and --memory-budget can't be combined: the bounded converter reads in chunks",
+              file=sys.stderr)
+        return 2
+
+    if args.sqlite and args.profile:
+        print("--profile can't be combined with --sqlite: imports are not profiled", file=sys.stderr)
+        return 2
+
+    memory_budget = int(args.memory_budget * 1024 * 1024) if args.memory_budget else None
+    started = time.perf_counter()
+    if args.sqlite:
+        results = run_import(inputs, args.sqlite, use_mmap=args.mmap)
+    else:
+        results = run_batch(inputs, args.output_dir, args.jobs, args.force, use_mmap=args.mmap,
+                            profile=bool(args.profile), trace_memory=args.trace_memory,
+                            memory_budget=memory_budget)
+    elapsed = time.perf_counter() - started
+    print(summarize(results, elapsed))
+    if args.profile:
+        save_profile(args.profile, results, elapsed)
+
+    return 1 if any(r['status'] == 'failed' for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
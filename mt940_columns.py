@@ -0,0 +1,188 @@
+"""Columnar transaction store
+
+Instead of one dict and one datetime per row, transactions are appended to
+typed arrays: dates as int32 days since 1970-01-01, amounts as int64
+hundredths, and currency/reference as dictionary-encoded int32 codes.
+read_mt940() turns those buffers into a pandas DataFrame without copying
+the numeric data. numpy and pandas are only imported when a DataFrame is
+actually requested.
+
+With details=True the typed :86: subfields (DETAIL_COLUMNS) are kept as
+dictionary-encoded columns too, so counterparty IBANs or end-to-end
+references can be looked up without re-parsing descriptions.
+"""
+import io
+from array import array
+from datetime import datetime
+
+from mt940_encoding import SAMPLE_BYTES, sniff_stream
+from mt940_fields import AMOUNT_SCALE, DETAIL_COLUMNS, subfield_details
+from mt940_parser import ENCODING, MT940ParseError, MT940Parser
+
+EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+
+
+class DictionaryColumn:
+    """String column stored as int32 codes into a list of distinct values"""
+
+    def __init__(self):
+        self.values = []
+        self.codes = array('i')
+        self.index = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, position):
+        return self.values[self.codes[position]]
+
+    def append(self, value):
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+
+class TransactionColumns:
+    """Array-backed transaction table filled by ColumnarParser"""
+
+    def __init__(self, details=False):
+        self.dates = array('i')      # days since 1970-01-01
+        self.amounts = array('q')    # signed hundredths
+        self.currencies = DictionaryColumn()
+        self.references = DictionaryColumn()
+        self.descriptions = []
+        # Statement each row belongs to, as an index into self.statements
+        self.statement_ids = array('i')
+        self.statements = []
+        # One DictionaryColumn per DETAIL_COLUMNS entry, if kept
+        self.details = tuple(DictionaryColumn() for _ in DETAIL_COLUMNS) if details else None
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def append(self, days, amount_minor, currency, reference, description, statement_id=0,
+               details=None):
+        self.dates.append(days)
+        self.amounts.append(amount_minor)
+        self.currencies.append(currency)
+        self.references.append(reference)
+        self.descriptions.append(description)
+        self.statement_ids.append(statement_id)
+        if self.details is not None:
+            for column, value in zip(self.details, details or ('',) * len(DETAIL_COLUMNS)):
+                column.append(value)
+
+    def row(self, position):
+        """Return one transaction in the dict form used by the rest of the app"""
+        transaction = {
+            'Date': datetime.fromordinal(self.dates[position] + EPOCH_ORDINAL),
+            'Amount': self.amounts[position] / AMOUNT_SCALE,
+            'Currency': self.currencies[position],
+            'Bank Reference': self.references[position],
+            'Description': self.descriptions[position],
+        }
+        if self.details is not None:
+            for name, column in zip(DETAIL_COLUMNS, self.details):
+                transaction[name] = column[position]
+        return transaction
+
+    def to_numpy(self):
+        """Return the numeric columns as NumPy views over the array buffers"""
+        import numpy as np
+
+        # frombuffer shares memory with the arrays; nothing is copied
+        return {
+            'days': np.frombuffer(self.dates, dtype=np.int32),
+            'amount_minor': np.frombuffer(self.amounts, dtype=np.int64),
+            'currency_codes': np.frombuffer(self.currencies.codes, dtype=np.int32),
+            'reference_codes': np.frombuffer(self.references.codes, dtype=np.int32),
+            'statement_ids': np.frombuffer(self.statement_ids, dtype=np.int32),
+        }
+
+    def to_dataframe(self, minor_units=False):
+        """Materialise the columns as a pandas DataFrame
+
+        With minor_units=True the Amount column is the int64 hundredths
+        buffer itself; otherwise it is converted to float currency units.
+        """
+        import numpy as np
+        import pandas as pd
+
+        arrays = self.to_numpy()
+        # datetime64 needs 64-bit storage, so the int32 days are widened once
+        dates = arrays['days'].astype('datetime64[D]').astype('datetime64[s]')
+        amounts = arrays['amount_minor']
+        if not minor_units:
+            amounts = amounts / AMOUNT_SCALE
+
+        data = {
+            'Date': dates,
+            'Amount': amounts,
+            'Currency': pd.Categorical.from_codes(arrays['currency_codes'], self.currencies.values),
+            'Bank Reference': pd.Categorical.from_codes(arrays['reference_codes'], self.references.values),
+            'Description': np.array(self.descriptions, dtype=object),
+        }
+        if self.details is not None:
+            for name, column in zip(DETAIL_COLUMNS, self.details):
+                codes = np.frombuffer(column.codes, dtype=np.int32)
+                data[name] = pd.Categorical.from_codes(codes, column.values)
+        return pd.DataFrame(data, copy=False)
+
+
+class ColumnarParser(MT940Parser):
+    """MT940Parser that appends rows to a TransactionColumns table
+
+    The :86: subfields are parsed only if the table keeps details.
+    """
+
+    def __init__(self, columns=None, details=False):
+        super().__init__()
+        self.columns = TransactionColumns(details) if columns is None else columns
+        self.keep_subfields = self.columns.details is not None
+
+    def make_transaction(self, fields, statement, description, subfields=None):
+        statements = self.columns.statements
+        if not statements or statements[-1] is not statement:
+            statements.append(statement)
+        self.columns.append(
+            fields.value_date.toordinal() - EPOCH_ORDINAL,
+            fields.amount_minor,
+            statement.currency or 'Unknown',
+            fields.bank_reference,
+            description,
+            len(statements) - 1,
+            None if subfields is None else subfield_details(subfields),
+        )
+        return None
+
+
+def read_columns(fileobj, details=False):
+    """Parse an open MT940 file into a TransactionColumns table"""
+    parser = ColumnarParser(details=details)
+    if not isinstance(fileobj, io.TextIOBase):
+        parser.text_encoding, fileobj = sniff_stream(fileobj)
+    for line in fileobj:
+        if isinstance(line, bytes):
+            line = line.decode(ENCODING)
+        parser.feed(line)
+    parser.close()
+    return parser.columns
+
+
+def read_mt940(file_path, minor_units=False, details=False):
+    """Parse an MT940 file straight into a pandas DataFrame
+
+    details=True adds the DETAIL_COLUMNS parsed from the :86: subfields.
+    """
+    try:
+        with open(file_path, 'rb', buffering=SAMPLE_BYTES) as file:
+            columns = read_columns(file, details)
+    except OSError as e:
+        raise MT940ParseError(f"Error parsing MT940 file: {str(e)}") from e
+
+    if not len(columns):
+        raise MT940ParseError("Error parsing MT940 file: No transactions found in the file")
+
+    return columns.to_dataframe(minor_units=minor_units)
@@ -1,10 +1,125 @@
 import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog, messagebox
-import pandas as pd
-from datetime import datetime
+import importlib
+import importlib.util
+import json
+import multiprocessing
 import os
-import re
+import queue
+import sys
+import threading
+import time
+
+# Only the widgets are imported up front. The parsing engines are imported
+# where they are used, so the window is drawn before they load, and
+# preload() fetches them in the background once it is up
+from virtual_table import VirtualTable
+
+# Seconds between progress messages sent by the worker thread
+PROGRESS_INTERVAL = 0.1
+
+# Milliseconds between polls of the worker queue from the Tk loop
+POLL_INTERVAL = 50
+
+# Seconds to wait for the worker to stop when the window is closed
+WORKER_JOIN_TIMEOUT = 2.0
+
+# Files at least this large are converted in bounded memory instead of
+# being parsed (and cached) whole first
+BOUNDED_MIN_BYTES = 256 * 1024 * 1024
+
+# Set to a directory to keep parsed statements between sessions
+CACHE_DIR = os.environ.get('MT940_CACHE_DIR')
+
+# Milliseconds after the window is up before engine modules are preloaded
+PRELOAD_DELAY = 200
+
+# Imported by preload(), in this order; pandas and pyarrow are left to
+# the features that need them
+PRELOAD_MODULES = (
+    'mt940_profile',
+    'mt940_view',
+    'mt940_cache',
+    'mt940_csv',
+    'mt940_bounded',
+    'mt940_parquet',
+    'numpy',
+)
+
+# Set to a file path to have main() record when the window was shown and
+# quit (used by bench_startup.py)
+STARTUP_REPORT = os.environ.get('MT940_STARTUP_REPORT')
+
+# Parquet export needs pyarrow; the button stays disabled without it
+PARQUET_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+# Modules that must not be loaded before the window is shown
+HEAVY_MODULES = ('numpy', 'pandas', 'pyarrow', 'mt940_cache', 'mt940_csv', 'mt940_parquet')
+
+
+class WorkCancelled(Exception):
+    """Raised inside the worker thread when the user cancels"""
+
+
+def run_worker(work, events, cancel_event):
+    """Thread body: run work(report) and post its outcome to events
+
+    The worker never touches Tk. Progress is throttled by time and posted
+    to the queue, which the Tk loop drains with root.after.
+    """
+    last_report = [0.0]
+
+    def report(message, progress):
+        if cancel_event.is_set():
+            raise WorkCancelled()
+        now = time.monotonic()
+        if now - last_report[0] >= PROGRESS_INTERVAL:
+            last_report[0] = now
+            events.put(('progress', message, progress))
+
+    try:
+        result = work(report)
+    except WorkCancelled:
+        events.put(('cancelled',))
+    except Exception as e:
+        events.put(('error', e))
+    else:
+        events.put(('done', result))
+
+
+# Heading suffixes marking the sorted column
+SORT_ARROWS = {False: ' \u25b2', True: ' \u25bc'}
+
+
+class TransactionRows:
+    """Sequence view formatting transactions into table rows on demand
+
+    order, if given, is the sequence of transaction indices to show
+    (a TransactionView's sorted and filtered order).
+    """
+
+    def __init__(self, transactions, order=None):
+        self.transactions = transactions
+        self.order = order
+
+    def __len__(self):
+        if self.order is not None:
+            return len(self.order)
+        return len(self.transactions)
+
+    def __getitem__(self, index):
+        if self.order is not None:
+            index = self.order[index]
+        trans = self.transactions[index]
+        return (
+            trans['Date'].strftime('%Y-%m-%d'),
+            f"{round(trans['Amount'], 2):,.2f}",
+            trans['Currency'],
+            trans['Bank Reference'],
+            trans['Description']
+        )
+
 
 class MT940Converter:
     def __init__(self, root):
@@ -15,6 +130,19 @@ class MT940Converter:
         # Initialize file path and state flags
         self.loaded_file_path = None
         self.is_closing = False
+
+        # Parsed statements shared by Show and Convert, created on first use
+        self._cache = None
+        
+        # Profile of the running Show/Convert, if profiling is on
+        self.profile = None
+
+        # Sort and filter state of the displayed transactions
+        self.view = None
+
+        # Background worker state
+        self.worker = None
+        self.cancel_event = threading.Event()
         
         # Bind window closing event
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -98,6 +226,35 @@ class MT940Converter:
             state='disabled'
         )
         self.convert_button.pack(side='left', padx=10)
+
+        # Parquet export button (disabled until a file is loaded, and for good
+        # when pyarrow is missing)
+        self.parquet_button = tk.Button(
+            button_frame,
+            text="Export Parquet" if PARQUET_AVAILABLE else "Export Parquet (needs pyarrow)",
+            command=self.export_parquet,
+            font=('system', 12),
+            bg='#9C27B0',
+            fg='white',
+            padx=20,
+            pady=10,
+            state='disabled'
+        )
+        self.parquet_button.pack(side='left', padx=10)
+
+        # Cancel button (enabled while a worker is running)
+        self.cancel_button = tk.Button(
+            button_frame,
+            text="Cancel",
+            command=self.cancel_worker,
+            font=('system', 12),
+            bg='#f44336',
+            fg='white',
+            padx=20,
+            pady=10,
+            state='disabled'
+        )
+        self.cancel_button.pack(side='left', padx=10)
         
         # Status label
         self.status_label = tk.Label(
@@ -117,37 +274,52 @@ class MT940Converter:
             maximum=100
         )
         self.progress_bar.pack(fill='x', pady=10)
-        
-        # Create Treeview for transactions
-        self.tree_frame = tk.Frame(main_frame)
-        self.tree_frame.pack(expand=True, fill='both')
-        
-        # Create scrollbars
-        y_scrollbar = ttk.Scrollbar(self.tree_frame)
-        y_scrollbar.pack(side='right', fill='y')
-        
-        x_scrollbar = ttk.Scrollbar(self.tree_frame, orient='horizontal')
-        x_scrollbar.pack(side='bottom', fill='x')
-        
-        # Create Treeview
-        self.tree = ttk.Treeview(
-            self.tree_frame,
-            columns=('Date', 'Amount', 'Currency', 'Bank Reference', 'Description'),
-            show='headings',
-            yscrollcommand=y_scrollbar.set,
-            xscrollcommand=x_scrollbar.set
+
+        # Date and amount range filters over the displayed transactions
+        self.filter_frame = tk.Frame(main_frame, bg='#f0f0f0')
+        self.filter_frame.pack(fill='x', pady=(0, 5))
+        self.filter_entries = {}
+        for key, text in (
+            ('date_from', "From (YYYY-MM-DD)"),
+            ('date_to', "To"),
+            ('amount_min', "Min amount"),
+            ('amount_max', "Max amount"),
+        ):
+            tk.Label(self.filter_frame, text=text, font=('system', 9), bg='#f0f0f0').pack(side='left', padx=(10, 2))
+            entry = tk.Entry(self.filter_frame, width=12)
+            entry.pack(side='left')
+            entry.bind('<Return>', lambda event: self.apply_filter())
+            self.filter_entries[key] = entry
+
+        self.filter_button = tk.Button(
+            self.filter_frame,
+            text="Filter",
+            command=self.apply_filter,
+            font=('system', 9)
+        )
+        self.filter_button.pack(side='left', padx=(10, 2))
+        self.clear_filter_button = tk.Button(
+            self.filter_frame,
+            text="Clear",
+            command=self.clear_filter,
+            font=('system', 9)
         )
+        self.clear_filter_button.pack(side='left')
+
+        self.filter_label = tk.Label(self.filter_frame, text="", font=('system', 9), bg='#f0f0f0')
+        self.filter_label.pack(side='left', padx=10)
         
-        # Configure scrollbars
-        y_scrollbar.config(command=self.tree.yview)
-        x_scrollbar.config(command=self.tree.xview)
+        # Create virtual table for transactions; only the visible rows
+        # exist as Treeview items, so huge statements load instantly
+        self.table = VirtualTable(
+            main_frame,
+            columns=('Date', 'Amount', 'Currency', 'Bank Reference', 'Description')
+        )
+        self.tree = self.table.tree
         
-        # Configure column headings
-        self.tree.heading('Date', text='Date')
-        self.tree.heading('Amount', text='Amount')
-        self.tree.heading('Currency', text='Currency')
-        self.tree.heading('Bank Reference', text='Bank Reference')
-        self.tree.heading('Description', text='Description')
+        # Configure column headings; clicking one sorts by it
+        for column in ('Date', 'Amount', 'Currency', 'Bank Reference', 'Description'):
+            self.tree.heading(column, text=column, command=lambda column=column: self.sort_by(column))
         
         # Configure column widths
         self.tree.column('Date', width=100)
@@ -156,7 +328,7 @@ class MT940Converter:
         self.tree.column('Bank Reference', width=150)
         self.tree.column('Description', width=400)
         
-        self.tree.pack(expand=True, fill='both')
+        self.table.pack(expand=True, fill='both')
         
         # Summary frame
         self.summary_frame = tk.Frame(main_frame, bg='#f0f0f0')
@@ -170,6 +342,27 @@ class MT940Converter:
             bg='#f0f0f0'
         )
         self.total_label.pack(side='left', padx=10)
+
+        # Profiling toggle and the last run's stage timings
+        self.profile_var = tk.BooleanVar(value=False)
+        self.profile_check = tk.Checkbutton(
+            self.summary_frame,
+            text="Profile",
+            variable=self.profile_var,
+            font=('system', 9),
+            bg='#f0f0f0'
+        )
+        self.profile_check.pack(side='right', padx=10)
+
+        self.profile_label = tk.Label(
+            self.summary_frame,
+            text="",
+            font=('system', 8),
+            bg='#f0f0f0',
+            justify='left',
+            wraplength=450
+        )
+        self.profile_label.pack(side='right', padx=10)
         
         # Version info
         version_label = tk.Label(
@@ -184,6 +377,9 @@ class MT940Converter:
         """Handle window closing event"""
         try:
             self.is_closing = True
+            self.cancel_worker()
+            if self.worker is not None:
+                self.worker.join(timeout=WORKER_JOIN_TIMEOUT)
             self.root.quit()
             self.root.destroy()
         except Exception:
@@ -194,28 +390,14 @@ class MT940Converter:
                 pass
 
     def update_ui(self, message, progress):
-        """Helper method to update UI and ensure updates are processed"""
+        """Helper method to update the status label and progress bar"""
         if self.is_closing:
             return
             
         try:
-            # Force update the status label
             if message:
                 self.status_label.configure(text=message)
-                self.status_label.update()
-            
-            # Force update the progress bar
             self.progress_var.set(progress)
-            self.progress_bar.update()
-            
-            # Force a complete UI refresh
-            if not self.is_closing:
-                self.root.update_idletasks()
-                self.root.update()
-            
-            # Add a small delay to ensure updates are processed
-            if not self.is_closing:
-                self.root.after(100)
             
         except Exception as e:
             if not self.is_closing:
@@ -231,7 +413,9 @@ class MT940Converter:
         if file_path:
             try:
                 # Reset UI state
-                self.tree.delete(*self.tree.get_children())
+                self.table.clear()
+                self.view = None
+                self.filter_label.configure(text="")
                 self.total_label.configure(text="")
                 self.status_label.configure(text="")
                 self.progress_var.set(0)
@@ -258,6 +442,10 @@ class MT940Converter:
                 
                 self.convert_button.configure(state='normal')
                 self.convert_button.update()
+
+                if PARQUET_AVAILABLE:
+                    self.parquet_button.configure(state='normal')
+                    self.parquet_button.update()
                 
                 # Final UI refresh
                 self.root.update_idletasks()
@@ -276,6 +464,9 @@ class MT940Converter:
                 
                 self.convert_button.configure(state='disabled')
                 self.convert_button.update()
+
+                self.parquet_button.configure(state='disabled')
+                self.parquet_button.update()
                 
                 self.loaded_file_path = None
                 
@@ -284,288 +475,353 @@ class MT940Converter:
                 self.root.update()
 
     def show_transactions(self):
-        """Display transactions in the treeview"""
+        """Parse the file in the background and display its transactions"""
         if not self.loaded_file_path:
             messagebox.showerror("Error", "Please load a file first")
             return
             
-        try:
-            if self.is_closing:
-                return
-                
-            self.update_ui("Reading file...", 10)
-            
-            # Clear existing items
-            if not self.is_closing:
-                self.tree.delete(*self.tree.get_children())
-                self.tree.update()
-            
-            # Parse the file
-            transactions = self.parse_mt940(self.loaded_file_path)
-            
-            if self.is_closing:
-                return
-                
-            self.update_ui("Displaying transactions...", 75)
-            
-            # Add transactions to treeview
-            total_amount = 0
-            currency = None
-            
-            for trans in transactions:
-                if self.is_closing:
-                    return
-                    
-                # Format date
-                date_str = trans['Date'].strftime('%Y-%m-%d')
-                
-                # Format amount
-                amount = round(trans['Amount'], 2)
-                total_amount += amount
-                
-                # Get currency
-                if not currency:
-                    currency = trans['Currency']
-                
-                # Insert into treeview
-                if not self.is_closing:
-                    self.tree.insert('', 'end', values=(
-                        date_str,
-                        f"{amount:,.2f}",
-                        trans['Currency'],
-                        trans['Bank Reference'],
-                        trans['Description']
-                    ))
-                
-                # Force treeview update periodically
-                if not self.is_closing and len(self.tree.get_children()) % 10 == 0:
-                    self.tree.update()
-            
-            if self.is_closing:
-                return
-                
-            # Update summary with forced refresh
-            summary_text = f"Total Transactions: {len(transactions)} | Total Amount: {total_amount:,.2f} {currency}"
-            self.total_label.configure(text=summary_text)
-            self.total_label.update()
-            
-            self.update_ui(
-                f"Successfully displayed {len(transactions)} transactions.",
-                100
-            )
+        if self.is_closing:
+            return
             
-        except Exception as e:
-            if not self.is_closing:
-                error_msg = f"Failed to display transactions: {str(e)}"
-                self.status_label.configure(text=error_msg)
-                self.status_label.update()
-                
-                messagebox.showerror("Error", error_msg)
-                self.show_button.configure(state='disabled')
-                self.show_button.update()
+        self.update_ui("Reading file...", 10)
+        
+        # Clear existing items
+        self.table.clear()
+        self.view = None
+        self.filter_label.configure(text="")
+        self.total_label.configure(text="")
+        
+        file_path = self.loaded_file_path
+        profile = self.start_profile()
+        self.start_worker(
+            lambda report: self.load_view(file_path, report, profile),
+            self.display_transactions,
+            "Failed to display transactions"
+        )
+
+    def load_view(self, file_path, report, profile=None):
+        """Worker: parse the file and precompute its sort orders"""
+        from mt940_profile import stage
+        from mt940_view import TransactionView
+
+        parsed = self.parse_mt940(file_path, report, profile)
+        report("Indexing for sort and filter...", 75)
+        with stage(profile, 'index'):
+            view = TransactionView(parsed.transactions)
+        return parsed, view
+
+    def display_transactions(self, result):
+        """Show parsed transactions in the virtual table"""
+        from mt940_profile import stage
+
+        self.update_ui("Displaying transactions...", 75)
+        parsed, self.view = result
+        transactions = parsed.transactions
+        for entry in self.filter_entries.values():
+            entry.delete(0, 'end')
+        
+        with stage(self.profile, 'display'):
+            # Rows are formatted lazily as they scroll into view
+            self.show_view()
+        self.finish_profile()
+        
+        # Totals per currency were collected while parsing
+        summary_text = f"Total Transactions: {len(transactions)} | {parsed.summary.currency_summary()}"
+        self.total_label.configure(text=summary_text)
+        
+        self.update_ui(
+            f"Successfully displayed {len(transactions)} transactions.",
+            100
+        )
+
+    def show_view(self):
+        """Point the table at the view's current order and mark the sorted heading"""
+        view = self.view
+        self.table.set_rows(TransactionRows(view.transactions, view.order))
+        for column in ('Date', 'Amount', 'Currency', 'Bank Reference', 'Description'):
+            arrow = SORT_ARROWS[view.descending] if column == view.sort_column else ''
+            self.tree.heading(column, text=column + arrow)
+        if view.mask is None:
+            self.filter_label.configure(text="")
+        else:
+            self.filter_label.configure(text=f"Showing {len(view):,} of {len(view.transactions):,}")
+
+    def sort_by(self, column):
+        """Heading click: sort ascending, then descending, then back to file order"""
+        view = self.view
+        if view is None:
+            return
+        if view.sort_column != column:
+            view.sort(column)
+        elif not view.descending:
+            view.sort(column, descending=True)
+        else:
+            view.sort(None)
+        self.show_view()
+
+    def apply_filter(self):
+        """Filter the displayed rows by the date and amount range entries"""
+        if self.view is None:
+            return
+        from mt940_view import parse_amount, parse_date
+
+        values = {key: entry.get() for key, entry in self.filter_entries.items()}
+        try:
+            bounds = {
+                'date_from': parse_date(values['date_from']),
+                'date_to': parse_date(values['date_to']),
+                'amount_min': parse_amount(values['amount_min']),
+                'amount_max': parse_amount(values['amount_max']),
+            }
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid filter: {str(e)}")
+            return
+        self.view.filter(**bounds)
+        self.show_view()
+
+    def clear_filter(self):
+        for entry in self.filter_entries.values():
+            entry.delete(0, 'end')
+        if self.view is not None:
+            self.view.filter()
+            self.show_view()
 
     def convert_file(self):
-        """Convert the loaded file to CSV"""
+        """Convert the loaded file to CSV in the background"""
         if not self.loaded_file_path:
             messagebox.showerror("Error", "Please load a file first")
             return
             
-        try:
-            if self.is_closing:
-                return
-                
-            self.update_ui("Reading file...", 10)
+        if self.is_closing:
+            return
             
+        self.update_ui("Reading file...", 10)
+        
+        file_path = self.loaded_file_path
+        total_size = os.path.getsize(file_path)
+        profile = self.start_profile()
+        if total_size >= BOUNDED_MIN_BYTES:
+            self.start_worker(
+                lambda report: self.convert_bounded(file_path, total_size, report, profile),
+                self.conversion_done,
+                "Failed to convert file"
+            )
+            return
+        
+        def work(report):
+            from mt940_csv import open_output, write_csv
+            from mt940_profile import stage
+
             # Parse the file
-            transactions = self.parse_mt940(self.loaded_file_path)
+            transactions = self.parse_mt940(file_path, report, profile).transactions
             
-            if self.is_closing:
-                return
-                
-            self.update_ui("Creating CSV file...", 75)
+            report("Creating CSV file...", 75)
             
             # Create output filename
-            output_path = os.path.splitext(self.loaded_file_path)[0] + '.csv'
-            
-            # Convert to DataFrame and save
-            df = pd.DataFrame(transactions)
-            df['Date'] = pd.to_datetime(df['Date']).dt.strftime('%Y-%m-%d')
-            df['Amount'] = pd.to_numeric(df['Amount']).round(2)
-            df.to_csv(output_path, index=False)
-            
-            if self.is_closing:
-                return
-                
-            success_msg = f"Success! Converted {len(transactions)} transactions.\nOutput saved to: {os.path.basename(output_path)}"
-            self.status_label.configure(text=success_msg)
-            self.status_label.update()
-            
-            self.progress_var.set(100)
-            self.progress_bar.update()
+            output_path = os.path.splitext(file_path)[0] + '.csv'
             
-            if not self.is_closing:
-                messagebox.showinfo("Success", f"File converted successfully!\nSaved to: {os.path.basename(output_path)}")
-            
-        except Exception as e:
-            if not self.is_closing:
-                error_msg = f"Failed to convert file: {str(e)}"
-                self.status_label.configure(text=error_msg)
-                self.status_label.update()
-                
-                messagebox.showerror("Error", error_msg)
+            # Stream rows to the CSV file
+            with stage(profile, 'csv'), open_output(output_path) as output:
+                write_csv(transactions, output)
+            return output_path, len(transactions)
+        
+        self.start_worker(work, self.conversion_done, "Failed to convert file")
 
-    def extract_currency(self, line):
-        """Extract currency from balance field"""
-        try:
-            # Find the currency code using regex
-            # Currency codes are always 3 uppercase letters
-            match = re.search(r'[DC](\d{6})([A-Z]{3})', line)
-            if match:
-                return match.group(2)
-        except Exception as e:
-            print(f"Warning: Error extracting currency from '{line}': {str(e)}")
-        return None
+    def convert_bounded(self, file_path, total_size, report, profile=None):
+        """Worker: stream a very large file to CSV without holding its transactions"""
+        from mt940_bounded import convert_bounded
 
-    def parse_amount(self, amount_str):
-        """Parse amount from MT940 transaction line"""
-        try:
-            # First, find the debit/credit indicator and amount
-            debit = 'D' in amount_str
-            credit = 'C' in amount_str
-            
-            if not (debit or credit):
-                return 0.0
-                
-            # Extract the numeric part using regex
-            # Look for amount after D or C indicator, followed by N or F
-            amount_match = re.search(r'[DC]N?(\d+,\d*|\d*\.\d*|\d+)', amount_str)
-            if not amount_match:
-                # Try alternative format where amount comes after reference
-                amount_match = re.search(r'NONREF//.*?(\d+,\d*|\d*\.\d*|\d+)', amount_str)
-            
-            if amount_match:
-                amount_str = amount_match.group(1)
-                # Convert to float, handling both comma and dot as decimal separator
-                amount = float(amount_str.replace(',', '.'))
-                # Apply sign based on debit/credit
-                if debit:
-                    amount = -amount  # Debit (outgoing) is negative
-                else:
-                    amount = amount  # Credit (incoming) is positive
-                return amount
-                
-            return 0.0
-            
-        except Exception as e:
-            print(f"Warning: Error parsing amount from '{amount_str}': {str(e)}")
-            return 0.0
-
-    def parse_mt940(self, file_path):
-        """Optimized MT940 parsing"""
-        transactions = []
-        current_transaction = None
-        description = []
-        currency = None
-        
-        # Pre-compile transaction markers
-        transaction_start = ':61:'
-        currency_markers = [':60F:', ':60M:', ':62F:', ':62M:']  # Various balance fields that contain currency
-        description_start = ':86:'
-        desc_markers = {'<00', '<20', '<21', '<22', '<23', '<27', '<28', '<29'}
+        def progress(consumed):
+            percent = min(consumed / total_size, 1.0)
+            report(f"Converting... {percent:.0%}", 10 + (percent * 85))
+
+        output_path = os.path.splitext(file_path)[0] + '.csv'
+        return output_path, convert_bounded(file_path, output_path, progress=progress, profile=profile)
+
+    def export_parquet(self):
+        """Stream the loaded file to a Parquet file in the background"""
+        if not self.loaded_file_path:
+            messagebox.showerror("Error", "Please load a file first")
+            return
+
+        if self.is_closing:
+            return
+
+        self.update_ui("Reading file...", 10)
+
+        file_path = self.loaded_file_path
+        total_size = os.path.getsize(file_path) or 1
+
+        def work(report):
+            from mt940_parquet import convert_to_parquet
+
+            def progress(consumed):
+                percent = min(consumed / total_size, 1.0)
+                report(f"Writing Parquet... {percent:.0%}", 10 + (percent * 85))
+
+            output_path = os.path.splitext(file_path)[0] + '.parquet'
+            # Row groups are written as the file is parsed; nothing is cached
+            count = convert_to_parquet(file_path, output_path, progress=progress, details=True)
+            return output_path, count
+
+        self.start_worker(work, self.conversion_done, "Failed to export file")
+
+    def conversion_done(self, result):
+        """Report a finished conversion"""
+        self.finish_profile()
+        output_path, count = result
+        success_msg = f"Success! Converted {count} transactions.\nOutput saved to: {os.path.basename(output_path)}"
+        self.update_ui(success_msg, 100)
+        
+        messagebox.showinfo("Success", f"File converted successfully!\nSaved to: {os.path.basename(output_path)}")
+
+    def start_worker(self, work, on_done, error_prefix):
+        """Run work(report) on a worker thread, then on_done(result) on the Tk thread"""
+        if self.worker is not None and self.worker.is_alive():
+            return
+        
+        events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.worker = threading.Thread(
+            target=run_worker,
+            args=(work, events, self.cancel_event),
+            daemon=True
+        )
+        self.set_busy(True)
+        self.worker.start()
+        self.root.after(POLL_INTERVAL, self.poll_worker, events, on_done, error_prefix)
+
+    def poll_worker(self, events, on_done, error_prefix):
+        """Drain worker events from the Tk loop"""
+        if self.is_closing:
+            return
         
         try:
-            with open(file_path, 'r', encoding='iso-8859-1') as file:
-                lines = file.readlines()
+            while True:
+                event = events.get_nowait()
+                kind = event[0]
                 
-            total_lines = len(lines)
-            for i, line in enumerate(lines):
-                # Update progress every 100 lines
-                if i % 100 == 0:
-                    self.update_ui(f"Processing line {i}/{total_lines}...", 10 + (i/total_lines * 65))
-                
-                line = line.strip()
-                if not line:
+                if kind == 'progress':
+                    self.update_ui(event[1], event[2])
                     continue
                 
-                # Extract currency from balance fields
-                if not currency:  # Only try to find currency if we haven't found it yet
-                    for marker in currency_markers:
-                        if line.startswith(marker):
-                            found_currency = self.extract_currency(line)
-                            if found_currency:
-                                currency = found_currency
-                                break
-                
-                if line.startswith(transaction_start):
-                    if current_transaction:
-                        current_transaction['Description'] = ' '.join(description)
-                        transactions.append(current_transaction)
-                        description = []
-                    
-                    # Parse transaction header
-                    try:
-                        # Extract date and reference
-                        date_str = line[4:10]  # Date is always 6 characters after :61:
-                        
-                        # Parse amount and type (D/C)
-                        amount_str = line[10:]  # Skip date part
-                        amount = self.parse_amount(amount_str)
-                        
-                        # Get reference - handle both formats
-                        ref = ''
-                        if 'NTRFNONREF//' in line:
-                            # PLN format - reference is after the second amount
-                            parts = line.split('//')
-                            if len(parts) > 1:
-                                ref = parts[-1].strip()
-                        elif 'NERRNONREF//' in line:
-                            # USD format - reference is between // and next space
-                            parts = line.split('//')
-                            if len(parts) > 1:
-                                ref = parts[1].split()[0].strip()
-                        elif '//' in line:
-                            # Generic format
-                            ref = line.split('//')[-1].strip()
-                        
-                        current_transaction = {
-                            'Date': datetime.strptime(date_str, '%y%m%d'),
-                            'Amount': amount,
-                            'Currency': currency or 'Unknown',
-                            'Bank Reference': ref
-                        }
-                    except Exception as e:
-                        print(f"Warning: Error parsing transaction line: {line}")
-                        print(f"Error details: {str(e)}")
-                        continue
-                
-                elif line.startswith(description_start):
-                    continue
-                
-                elif current_transaction:
-                    # Process description lines more efficiently
-                    if line.startswith('<'):
-                        marker = line[:3]
-                        if marker in desc_markers:
-                            description.append(line[3:].strip())
-                    else:
-                        description.append(line.strip())
-            
-            # Add the last transaction
-            if current_transaction:
-                current_transaction['Description'] = ' '.join(description)
-                transactions.append(current_transaction)
-            
-            if not transactions:
-                raise Exception("No transactions found in the file")
-            
-            return transactions
+                self.set_busy(False)
+                if kind != 'done':
+                    self.drop_profile()
+                if kind == 'done':
+                    on_done(event[1])
+                elif kind == 'cancelled':
+                    self.update_ui("Cancelled.", 0)
+                else:
+                    error_msg = f"{error_prefix}: {str(event[1])}"
+                    self.update_ui(error_msg, 0)
+                    messagebox.showerror("Error", error_msg)
+                return
+        except queue.Empty:
+            pass
         
-        except Exception as e:
-            raise Exception(f"Error parsing MT940 file: {str(e)}")
+        self.root.after(POLL_INTERVAL, self.poll_worker, events, on_done, error_prefix)
+
+    def cancel_worker(self):
+        """Ask the running worker to stop at its next progress report"""
+        self.cancel_event.set()
+
+    def set_busy(self, busy):
+        """Toggle buttons while a worker is running"""
+        state = 'disabled' if busy else 'normal'
+        self.load_button.configure(state=state)
+        self.show_button.configure(state=state)
+        self.convert_button.configure(state=state)
+        self.parquet_button.configure(state=state if PARQUET_AVAILABLE else 'disabled')
+        self.cancel_button.configure(state='normal' if busy else 'disabled')
+
+    def start_profile(self):
+        """Start timing the next Show/Convert if profiling is switched on"""
+        self.drop_profile()
+        if self.profile_var.get():
+            from mt940_profile import Profile
+
+            self.profile = Profile(trace_memory=True, callback=self.show_profile).start()
+        return self.profile
+
+    def finish_profile(self):
+        if self.profile is not None:
+            self.profile.finish()
+            self.profile = None
+
+    def drop_profile(self):
+        """Stop the running profile without showing it (cancelled or failed run)"""
+        if self.profile is not None:
+            # Also stops tracemalloc, which would otherwise slow every later parse
+            self.profile.stop()
+            self.profile = None
+
+    def show_profile(self, report):
+        """Show a finished profile in the status panel"""
+        from mt940_profile import format_report
+
+        self.profile_label.configure(text=format_report(report))
+
+    def parse_mt940(self, file_path, report, profile=None):
+        """Parse the file (or reuse a cached parse), reporting progress through report
+
+        Returns an mt940_cache.ParsedFile of the transactions and their totals.
+        """
+        total_size = os.path.getsize(file_path) or 1
+
+        def progress(consumed):
+            percent = min(consumed / total_size, 1.0)
+            report(f"Processing... {percent:.0%}", 10 + (percent * 65))
+
+        return self.cache.parse_summary(file_path, progress=progress, profile=profile)
+
+    @property
+    def cache(self):
+        """The ParseCache, created by the first parse rather than at startup"""
+        if self._cache is None:
+            from mt940_cache import ParseCache
+
+            self._cache = ParseCache(cache_dir=CACHE_DIR)
+        return self._cache
+
+    def start_preload(self):
+        """Import the engine modules on a background thread"""
+        threading.Thread(target=preload, daemon=True).start()
+
+
+def preload(modules=PRELOAD_MODULES):
+    """Import modules ahead of first use; missing optional ones are skipped"""
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def report_startup(root, report_path):
+    """Once the window has been drawn, record the time and loaded modules, then quit"""
+    def shown():
+        root.update_idletasks()
+        record = {
+            'shown': time.time(),
+            'loaded': [name for name in HEAVY_MODULES if name in sys.modules],
+        }
+        with open(report_path, 'w', encoding='utf-8') as file:
+            json.dump(record, file)
+        root.destroy()
+
+    root.after_idle(shown)
+
 
 def main():
+    # Frozen builds re-execute this entry point in parse worker processes
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = MT940Converter(root)
+    if STARTUP_REPORT:
+        report_startup(root, STARTUP_REPORT)
+    else:
+        root.after(PRELOAD_DELAY, app.start_preload)
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,166 @@
+"""Code page detection and transcoding of emitted text
+
+Pekao exports are written in a Polish code page: CP852 (DOS) or
+Windows-1250, occasionally ISO-8859-2 or UTF-8. The parsers read every line
+as ISO-8859-1, which maps each byte to one character, so tags, dates and
+amounts parse the same whatever the code page. Only the text that is
+emitted (descriptions and :86: subfields) is transcoded to the file's real
+code page, through the codec's charmap table, when a transaction is
+finished. Lines that are skipped are never decoded twice.
+
+detect_encoding() picks the code page from a byte sample by counting
+bytes that decode to Polish letters under each candidate.
+"""
+
+# Used when a sample has no bytes outside ASCII to go by
+DEFAULT_TEXT_ENCODING = 'cp852'
+
+# Single-byte candidates, in order of preference on a tie
+CANDIDATES = ('cp852', 'cp1250', 'iso-8859-2')
+
+# Bytes read from the start of a file for detection
+SAMPLE_BYTES = 64 * 1024
+
+# Codec the parsers read lines with
+LINE_ENCODING = 'iso-8859-1'
+
+POLISH_LETTERS = frozenset('ąćęłńóśźżĄĆĘŁŃÓŚŹŻ')
+
+
+def detect_encoding(sample, default=DEFAULT_TEXT_ENCODING):
+    """Guess the code page of a byte sample
+
+    Returns 'utf-8' for valid UTF-8 with multi-byte characters, otherwise
+    the single-byte candidate under which the most high bytes are Polish
+    letters. Pure ASCII (or no Polish letters at all) gives default.
+    """
+    sample = bytes(sample)
+    if sample.isascii():
+        return default
+    try:
+        # A cut at the end of the sample may split a character
+        sample.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        if e.start >= len(sample) - 3 and e.reason == 'unexpected end of data':
+            return 'utf-8'
+
+    high = bytes(sorted({byte for byte in sample if byte >= 0x80}))
+    counts = {byte: sample.count(byte) for byte in high}
+    best, best_score = default, 0
+    for encoding in CANDIDATES:
+        letters = high.decode(encoding, errors='replace')
+        score = sum(counts[byte] for byte, letter in zip(high, letters) if letter in POLISH_LETTERS)
+        if score > best_score:
+            best, best_score = encoding, score
+    return best
+
+
+def detect_file_encoding(file_path, default=DEFAULT_TEXT_ENCODING):
+    """detect_encoding() over the first SAMPLE_BYTES of a file"""
+    with open(file_path, 'rb') as file:
+        return detect_encoding(file.read(SAMPLE_BYTES), default)
+
+
+def sniff_encoding(fileobj, default=DEFAULT_TEXT_ENCODING):
+    """Detect the code page of an open binary file without consuming it
+
+    Uses peek() when the file has it, so only what it has buffered is
+    looked at, otherwise reads a sample and seeks back. A stream that can
+    do neither gets default; use sniff_stream() for those.
+    """
+    peek = getattr(fileobj, 'peek', None)
+    if peek is not None:
+        return detect_encoding(peek(SAMPLE_BYTES), default)
+    if _seekable(fileobj):
+        position = fileobj.tell()
+        sample = fileobj.read(SAMPLE_BYTES)
+        fileobj.seek(position)
+        return detect_encoding(sample, default)
+    return default
+
+
+def sniff_stream(fileobj, default=DEFAULT_TEXT_ENCODING):
+    """Detect the code page of any open binary stream
+
+    Returns (encoding, stream) and the caller reads from the returned
+    stream. It is fileobj itself when the sample could be peeked or read
+    and seeked back; otherwise the sample is read ahead and replayed in
+    front of the rest by a ReplayReader.
+    """
+    if hasattr(fileobj, 'peek') or _seekable(fileobj):
+        return sniff_encoding(fileobj, default), fileobj
+    sample = b''
+    while len(sample) < SAMPLE_BYTES:
+        chunk = fileobj.read(SAMPLE_BYTES - len(sample))
+        if not chunk:
+            break
+        sample += chunk
+    return detect_encoding(sample, default), ReplayReader(sample, fileobj)
+
+
+def _seekable(fileobj):
+    seekable = getattr(fileobj, 'seekable', None)
+    try:
+        return seekable is not None and seekable()
+    except (OSError, ValueError):
+        return False
+
+
+class ReplayReader:
+    """Binary stream of head followed by the rest of fileobj
+
+    Supports what the parsers use: read(), readline() and iterating
+    over lines.
+    """
+
+    def __init__(self, head, fileobj):
+        self.head = head
+        self.fileobj = fileobj
+
+    def read(self, size=-1):
+        if not self.head:
+            return self.fileobj.read(size)
+        if size is None or size < 0:
+            data, self.head = self.head + self.fileobj.read(), b''
+            return data
+        data, self.head = self.head[:size], self.head[size:]
+        return data
+
+    def readline(self, size=-1):
+        if size is None or size < 0:
+            size = -1
+        if not self.head:
+            return self.fileobj.readline(size)
+        end = self.head.find(b'\n') + 1 or len(self.head)
+        if size >= 0:
+            end = min(end, size)
+        line, self.head = self.head[:end], self.head[end:]
+        if line.endswith(b'\n') or self.head or len(line) == size:
+            return line
+        # The line runs on past the replayed bytes
+        return line + self.fileobj.readline(size - len(line) if size >= 0 else -1)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+
+def transcode(text, encoding):
+    """Re-decode text read as ISO-8859-1 in its real code page
+
+    Text that cannot have come from ISO-8859-1 (it was decoded some other
+    way already) is returned unchanged.
+    """
+    if encoding is None or text.isascii():
+        return text
+    try:
+        raw = text.encode(LINE_ENCODING)
+    except UnicodeEncodeError:
+        return text
+    return raw.decode(encoding, errors='replace')
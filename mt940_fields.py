@@ -0,0 +1,200 @@
+"""Positional tokenizers for MT940 fields
+
+:61: statement lines and :60x:/:62x:/:64:/:65: balance lines have a fixed
+layout, so they are read left to right in a single pass instead of being
+searched repeatedly for markers. Amounts are kept as integer minor units
+(hundredths) to avoid float rounding in totals. :86: blocks are split into
+their <NN subfields with one split on '<'.
+"""
+import re
+from collections import namedtuple
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+
+# Amounts are stored as integer hundredths of the currency unit
+AMOUNT_SCALE = 100
+
+# :61: layout - 6!n[4!n]2a[1!a]15d1!a3!c16x[//16x][34x]
+StatementLine = namedtuple('StatementLine', [
+    'value_date',           # datetime
+    'entry_date',           # datetime or None
+    'mark',                 # 'C', 'D', 'RC', 'RD' (or 'EC'/'ED' in MT942)
+    'funds_code',           # third letter of the currency code, or ''
+    'amount_minor',         # signed int, credits positive
+    'transaction_type',     # e.g. 'NTRF', 'NERR'
+    'customer_reference',
+    'bank_reference',
+    'supplementary',
+])
+
+# :60F:/:62F:/:64: layout - 1!a6!n3!a15d
+Balance = namedtuple('Balance', ['mark', 'date', 'currency', 'amount_minor'])
+
+# Typed :86: subfields, in output order
+DETAIL_COLUMNS = (
+    'Transaction Code',         # text before the first subfield, e.g. '8300'
+    'Counterparty Bank',        # <30
+    'Counterparty Account',     # <31
+    'Counterparty Name',        # <32 + <33
+    'Counterparty IBAN',        # <38
+    'End-to-End Reference',     # <63 without its 'REF' prefix
+)
+
+# Debits and reversals of credits reduce the balance
+_NEGATIVE_MARKS = frozenset({'D', 'RC', 'ED'})
+
+_AMOUNT_RE = re.compile(r'\d[\d,]*')
+
+
+@lru_cache(maxsize=4096)
+def parse_date(yymmdd):
+    """Parse a YYMMDD date using the same century pivot as strptime's %y
+
+    Statements repeat a handful of dates many times, so results are cached.
+    """
+    year = int(yymmdd[0:2])
+    year += 1900 if year >= 69 else 2000
+    return datetime(year, int(yymmdd[2:4]), int(yymmdd[4:6]))
+
+
+@lru_cache(maxsize=4096)
+def parse_entry_date(value_date, mmdd):
+    """Place an MMDD entry date in the year closest to its value date"""
+    month, day = int(mmdd[0:2]), int(mmdd[2:4])
+    year = value_date.year
+    # Entries booked in December for a January value date belong to the previous year
+    if month == 12 and value_date.month == 1:
+        year -= 1
+    elif month == 1 and value_date.month == 12:
+        year += 1
+    return datetime(year, month, day)
+
+
+def parse_minor_units(text):
+    """Parse a comma-decimal MT940 amount into integer hundredths"""
+    whole, _, fraction = text.partition(',')
+    if len(fraction) <= 2:
+        return int(whole or '0') * AMOUNT_SCALE + int((fraction + '00')[:2])
+    # More precision than we store; round half up to the nearest hundredth
+    exact = Decimal(f"{whole or '0'}.{fraction}") * AMOUNT_SCALE
+    return int(exact.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def tokenize_statement_line(line):
+    """Split a :61: line into typed fields in one left-to-right pass
+
+    Raises ValueError if the line does not follow the :61: layout.
+    """
+    pos = 4 if line.startswith(':61:') else 0
+
+    value_date = parse_date(line[pos:pos + 6])
+    pos += 6
+
+    # Optional entry date (MMDD)
+    entry_date = None
+    if line[pos:pos + 4].isdigit():
+        entry_date = parse_entry_date(value_date, line[pos:pos + 4])
+        pos += 4
+
+    # Debit/credit mark, possibly a reversal
+    if line[pos:pos + 1] in ('R', 'E'):
+        mark = line[pos:pos + 2]
+        pos += 2
+    else:
+        mark = line[pos:pos + 1]
+        pos += 1
+    if mark not in ('C', 'D', 'RC', 'RD', 'EC', 'ED'):
+        raise ValueError(f"invalid debit/credit mark {mark!r}")
+
+    # Optional funds code
+    funds_code = ''
+    if line[pos:pos + 1].isalpha():
+        funds_code = line[pos]
+        pos += 1
+
+    # Amount runs until the transaction type letter
+    match = _AMOUNT_RE.match(line, pos)
+    if match is None:
+        raise ValueError("missing amount")
+    amount_minor = parse_minor_units(match.group())
+    pos = match.end()
+    if mark in _NEGATIVE_MARKS:
+        amount_minor = -amount_minor
+
+    transaction_type = line[pos:pos + 4]
+    pos += 4
+
+    # Customer reference up to //, bank reference up to 16 characters after it
+    rest = line[pos:]
+    customer_reference, separator, tail = rest.partition('//')
+    bank_reference = ''
+    supplementary = ''
+    if separator:
+        bank_reference = tail[:16].strip()
+        supplementary = tail[16:].strip()
+
+    return StatementLine(
+        value_date,
+        entry_date,
+        mark,
+        funds_code,
+        amount_minor,
+        transaction_type,
+        customer_reference.strip(),
+        bank_reference,
+        supplementary,
+    )
+
+
+def tokenize_balance(line):
+    """Split a balance line (:60F:, :62F:, :64: ...) into typed fields
+
+    Raises ValueError if the line does not follow the balance layout.
+    """
+    pos = line.index(':', 1) + 1 if line.startswith(':') else 0
+    mark = line[pos]
+    if mark not in ('C', 'D'):
+        raise ValueError(f"invalid debit/credit mark {mark!r}")
+    date = parse_date(line[pos + 1:pos + 7])
+    currency = line[pos + 7:pos + 10]
+    if len(currency) != 3 or not currency.isalpha():
+        raise ValueError(f"invalid currency {currency!r}")
+    amount_minor = parse_minor_units(line[pos + 10:].strip())
+    if mark == 'D':
+        amount_minor = -amount_minor
+    return Balance(mark, date, currency, amount_minor)
+
+
+def parse_subfields(block):
+    """Split the text of a :86: block into a {code: value} map
+
+    block is the field content with its lines joined without separators.
+    Text before the first '<' is stored under ''. A value wrapped over
+    several occurrences of the same code is concatenated.
+    """
+    parts = block.split('<')
+    subfields = {'': parts[0].strip()}
+    for part in parts[1:]:
+        code = part[:2]
+        if code in subfields:
+            subfields[code] += part[2:]
+        else:
+            subfields[code] = part[2:]
+    return subfields
+
+
+def subfield_details(subfields):
+    """Return the DETAIL_COLUMNS values of a subfield map ('' when absent)"""
+    get = subfields.get
+    reference = get('63', '')
+    if reference.startswith('REF'):
+        reference = reference[3:]
+    return (
+        get('', ''),
+        get('30', ''),
+        get('31', ''),
+        get('32', '') + get('33', ''),
+        get('38', ''),
+        reference,
+    )
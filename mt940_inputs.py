@@ -0,0 +1,11 @@
+"""Input path helpers shared by the command-line tools"""
+import glob
+
+
+def expand_inputs(patterns):
+    """Expand glob patterns ourselves, since Windows shells do not"""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        paths.extend(matches)
+    return paths
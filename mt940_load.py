@@ -0,0 +1,136 @@
+"""Load-test client for mt940_server.py
+
+Usage: python mt940_load.py statement.sta [--url http://127.0.0.1:8940] [-c 8] [-n 100]
+
+Posts the same statement n times from c concurrent connections, reads each
+streamed response to the end, and prints throughput, latency percentiles,
+time to first byte and the server's /metrics afterwards.
+"""
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from mt940_server import DEFAULT_PORT, percentile
+
+# Response bytes read per recv while draining a stream
+READ_CHUNK = 64 * 1024
+
+
+def post_statement(connection, body, output_format='csv'):
+    """Send one upload; returns (status, response bytes, seconds to first byte)"""
+    started = time.perf_counter()
+    connection.request('POST', f'/convert?format={output_format}', body=body,
+                       headers={'Content-Type': 'application/octet-stream'})
+    response = connection.getresponse()
+    first = response.read1(READ_CHUNK) if response.status == 200 else response.read()
+    first_byte = time.perf_counter() - started
+    size = len(first)
+    while True:
+        chunk = response.read1(READ_CHUNK)
+        if not chunk:
+            break
+        size += len(chunk)
+    return response.status, size, first_byte
+
+
+def get_json(host, port, path):
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    try:
+        connection.request('GET', path)
+        return json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+
+
+def run_load(url, body, requests=100, concurrency=8, output_format='csv'):
+    """Post body requests times over concurrency connections; returns a summary dict"""
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or DEFAULT_PORT
+    latencies = []
+    first_bytes = []
+    statuses = {}
+    errors = []
+    received = [0]
+    lock = threading.Lock()
+    remaining = [requests]
+
+    def client():
+        connection = http.client.HTTPConnection(host, port, timeout=300)
+        try:
+            while True:
+                with lock:
+                    if not remaining[0]:
+                        return
+                    remaining[0] -= 1
+                started = time.perf_counter()
+                try:
+                    status, size, first_byte = post_statement(connection, body, output_format)
+                except (OSError, http.client.HTTPException) as e:
+                    with lock:
+                        errors.append(str(e))
+                    connection.close()
+                    connection = http.client.HTTPConnection(host, port, timeout=300)
+                    continue
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    first_bytes.append(first_byte)
+                    statuses[status] = statuses.get(status, 0) + 1
+                    received[0] += size
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = max(time.perf_counter() - started, 1e-9)
+
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed,
+        'upload_mb_per_second': len(latencies) * len(body) / elapsed / (1024 * 1024),
+        'response_bytes': received[0],
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'errors': errors,
+        'latency_seconds': {
+            'p50': percentile(latencies, 0.50),
+            'p95': percentile(latencies, 0.95),
+            'p99': percentile(latencies, 0.99),
+            'max': max(latencies) if latencies else None,
+        },
+        'first_byte_seconds': {
+            'p50': percentile(first_bytes, 0.50),
+            'p95': percentile(first_bytes, 0.95),
+        },
+        'server': get_json(host, port, '/metrics'),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test an mt940_server instance")
+    parser.add_argument('statement', help="statement file to upload")
+    parser.add_argument('--url', default=f'http://127.0.0.1:{DEFAULT_PORT}')
+    parser.add_argument('-n', '--requests', type=int, default=100)
+    parser.add_argument('-c', '--concurrency', type=int, default=8)
+    parser.add_argument('--format', choices=('csv', 'json'), default='csv')
+    args = parser.parse_args(argv)
+
+    with open(args.statement, 'rb') as file:
+        body = file.read()
+    summary = run_load(args.url, body, args.requests, args.concurrency, args.format)
+    json.dump(summary, sys.stdout, indent=2)
+    print()
+    return 0 if summary['statuses'] == {'200': args.requests} else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
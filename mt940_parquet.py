@@ -0,0 +1,160 @@
+"""Chunked Parquet export
+
+Transactions are collected in the typed arrays of mt940_columns and
+written as a Parquet row group every ROW_GROUP_ROWS rows, so memory stays
+bounded however large the statement is. Columns keep their types: Date is
+a date32, Amount a decimal(18, 2) built from the integer hundredths, and
+Currency and Bank Reference are dictionary encoded, as are the :86:
+subfield columns when details are requested. pyarrow is only imported
+when a Parquet file is written.
+"""
+import os
+import sys
+from array import array
+
+from mt940_columns import ColumnarParser, TransactionColumns
+from mt940_encoding import SAMPLE_BYTES, sniff_encoding
+from mt940_fields import DETAIL_COLUMNS
+from mt940_parser import COLUMNS, ENCODING, PROGRESS_EVERY, MT940ParseError
+from mt940_scan import iter_transactions_mmap
+
+# Rows per Parquet row group
+ROW_GROUP_ROWS = 64 * 1024
+
+# Amount precision; 18 digits fit every int64 number of hundredths we store
+AMOUNT_PRECISION = 18
+AMOUNT_DIGITS = 2
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise MT940ParseError("Parquet export requires pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def parquet_schema(pa, details=False):
+    strings = pa.dictionary(pa.int32(), pa.string())
+    fields = [
+        pa.field(COLUMNS[0], pa.date32()),
+        pa.field(COLUMNS[1], pa.decimal128(AMOUNT_PRECISION, AMOUNT_DIGITS)),
+        pa.field(COLUMNS[2], strings),
+        pa.field(COLUMNS[3], strings),
+        pa.field(COLUMNS[4], pa.string()),
+    ]
+    if details:
+        fields.extend(pa.field(name, strings) for name in DETAIL_COLUMNS)
+    return pa.schema(fields)
+
+
+def _decimal_buffer(amounts):
+    """Lay int64 hundredths out as 128-bit two's complement decimal values"""
+    words = array('q', bytes(16 * len(amounts)))
+    # Each value is a low word holding the amount and a high word of sign bits
+    words[0::2] = amounts
+    words[1::2] = array('q', [-1 if amount < 0 else 0 for amount in amounts])
+    if sys.byteorder == 'big':
+        # Big-endian hosts store the high word first
+        words[0::2], words[1::2] = words[1::2], words[0::2]
+    return words
+
+
+def record_batch(pa, columns):
+    """Convert a TransactionColumns table into an Arrow record batch
+
+    The date and code arrays are wrapped without copying.
+    """
+    count = len(columns)
+
+    def int_array(arrow_type, values):
+        return pa.Array.from_buffers(arrow_type, count, [None, pa.py_buffer(values)])
+
+    def dictionary_array(column):
+        return pa.DictionaryArray.from_arrays(
+            int_array(pa.int32(), column.codes), pa.array(column.values, pa.string())
+        )
+
+    amount_type = pa.decimal128(AMOUNT_PRECISION, AMOUNT_DIGITS)
+    arrays = [
+        int_array(pa.date32(), columns.dates),
+        int_array(amount_type, _decimal_buffer(columns.amounts)),
+        dictionary_array(columns.currencies),
+        dictionary_array(columns.references),
+        pa.array(columns.descriptions, pa.string()),
+    ]
+    details = columns.details is not None
+    if details:
+        arrays.extend(dictionary_array(column) for column in columns.details)
+    return pa.RecordBatch.from_arrays(arrays, schema=parquet_schema(pa, details))
+
+
+class ParquetParser(ColumnarParser):
+    """ColumnarParser that hands each full chunk to a Parquet writer"""
+
+    def __init__(self, writer, row_group_rows=ROW_GROUP_ROWS, details=False):
+        super().__init__(details=details)
+        self.details = details
+        self.writer = writer
+        self.row_group_rows = row_group_rows
+        self.count = 0
+
+    def make_transaction(self, fields, statement, description, subfields=None):
+        super().make_transaction(fields, statement, description, subfields)
+        if len(self.columns) >= self.row_group_rows:
+            self.flush()
+        return None
+
+    def flush(self):
+        """Write the collected rows as one row group and start a new chunk"""
+        if not len(self.columns):
+            return
+        pa = import_pyarrow()
+        self.writer.write_batch(record_batch(pa, self.columns))
+        self.count += len(self.columns)
+        self.columns = TransactionColumns(self.details)
+
+
+def convert_to_parquet(input_path, output_path, row_group_rows=ROW_GROUP_ROWS, use_mmap=False,
+                       progress=None, details=False):
+    """Stream an MT940 file to a Parquet file, one row group per chunk
+
+    details=True adds the DETAIL_COLUMNS parsed from the :86: subfields.
+    progress, if given, is called every PROGRESS_EVERY lines with the
+    number of bytes consumed (line mode only). Returns the number of
+    transactions written. Raises MT940ParseError if pyarrow is missing or
+    the file has no transactions. The output file is removed on any
+    failure, including an exception raised by progress.
+    """
+    pa = import_pyarrow()
+    try:
+        with pa.parquet.ParquetWriter(output_path, parquet_schema(pa, details)) as writer:
+            parser = ParquetParser(writer, row_group_rows, details)
+            if use_mmap:
+                for _ in iter_transactions_mmap(input_path, parser):
+                    pass
+            else:
+                with open(input_path, 'rb', buffering=SAMPLE_BYTES) as source:
+                    parser.text_encoding = sniff_encoding(source)
+                    consumed = 0
+                    for i, line in enumerate(source):
+                        consumed += len(line)
+                        if progress is not None and i % PROGRESS_EVERY == 0:
+                            progress(consumed)
+                        parser.feed(line.decode(ENCODING))
+            parser.close()
+            parser.flush()
+    except BaseException as e:
+        # Don't leave a truncated file behind
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        if isinstance(e, (OSError, ValueError, pa.ArrowException)):
+            raise MT940ParseError(f"Error parsing MT940 file: {str(e)}") from e
+        raise
+
+    if not parser.count:
+        os.remove(output_path)
+        raise MT940ParseError("Error parsing MT940 file: No transactions found in the file")
+
+    return parser.count
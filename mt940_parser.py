@@ -0,0 +1,277 @@
+"""Headless MT940 parsing engine
+
+Shared by the GUI, the CSV converter and batch jobs. Nothing in here
+imports tkinter or pandas, so it can run on servers without a display.
+"""
+import io
+import re
+
+from mt940_encoding import LINE_ENCODING, detect_file_encoding, sniff_stream, transcode
+from mt940_fields import (
+    AMOUNT_SCALE, DETAIL_COLUMNS, parse_subfields, subfield_details, tokenize_balance,
+    tokenize_statement_line,
+)
+
+# Every reader splits and tokenizes lines in this byte-transparent codec;
+# emitted text is then transcoded to the file's code page (mt940_encoding)
+ENCODING = LINE_ENCODING
+
+# Stripped from lines; exactly bytes.strip()'s set, so both engines agree on
+# code page bytes that are whitespace in Unicode (0x85, 0xA0)
+BLANKS = ' \t\n\r\x0b\x0c'
+
+# Output columns, in CSV order
+COLUMNS = ('Date', 'Amount', 'Currency', 'Bank Reference', 'Description')
+
+# Field tags
+TRANSACTION_TAG = '61'
+DESCRIPTION_TAG = '86'
+OPENING_TAGS = frozenset({'60F', '60M'})
+CLOSING_TAGS = frozenset({'62F', '62M'})
+AVAILABLE_TAG = '64'
+DESCRIPTION_MARKERS = frozenset({'<00', '<20', '<21', '<22', '<23', '<27', '<28', '<29'})
+
+# A line starting with one of these is a new field (:20:, :28C:, :NS: ...)
+_TAG_RE = re.compile(r':(\d\d[A-Z]?|NS):')
+
+# How often (in lines) the progress callback is invoked
+PROGRESS_EVERY = 100
+
+
+class MT940ParseError(Exception):
+    """Raised when a statement file cannot be parsed"""
+
+
+class Statement:
+    """Header fields and balances of one statement in a file"""
+
+    def __init__(self, reference=None):
+        self.reference = reference     # :20:
+        self.account = None            # :25:
+        self.sequence = None           # :28C:
+        self.currency = None
+        self.opening = None            # :60F:/:60M: Balance
+        self.closing = None            # :62F:/:62M: Balance
+        self.available = None          # :64: Balance
+
+    def __repr__(self):
+        return (f"Statement(reference={self.reference!r}, account={self.account!r}, "
+                f"sequence={self.sequence!r}, currency={self.currency!r})")
+
+
+class MT940Parser:
+    """Line-at-a-time MT940 state machine
+
+    Feed it stripped or unstripped lines with feed(); every completed
+    transaction is returned as soon as the next field starts, and close()
+    returns the one still open at the end of input. Only the transaction
+    being built is held in memory.
+
+    Each :20: starts a new Statement, which collects its own account,
+    sequence number, currency and balances. Transactions take the
+    currency of the statement they belong to.
+
+    Subclasses can override make_transaction() to build something other
+    than the default dict, or to store the row and return None, and
+    new_statement() to observe statement boundaries.
+
+    With keep_subfields set, the :86: block of each transaction is also
+    split into a subfield map and passed to make_transaction() as a
+    fourth argument.
+
+    Lines are expected as read with ENCODING. With text_encoding set (the
+    readers set it from detect_encoding()), descriptions and subfields are
+    transcoded to that code page as each transaction is finished.
+
+    With an aggregator (mt940_aggregate.Aggregator) set, every finished
+    transaction is also added to its running totals.
+    """
+
+    keep_subfields = False
+    text_encoding = None
+    aggregator = None
+
+    def __init__(self):
+        self.statement = None
+        self.current = None
+        self.description = []
+        # Raw :86: lines of the open transaction, once its :86: is seen
+        self.block = None
+
+    def feed(self, line):
+        """Consume one line, returning a completed transaction or None"""
+        line = line.strip(BLANKS)
+        if not line:
+            return None
+
+        match = _TAG_RE.match(line) if line[0] == ':' else None
+        if match is None:
+            if self.current is not None:
+                self.add_description(line)
+                if self.block is not None:
+                    self.block.append(line)
+            return None
+
+        tag = match.group(1)
+        if tag == DESCRIPTION_TAG:
+            # Subfields follow on the next lines
+            if self.keep_subfields and self.current is not None:
+                self.block = [line[match.end():]]
+            return None
+
+        # Any other field ends the open transaction
+        completed = self._finish()
+        if tag == TRANSACTION_TAG:
+            self.current = self._start(line)
+        else:
+            self.field(tag, line[match.end():])
+        return completed
+
+    def close(self):
+        """Finish input, returning the last open transaction or None"""
+        return self._finish()
+
+    def add_description(self, line):
+        """Add one stripped line following :61:/:86: to the description"""
+        if line.startswith('<'):
+            if line[:3] in DESCRIPTION_MARKERS:
+                self.description.append(line[3:].strip(BLANKS))
+        else:
+            self.description.append(line)
+
+    def field(self, tag, value):
+        """Record a statement-level field"""
+        if tag == '20':
+            self.new_statement(value.strip())
+            return
+
+        statement = self.current_statement()
+        if tag in ('25', '28C', '28'):
+            setattr(statement, 'account' if tag == '25' else 'sequence', value.strip())
+        elif tag in OPENING_TAGS or tag in CLOSING_TAGS or tag == AVAILABLE_TAG:
+            try:
+                balance = tokenize_balance(value.strip())
+            except (ValueError, IndexError):
+                return
+            if tag in OPENING_TAGS:
+                statement.opening = balance
+            elif tag in CLOSING_TAGS:
+                statement.closing = balance
+            else:
+                statement.available = balance
+            if not statement.currency:
+                statement.currency = balance.currency
+
+    def new_statement(self, reference):
+        """Start a new statement; returns it"""
+        self.statement = Statement(reference)
+        return self.statement
+
+    def current_statement(self):
+        """Return the open statement, creating one for headerless input"""
+        if self.statement is None:
+            return self.new_statement(None)
+        return self.statement
+
+    def make_transaction(self, fields, statement, description, subfields=None):
+        """Build the value emitted for one transaction
+
+        With subfields, the DETAIL_COLUMNS are added to the dict.
+        """
+        transaction = {
+            'Date': fields.value_date,
+            'Amount': fields.amount_minor / AMOUNT_SCALE,
+            'Currency': statement.currency or 'Unknown',
+            'Bank Reference': fields.bank_reference,
+            'Description': description,
+        }
+        if subfields is not None:
+            transaction.update(zip(DETAIL_COLUMNS, subfield_details(subfields)))
+        return transaction
+
+    def _start(self, line):
+        try:
+            fields = tokenize_statement_line(line)
+        except (ValueError, IndexError) as e:
+            print(f"Warning: Error parsing transaction line: {line}")
+            print(f"Error details: {str(e)}")
+            return None
+        return fields, self.current_statement()
+
+    def _finish(self):
+        current = self.current
+        transaction = None
+        if current is not None:
+            fields, statement = current
+            if self.aggregator is not None:
+                self.aggregator.add_transaction(fields, statement)
+            description = transcode(' '.join(self.description), self.text_encoding)
+            if self.keep_subfields:
+                block = transcode(''.join(self.block), self.text_encoding) if self.block else ''
+                subfields = parse_subfields(block) if block else {}
+                transaction = self.make_transaction(fields, statement, description, subfields)
+            else:
+                transaction = self.make_transaction(fields, statement, description)
+        self.current = None
+        self.description = []
+        self.block = None
+        return transaction
+
+
+def iter_transactions(fileobj, progress=None, subfields=False, profile=None, encoding=None,
+                      aggregator=None):
+    """Yield transactions one at a time from an open MT940 file
+
+    Accepts text or binary file objects. The code page of a binary file
+    is detected from its first buffered bytes unless encoding is given;
+    text files are taken as already decoded. progress, if given, is
+    called every PROGRESS_EVERY lines with the number of characters
+    consumed so far. With subfields=True each transaction also has the
+    DETAIL_COLUMNS keys. profile, an mt940_profile.Profile, times each
+    parsing stage. aggregator, an mt940_aggregate.Aggregator, is fed
+    every transaction as it is parsed.
+    """
+    parser = MT940Parser()
+    parser.keep_subfields = subfields
+    parser.aggregator = aggregator
+    if encoding is not None:
+        parser.text_encoding = encoding
+    elif not isinstance(fileobj, io.TextIOBase):
+        parser.text_encoding, fileobj = sniff_stream(fileobj)
+    if profile is not None:
+        yield from profile.run(parser, fileobj, progress)
+        return
+    consumed = 0
+    for i, line in enumerate(fileobj):
+        consumed += len(line)
+        if isinstance(line, bytes):
+            line = line.decode(ENCODING)
+        if progress is not None and i % PROGRESS_EVERY == 0:
+            progress(consumed)
+        transaction = parser.feed(line)
+        if transaction is not None:
+            yield transaction
+
+    transaction = parser.close()
+    if transaction is not None:
+        yield transaction
+
+
+def iter_file_transactions(file_path, progress=None, subfields=False, profile=None, aggregator=None):
+    """Open file_path and yield its transactions"""
+    with open(file_path, 'rb') as file:
+        yield from iter_transactions(file, progress, subfields, profile, detect_file_encoding(file_path),
+                                     aggregator)
+
+
+def parse_file(file_path, progress=None, subfields=False, profile=None, aggregator=None):
+    """Parse a whole MT940 file into a list of transactions"""
+    try:
+        transactions = list(iter_file_transactions(file_path, progress, subfields, profile, aggregator))
+    except OSError as e:
+        raise MT940ParseError(f"Error parsing MT940 file: {str(e)}") from e
+
+    if not transactions:
+        raise MT940ParseError("Error parsing MT940 file: No transactions found in the file")
+
+    return transactions
@@ -0,0 +1,203 @@
+"""Per-stage timing, counters and peak memory for parsing and conversion
+
+A Profile is passed down to the parsing, display and conversion paths,
+which then time their stages (reading, tokenizing, statement fields,
+description lines, emitting rows, writing CSV ...) and count lines, bytes
+and transactions. Nothing is measured when no Profile is given, so the
+normal paths keep their speed.
+
+    with Profile(trace_memory=True, callback=print) as profile:
+        transactions = parse_file('statement.sta', profile=profile)
+
+The report is a plain dict, ready for json.dump().
+"""
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+from mt940_parser import ENCODING, PROGRESS_EVERY
+
+# MT940Parser methods timed by instrument(), and the stage each one reports as
+PARSER_STAGES = (
+    ('_start', 'tokenize'),           # :61: line, including date parsing
+    ('field', 'fields'),              # :20:, :25:, :28C:, balances
+    ('add_description', 'describe'),  # lines after :61:/:86:
+    ('_finish', 'emit'),              # joining the description and building the row
+)
+
+# The mmap scanner (mt940_scan) skips feed(); it calls these directly
+SCAN_STAGES = (
+    ('field', 'fields'),
+    ('make_transaction', 'emit'),
+)
+
+
+def stage(profile, name):
+    """profile.stage(name), or a no-op context when profile is None"""
+    return nullcontext() if profile is None else profile.stage(name)
+
+
+class Profile:
+    """Collects stage timings, counters and optionally peak traced memory
+
+    callback, if given, receives the report when finish() is called (or the
+    with block ends).
+    """
+
+    def __init__(self, trace_memory=False, callback=None):
+        self.trace_memory = trace_memory
+        self.callback = callback
+        self.seconds = {}
+        self.calls = {}
+        self.counters = {}
+        self.started = None
+        self.wall_seconds = None
+        self.peak_memory = None
+        self.owns_tracing = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.finish()
+        return False
+
+    def start(self):
+        self.started = time.perf_counter()
+        if self.trace_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                self.owns_tracing = True
+        return self
+
+    def stop(self):
+        """Stop measuring (and tracing, if this profile started it); returns the report
+
+        Unlike finish(), the callback is not called, so a cancelled or
+        failed run can be dropped without reporting it.
+        """
+        if self.started is not None:
+            self.wall_seconds = time.perf_counter() - self.started
+        if self.trace_memory and tracemalloc.is_tracing():
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            if self.owns_tracing:
+                tracemalloc.stop()
+                self.owns_tracing = False
+        return self.report()
+
+    def finish(self):
+        """Stop measuring and hand the report to the callback"""
+        report = self.stop()
+        if self.callback is not None:
+            self.callback(report)
+        return report
+
+    def add(self, name, seconds, calls=1):
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + calls
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def timed(self, name, func):
+        """Wrap func so every call is added to stage name"""
+        clock = time.perf_counter
+
+        def wrapper(*args):
+            started = clock()
+            try:
+                return func(*args)
+            finally:
+                self.add(name, clock() - started)
+        return wrapper
+
+    def instrument(self, parser, stages=PARSER_STAGES):
+        """Time an MT940Parser's internal steps; returns the parser"""
+        for method, name in stages:
+            setattr(parser, method, self.timed(name, getattr(parser, method)))
+        return parser
+
+    def run(self, parser, fileobj, progress=None):
+        """iter_transactions() loop with reading timed apart from parsing"""
+        self.instrument(parser)
+        clock = time.perf_counter
+        lines = consumed = emitted = 0
+        reading = 0.0
+        iterator = iter(fileobj)
+        try:
+            while True:
+                started = clock()
+                line = next(iterator, None)
+                if line is None:
+                    break
+                consumed += len(line)
+                if isinstance(line, bytes):
+                    line = line.decode(ENCODING)
+                reading += clock() - started
+
+                if progress is not None and lines % PROGRESS_EVERY == 0:
+                    progress(consumed)
+                lines += 1
+                transaction = parser.feed(line)
+                if transaction is not None:
+                    emitted += 1
+                    yield transaction
+
+            transaction = parser.close()
+            if transaction is not None:
+                emitted += 1
+                yield transaction
+        finally:
+            self.add('read', reading, lines)
+            self.count('lines', lines)
+            self.count('bytes', consumed)
+            self.count('transactions', emitted)
+
+    def report(self):
+        stages = {
+            name: {'seconds': self.seconds[name], 'calls': self.calls[name]}
+            for name in self.seconds
+        }
+        return {
+            'wall_seconds': self.wall_seconds,
+            'stages': stages,
+            'counters': dict(self.counters),
+            'peak_memory_bytes': self.peak_memory,
+        }
+
+
+class _Stage:
+    """Context manager adding its elapsed time to one stage of a Profile"""
+
+    __slots__ = ('profile', 'name', 'started')
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.add(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def format_report(report):
+    """One-line summary of a report, slowest stage first"""
+    stages = sorted(report['stages'].items(), key=lambda item: -item[1]['seconds'])
+    parts = [f"{name} {timing['seconds']:.3f}s" for name, timing in stages]
+    counters = report['counters']
+    if 'transactions' in counters:
+        parts.append(f"{counters['transactions']:,} tx")
+    if 'lines' in counters:
+        parts.append(f"{counters['lines']:,} lines")
+    if report['peak_memory_bytes'] is not None:
+        parts.append(f"peak {report['peak_memory_bytes'] / (1024 * 1024):.1f} MB")
+    return ' | '.join(parts)
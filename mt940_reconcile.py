@@ -0,0 +1,210 @@
+"""Balance and sequence reconciliation across statement files
+
+Usage: python mt940_reconcile.py in/*.sta
+
+Every statement's opening (:60F:), closing (:62F:) and available (:64:)
+balances are recorded together with the amount of each transaction in
+typed arrays. reconcile() then checks, with NumPy over whole arrays
+rather than a Python loop per transaction, that
+
+- opening + sum(amounts) == closing for every statement, and
+- :28C: statement/sequence numbers continue without gaps or repeats per
+  account across all files.
+
+The available balance is kept on each Statement but not checked; it
+legitimately differs from the booked closing balance when funds are on
+hold.
+"""
+import argparse
+import sys
+from array import array
+from collections import namedtuple
+
+from mt940_fields import AMOUNT_SCALE
+from mt940_inputs import expand_inputs
+from mt940_parser import MT940ParseError, MT940Parser
+from mt940_scan import iter_transactions_mmap
+
+# One problem found by reconcile(); statement indexes into StatementLedger.statements,
+# and is None for a file that could not be parsed
+Issue = namedtuple('Issue', ['kind', 'statement', 'source', 'reference', 'account', 'sequence', 'detail'])
+
+
+class StatementLedger:
+    """Every statement seen, plus the amount and statement of every transaction"""
+
+    def __init__(self):
+        self.statements = []
+        self.sources = []              # file each statement came from
+        self.amounts = array('q')      # signed hundredths
+        self.statement_ids = array('i')
+
+    def __len__(self):
+        return len(self.statements)
+
+    def add_file(self, file_path):
+        """Parse one file into the ledger; a file that fails leaves nothing behind"""
+        parser = LedgerParser(self, file_path)
+        sizes = len(self.statements), len(self.amounts)
+        try:
+            for _ in iter_transactions_mmap(file_path, parser):
+                pass
+        except (OSError, ValueError) as e:
+            del self.statements[sizes[0]:], self.sources[sizes[0]:]
+            del self.amounts[sizes[1]:], self.statement_ids[sizes[1]:]
+            raise MT940ParseError(f"Error parsing MT940 file: {str(e)}") from e
+
+
+class LedgerParser(MT940Parser):
+    """MT940Parser that records statements and amounts into a StatementLedger"""
+
+    def __init__(self, ledger, source):
+        super().__init__()
+        self.ledger = ledger
+        self.source = source
+
+    def new_statement(self, reference):
+        statement = super().new_statement(reference)
+        self.ledger.statements.append(statement)
+        self.ledger.sources.append(self.source)
+        return statement
+
+    def make_transaction(self, fields, statement, description):
+        # The open statement is always the last one recorded
+        self.ledger.amounts.append(fields.amount_minor)
+        self.ledger.statement_ids.append(len(self.ledger.statements) - 1)
+        return None
+
+
+def parse_sequence(sequence):
+    """Split a :28C: value like '5' or '5/2' into (statement, page) numbers"""
+    if not sequence:
+        return None
+    number, _, page = sequence.partition('/')
+    try:
+        return int(number), int(page) if page else 1
+    except ValueError:
+        return None
+
+
+def _balances(np, statements, attribute):
+    """Amounts of one balance per statement, and a mask of where it is present"""
+    values = np.zeros(len(statements), dtype=np.int64)
+    present = np.zeros(len(statements), dtype=bool)
+    for i, statement in enumerate(statements):
+        balance = getattr(statement, attribute)
+        if balance is not None:
+            values[i] = balance.amount_minor
+            present[i] = True
+    return values, present
+
+
+def statement_totals(np, ledger):
+    """Sum the transaction amounts of each statement in one pass"""
+    totals = np.zeros(len(ledger), dtype=np.int64)
+    amounts = np.frombuffer(ledger.amounts, dtype=np.int64)
+    if not len(amounts):
+        return totals
+    ids = np.frombuffer(ledger.statement_ids, dtype=np.int32)
+    # Statement ids never decrease, so each statement is one contiguous run
+    starts = np.flatnonzero(np.concatenate(([True], ids[1:] != ids[:-1])))
+    totals[ids[starts]] = np.add.reduceat(amounts, starts)
+    return totals
+
+
+def reconcile(ledger):
+    """Check balances and sequence numbers, returning a list of Issue"""
+    import numpy as np
+
+    statements = ledger.statements
+    issues = []
+
+    def issue(kind, index, detail):
+        index = int(index)
+        statement = statements[index]
+        issues.append(Issue(kind, index, ledger.sources[index], statement.reference,
+                            statement.account, statement.sequence, detail))
+
+    totals = statement_totals(np, ledger)
+    opening, has_opening = _balances(np, statements, 'opening')
+    closing, has_closing = _balances(np, statements, 'closing')
+
+    for index in np.flatnonzero(~(has_opening & has_closing)):
+        missing = 'opening' if not has_opening[index] else 'closing'
+        issue('missing balance', index, f"no {missing} balance")
+
+    difference = opening + totals - closing
+    for index in np.flatnonzero(has_opening & has_closing & (difference != 0)):
+        issue('balance', index,
+              f"opening {opening[index] / AMOUNT_SCALE:.2f} + transactions {totals[index] / AMOUNT_SCALE:.2f} "
+              f"!= closing {closing[index] / AMOUNT_SCALE:.2f} (off by {difference[index] / AMOUNT_SCALE:.2f})")
+
+    _check_sequences(np, ledger, issue)
+    issues.sort(key=lambda item: item.statement)
+    return issues
+
+
+def _check_sequences(np, ledger, issue):
+    accounts = {}
+    keys = []
+    for index, statement in enumerate(ledger.statements):
+        parsed = parse_sequence(statement.sequence)
+        if statement.account is None or parsed is None:
+            continue
+        account = accounts.setdefault(statement.account, len(accounts))
+        keys.append((account, parsed[0], parsed[1], index))
+    if len(keys) < 2:
+        return
+
+    table = np.array(keys, dtype=np.int64)
+    account, number, page, index = table.T
+    order = np.lexsort((page, number, account))
+    account, number, page, index = account[order], number[order], page[order], index[order]
+
+    same_account = account[1:] == account[:-1]
+    next_page = (number[1:] == number[:-1]) & (page[1:] == page[:-1] + 1)
+    next_statement = (number[1:] == number[:-1] + 1) & (page[1:] == 1)
+    repeated = same_account & (number[1:] == number[:-1]) & (page[1:] == page[:-1])
+    gap = same_account & ~(next_page | next_statement | repeated)
+
+    for position in np.flatnonzero(repeated):
+        previous = index[position]
+        issue('duplicate sequence', index[position + 1],
+              f"same :28C: as statement {ledger.statements[previous].reference} "
+              f"in {ledger.sources[previous]}")
+    for position in np.flatnonzero(gap):
+        previous = index[position]
+        issue('sequence gap', index[position + 1],
+              f"previous :28C: for this account is {ledger.statements[previous].sequence} "
+              f"in {ledger.sources[previous]}")
+
+
+def format_issue(issue):
+    if issue.statement is None:
+        return f"{issue.source}: {issue.kind} - {issue.detail}"
+    return (f"{issue.source}: statement {issue.reference} account {issue.account} "
+            f"sequence {issue.sequence}: {issue.kind} - {issue.detail}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reconcile MT940 balances and sequence numbers")
+    parser.add_argument('inputs', nargs='+', help="input files or glob patterns")
+    args = parser.parse_args(argv)
+
+    ledger = StatementLedger()
+    unreadable = []
+    for input_path in expand_inputs(args.inputs):
+        try:
+            ledger.add_file(input_path)
+        except MT940ParseError as e:
+            unreadable.append(Issue('unreadable', None, input_path, None, None, None, str(e)))
+
+    issues = unreadable + reconcile(ledger)
+    for item in issues:
+        print(format_issue(item))
+    print(f"{len(ledger)} statements, {len(ledger.amounts)} transactions, {len(issues)} issues")
+    return 1 if issues else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
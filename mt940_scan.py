@@ -0,0 +1,134 @@
+"""Memory-mapped byte-level scanner for very large statement files
+
+The line-based engine decodes every line of the file before looking at it.
+This scanner maps the file instead, finds field tag offsets with a regular
+expression over the raw bytes, and decodes only the tag lines and the
+description lines that actually end up in the output, straight from bytes
+in the file's code page (see mt940_encoding). The page cache backs
+the mapping, so multi-GB exports are processed without holding decoded
+text in memory.
+
+It produces exactly the same transactions as iter_transactions().
+"""
+import mmap
+import os
+import re
+
+from mt940_encoding import SAMPLE_BYTES, detect_encoding
+from mt940_fields import parse_subfields, tokenize_statement_line
+from mt940_parser import BLANKS, ENCODING, MT940ParseError, MT940Parser
+
+_TAG_RE = re.compile(rb'^[ \t]*:(\d\d[A-Z]?|NS):', re.M)
+_BLOCK_RE = re.compile(rb'^[ \t]*:86:', re.M)
+_DESCRIPTION_TAG = b'86'
+_TRANSACTION_TAG = b'61'
+_DESCRIPTION_START = b':86:'
+_DESCRIPTION_MARKERS = frozenset({b'<00', b'<20', b'<21', b'<22', b'<23', b'<27', b'<28', b'<29'})
+
+
+def decode_description(block, encoding=ENCODING):
+    """Collect the description of one transaction block, decoding only kept lines"""
+    description = []
+    for raw in block.split(b'\n'):
+        raw = raw.strip()
+        if not raw or raw.startswith(_DESCRIPTION_START):
+            continue
+        if raw[:1] == b'<':
+            if raw[:3] in _DESCRIPTION_MARKERS:
+                description.append(raw[3:].strip())
+        else:
+            description.append(raw)
+    return b' '.join(description).decode(encoding, errors='replace')
+
+
+def decode_subfields(block, encoding=ENCODING):
+    """Split the :86: field of one transaction block into a subfield map"""
+    match = _BLOCK_RE.search(block)
+    if match is None:
+        return {}
+    return parse_subfields(b''.join(
+        raw.strip() for raw in block[match.end():].split(b'\n')
+    ).decode(encoding, errors='replace'))
+
+
+def _emit(parser, fields, statement, block):
+    if parser.aggregator is not None:
+        parser.aggregator.add_transaction(fields, statement)
+    encoding = parser.text_encoding or ENCODING
+    description = decode_description(block, encoding)
+    if parser.keep_subfields:
+        return parser.make_transaction(fields, statement, description, decode_subfields(block, encoding))
+    return parser.make_transaction(fields, statement, description)
+
+
+def scan_buffer(buffer, parser=None):
+    """Yield transactions from a bytes-like buffer (bytes or mmap)
+
+    parser supplies statement tracking and make_transaction(), so the
+    subclasses used for CSV rows or columnar storage work here too.
+    Unless the parser has a text_encoding, it is detected from the start
+    of the buffer.
+    """
+    parser = MT940Parser() if parser is None else parser
+    if parser.text_encoding is None:
+        parser.text_encoding = detect_encoding(buffer[:SAMPLE_BYTES])
+    pending = None  # (fields, statement, offset where its description starts)
+
+    for match in _TAG_RE.finditer(buffer):
+        tag = match.group(1)
+        if tag == _DESCRIPTION_TAG:
+            continue
+
+        # Any other field ends the open transaction
+        start = match.start()
+        if pending is not None:
+            fields, statement, description_start = pending
+            pending = None
+            transaction = _emit(parser, fields, statement, buffer[description_start:start])
+            if transaction is not None:
+                yield transaction
+
+        line_end = buffer.find(b'\n', start)
+        if line_end == -1:
+            line_end = len(buffer)
+        line = buffer[start:line_end].decode(ENCODING).strip(BLANKS)
+
+        if tag != _TRANSACTION_TAG:
+            parser.field(tag.decode('ascii'), line[len(tag) + 2:])
+            continue
+
+        try:
+            fields = tokenize_statement_line(line)
+        except (ValueError, IndexError) as e:
+            print(f"Warning: Error parsing transaction line: {line}")
+            print(f"Error details: {str(e)}")
+            continue
+        pending = (fields, parser.current_statement(), line_end)
+
+    if pending is not None:
+        fields, statement, description_start = pending
+        transaction = _emit(parser, fields, statement, buffer[description_start:])
+        if transaction is not None:
+            yield transaction
+
+
+def iter_transactions_mmap(file_path, parser=None):
+    """Yield transactions from file_path through a read-only memory map"""
+    with open(file_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield from scan_buffer(buffer, parser)
+
+
+def parse_file_mmap(file_path):
+    """Memory-mapped counterpart of mt940_parser.parse_file"""
+    try:
+        transactions = list(iter_transactions_mmap(file_path))
+    except (OSError, ValueError) as e:
+        raise MT940ParseError(f"Error parsing MT940 file: {str(e)}") from e
+
+    if not transactions:
+        raise MT940ParseError("Error parsing MT940 file: No transactions found in the file")
+
+    return transactions
@@ -0,0 +1,397 @@
+"""Local HTTP conversion service
+
+Usage: python mt940_server.py [--port 8940] [--jobs 4] [--max-queue 32]
+
+Standard library only, so it runs offline next to the tools that need it.
+
+    POST /convert?format=csv|json   body: the statement file
+    GET  /metrics                   request latency, queue depth, totals (JSON)
+    GET  /health
+
+An upload is spooled to a temporary file and split at its statements
+(:20:) into batches, as mt940_statements does for large files. Batches are
+converted on a bounded process pool and each batch's rows are sent back
+with chunked transfer encoding as soon as it is done, in file order. CSV
+has a header row; json is one JSON object per line. When more than
+max_queue batches are already waiting for a worker, new uploads are
+refused with 503 rather than queued without limit; uploads that would
+clearly not fit, judging by their Content-Length, are refused before
+their body is read.
+
+mt940_load.py is a matching load-test client.
+"""
+import argparse
+import csv
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from mt940_csv import CsvRowParser
+from mt940_encoding import detect_file_encoding
+from mt940_parser import COLUMNS, MT940ParseError, MT940Parser
+from mt940_scan import scan_buffer
+from mt940_statements import batch_ranges, index_statements
+
+DEFAULT_PORT = 8940
+
+# Batches waiting for a worker before uploads are refused
+DEFAULT_MAX_QUEUE = 32
+
+# Largest accepted upload
+MAX_UPLOAD_BYTES = 1024 * 1024 * 1024
+
+# Statement bytes per pool task; smaller than mt940_statements' batches so
+# the first rows go out sooner
+BATCH_BYTES = 1024 * 1024
+
+# Bytes copied per read while spooling an upload
+SPOOL_CHUNK = 1024 * 1024
+
+# Request latencies kept for the percentiles in /metrics
+LATENCY_SAMPLES = 1000
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'json': 'application/x-ndjson; charset=utf-8',
+}
+
+
+def convert_range(file_path, start, end, output_format, encoding=None):
+    """Worker: convert the statements in one byte range to encoded output
+
+    encoding is the upload's code page, detected once for all its ranges.
+    Returns (number of transactions, UTF-8 bytes without a CSV header).
+    """
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+
+    buffer = io.StringIO()
+    count = 0
+    parser = CsvRowParser() if output_format == 'csv' else MT940Parser()
+    parser.text_encoding = encoding
+    if output_format == 'csv':
+        writer = csv.writer(buffer, lineterminator='\r\n')
+        for row in scan_buffer(data, parser):
+            writer.writerow(row)
+            count += 1
+    else:
+        for transaction in scan_buffer(data, parser):
+            transaction['Date'] = transaction['Date'].strftime('%Y-%m-%d')
+            buffer.write(json.dumps(transaction, ensure_ascii=False))
+            buffer.write('\n')
+            count += 1
+    return count, buffer.getvalue().encode('utf-8')
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class Metrics:
+    """Thread-safe request and queue counters for /metrics"""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.in_flight = 0
+        self.statuses = {}
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.pending_batches = 0
+        self.transactions = 0
+        self.bytes_received = 0
+
+    def queue_depth(self):
+        # Batches submitted but not finished, beyond those being worked on
+        return max(self.pending_batches - self.workers, 0)
+
+    def request_started(self):
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+
+    def request_finished(self, status, seconds):
+        with self.lock:
+            self.in_flight -= 1
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.latencies.append(seconds)
+
+    def batch_done(self, transactions=0):
+        with self.lock:
+            self.pending_batches -= 1
+            self.transactions += transactions
+
+    def received(self, size):
+        with self.lock:
+            self.bytes_received += size
+
+    def snapshot(self):
+        with self.lock:
+            latencies = list(self.latencies)
+            return {
+                'uptime_seconds': time.time() - self.started,
+                'requests': self.requests,
+                'in_flight': self.in_flight,
+                'statuses': {str(status): count for status, count in sorted(self.statuses.items())},
+                'workers': self.workers,
+                'pending_batches': self.pending_batches,
+                'queue_depth': self.queue_depth(),
+                'transactions': self.transactions,
+                'bytes_received': self.bytes_received,
+                'latency_seconds': {
+                    'p50': percentile(latencies, 0.50),
+                    'p95': percentile(latencies, 0.95),
+                    'p99': percentile(latencies, 0.99),
+                    'max': max(latencies) if latencies else None,
+                },
+            }
+
+
+class QueueFull(Exception):
+    """Raised when an upload would push the pool queue past max_queue"""
+
+
+class ConversionServer(ThreadingHTTPServer):
+    """HTTP server owning the process pool and the metrics"""
+
+    daemon_threads = True
+
+    def __init__(self, address, jobs=None, max_queue=DEFAULT_MAX_QUEUE, spool_dir=None):
+        super().__init__(address, ConversionHandler)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.spool_dir = spool_dir
+        self.pool = ProcessPoolExecutor(max_workers=self.jobs)
+        self.metrics = Metrics(self.jobs)
+
+    def _full(self, batches):
+        # Called with metrics.lock held; an idle pool takes any upload
+        metrics = self.metrics
+        return metrics.pending_batches and metrics.queue_depth() + batches > self.max_queue
+
+    def is_full(self, batches):
+        """Whether batches more would push the queue past max_queue right now"""
+        with self.metrics.lock:
+            return bool(self._full(batches))
+
+    def submit(self, file_path, ranges, output_format, encoding=None):
+        """Queue one upload's batches, or raise QueueFull"""
+        metrics = self.metrics
+        with metrics.lock:
+            if self._full(len(ranges)):
+                raise QueueFull()
+            metrics.pending_batches += len(ranges)
+        futures = []
+        for start, end in ranges:
+            future = self.pool.submit(convert_range, file_path, start, end, output_format, encoding)
+            future.add_done_callback(self._batch_done)
+            futures.append(future)
+        return futures
+
+    def _batch_done(self, future):
+        transactions = 0
+        if not future.cancelled() and future.exception() is None:
+            transactions = future.result()[0]
+        self.metrics.batch_done(transactions)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(cancel_futures=True)
+
+
+class ConversionHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'mt940-convert'
+
+    def log_message(self, format, *args):
+        # Access logs would dominate a load test; errors are counted in /metrics
+        pass
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        self.server.metrics.request_started()
+        started = time.perf_counter()
+        if path == '/metrics':
+            status = self.send_json(HTTPStatus.OK, self.server.metrics.snapshot())
+        elif path == '/health':
+            status = self.send_json(HTTPStatus.OK, {'status': 'ok'})
+        else:
+            status = self.send_json(HTTPStatus.NOT_FOUND, {'error': f"no such path {path}"})
+        self.server.metrics.request_finished(status, time.perf_counter() - started)
+
+    def do_POST(self):
+        self.server.metrics.request_started()
+        started = time.perf_counter()
+        status = HTTPStatus.INTERNAL_SERVER_ERROR
+        try:
+            status = self.convert()
+        except (ConnectionError, TimeoutError):
+            # Client went away before the response started
+            self.close_connection = True
+        except Exception as e:
+            # Failures once rows are streaming are handled in send_batches, so
+            # no response has been started; the body may be unread
+            self.close_connection = True
+            status = self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR,
+                                    {'error': f"Conversion failed: {str(e) or type(e).__name__}"})
+        finally:
+            self.server.metrics.request_finished(int(status), time.perf_counter() - started)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+        return int(status)
+
+    def send_chunk(self, data):
+        if data:
+            self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+
+    def convert(self):
+        url = urlsplit(self.path)
+        # Early refusals leave the body unread, so the connection can't be reused
+        if url.path != '/convert':
+            self.close_connection = True
+            return self.send_json(HTTPStatus.NOT_FOUND, {'error': f"no such path {url.path}"})
+        output_format = parse_qs(url.query).get('format', ['csv'])[0]
+        if output_format not in FORMATS:
+            self.close_connection = True
+            return self.send_json(HTTPStatus.BAD_REQUEST, {'error': f"unknown format {output_format}"})
+        try:
+            length = int(self.headers['Content-Length'])
+        except (TypeError, ValueError):
+            self.close_connection = True
+            return self.send_json(HTTPStatus.LENGTH_REQUIRED, {'error': "Content-Length required"})
+        if length > MAX_UPLOAD_BYTES:
+            self.close_connection = True
+            return self.send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                  {'error': f"upload larger than {MAX_UPLOAD_BYTES} bytes"})
+        # Refuse before spooling an upload that can't fit; stream() checks
+        # the exact batch count once the statements are indexed
+        if self.server.is_full(max(math.ceil(length / BATCH_BYTES), 1)):
+            self.close_connection = True
+            return self.send_json(HTTPStatus.SERVICE_UNAVAILABLE, {'error': "conversion queue is full"})
+
+        with tempfile.NamedTemporaryFile(dir=self.server.spool_dir, suffix='.sta', delete=False) as spool:
+            spool_path = spool.name
+        try:
+            self.spool(spool_path, length)
+            return self.stream(spool_path, output_format)
+        finally:
+            os.remove(spool_path)
+
+    def spool(self, spool_path, length):
+        with open(spool_path, 'wb') as spool:
+            remaining = length
+            while remaining:
+                chunk = self.rfile.read(min(remaining, SPOOL_CHUNK))
+                if not chunk:
+                    raise ConnectionError("upload ended early")
+                spool.write(chunk)
+                remaining -= len(chunk)
+        self.server.metrics.received(length)
+
+    def stream(self, spool_path, output_format):
+        ranges = batch_ranges(index_statements(spool_path), BATCH_BYTES)
+        try:
+            futures = self.server.submit(spool_path, ranges, output_format,
+                                         detect_file_encoding(spool_path))
+        except QueueFull:
+            return self.send_json(HTTPStatus.SERVICE_UNAVAILABLE, {'error': "conversion queue is full"})
+
+        try:
+            return self.send_batches(futures, output_format)
+        finally:
+            # Nothing may still be reading the spool file when it is removed
+            for future in futures:
+                future.cancel()
+            wait(futures)
+
+    def send_batches(self, futures, output_format):
+        sent_headers = False
+        try:
+            for future in futures:
+                try:
+                    count, data = future.result()
+                except (OSError, ValueError, MT940ParseError) as e:
+                    if sent_headers:
+                        raise
+                    return self.send_json(HTTPStatus.UNPROCESSABLE_ENTITY,
+                                          {'error': f"Error parsing MT940 file: {str(e)}"})
+                if not count:
+                    continue
+                if not sent_headers:
+                    # Headers wait for the first rows, so an unreadable file still gets a 422
+                    self.send_response(HTTPStatus.OK)
+                    self.send_header('Content-Type', FORMATS[output_format])
+                    self.send_header('Transfer-Encoding', 'chunked')
+                    self.end_headers()
+                    if output_format == 'csv':
+                        self.send_chunk((','.join(COLUMNS) + '\r\n').encode('utf-8'))
+                    sent_headers = True
+                self.send_chunk(data)
+                self.wfile.flush()
+        except (ConnectionError, TimeoutError):
+            raise
+        except Exception as e:
+            if not sent_headers:
+                # e.g. BrokenProcessPool; the client can still be told
+                return self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR,
+                                      {'error': f"Conversion failed: {str(e) or type(e).__name__}"})
+            # The response can't be completed; dropping the connection tells the client
+            self.close_connection = True
+            return int(HTTPStatus.INTERNAL_SERVER_ERROR)
+
+        if not sent_headers:
+            return self.send_json(HTTPStatus.UNPROCESSABLE_ENTITY,
+                                  {'error': "Error parsing MT940 file: No transactions found in the file"})
+        self.wfile.write(b"0\r\n\r\n")
+        return int(HTTPStatus.OK)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve MT940 to CSV/JSON conversion over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument('--max-queue', type=int, default=DEFAULT_MAX_QUEUE,
+                        help="batches allowed to wait for a worker before uploads get 503")
+    parser.add_argument('--spool-dir', default=None, help="directory for uploads being converted")
+    args = parser.parse_args(argv)
+
+    if args.spool_dir:
+        os.makedirs(args.spool_dir, exist_ok=True)
+    server = ConversionServer((args.host, args.port), args.jobs, args.max_queue, args.spool_dir)
+    print(f"Serving on http://{args.host}:{server.server_address[1]} with {server.jobs} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""SQLite export for collecting many statements in one database
+
+Each imported file is recorded by content digest, and each statement by
+account, :20: reference and :28C: sequence number, both under unique
+indexes. Importing the same file again is a single index lookup, and a
+statement already present from another file is not inserted twice, even
+without :25: or :28C: (statements are looked up with IS, since the
+unique index treats NULLs as distinct).
+Rows are inserted with executemany() in batches, and a whole file is
+imported in one transaction, so a failed import leaves nothing behind.
+The typed :86: subfields are stored in their own columns, with indexes on
+the counterparty IBAN and end-to-end reference.
+"""
+import os
+import sqlite3
+from datetime import datetime
+
+from mt940_cache import file_digest
+from mt940_encoding import SAMPLE_BYTES, sniff_encoding
+from mt940_fields import subfield_details
+from mt940_parser import ENCODING, MT940ParseError, MT940Parser
+from mt940_scan import iter_transactions_mmap
+
+# Transactions per executemany() call
+BATCH_ROWS = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    id INTEGER PRIMARY KEY,
+    number TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    digest TEXT NOT NULL UNIQUE,
+    path TEXT NOT NULL,
+    imported_at TEXT NOT NULL,
+    transactions INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS statements (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    account_id INTEGER REFERENCES accounts(id),
+    reference TEXT,
+    sequence TEXT,
+    currency TEXT,
+    opening_date TEXT,
+    opening_minor INTEGER,
+    closing_date TEXT,
+    closing_minor INTEGER
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    statement_id INTEGER NOT NULL REFERENCES statements(id),
+    account_id INTEGER REFERENCES accounts(id),
+    date TEXT NOT NULL,
+    amount_minor INTEGER NOT NULL,
+    currency TEXT NOT NULL,
+    bank_reference TEXT,
+    description TEXT,
+    transaction_code TEXT,
+    counterparty_bank TEXT,
+    counterparty_account TEXT,
+    counterparty_name TEXT,
+    counterparty_iban TEXT,
+    end_to_end_reference TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS statements_key ON statements(account_id, reference, sequence);
+CREATE INDEX IF NOT EXISTS transactions_date ON transactions(date);
+CREATE INDEX IF NOT EXISTS transactions_account ON transactions(account_id, date);
+CREATE INDEX IF NOT EXISTS transactions_amount ON transactions(amount_minor);
+CREATE INDEX IF NOT EXISTS transactions_reference ON transactions(bank_reference);
+CREATE INDEX IF NOT EXISTS transactions_iban ON transactions(counterparty_iban);
+CREATE INDEX IF NOT EXISTS transactions_end_to_end ON transactions(end_to_end_reference);
+CREATE VIEW IF NOT EXISTS transaction_rows AS
+    SELECT t.date AS date, t.amount_minor / 100.0 AS amount, t.currency AS currency,
+           t.bank_reference AS bank_reference, t.description AS description,
+           t.transaction_code AS transaction_code, t.counterparty_bank AS counterparty_bank,
+           t.counterparty_account AS counterparty_account, t.counterparty_name AS counterparty_name,
+           t.counterparty_iban AS counterparty_iban, t.end_to_end_reference AS end_to_end_reference,
+           a.number AS account, s.reference AS statement, s.sequence AS sequence
+    FROM transactions t
+    JOIN statements s ON s.id = t.statement_id
+    LEFT JOIN accounts a ON a.id = t.account_id;
+"""
+
+
+def connect(db_path):
+    """Open (and if needed create) a statement database"""
+    connection = sqlite3.connect(db_path)
+    # WAL lets readers query while an import is running
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.execute('PRAGMA foreign_keys=ON')
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _balance_columns(balance):
+    if balance is None:
+        return None, None
+    return balance.date.strftime('%Y-%m-%d'), balance.amount_minor
+
+
+class SQLiteParser(MT940Parser):
+    """MT940Parser that inserts transactions into a database in batches"""
+
+    keep_subfields = True
+
+    def __init__(self, connection, file_id, batch_rows=BATCH_ROWS):
+        super().__init__()
+        self.connection = connection
+        self.file_id = file_id
+        self.batch_rows = batch_rows
+        self.batch = []
+        self.count = 0
+        self.seen = 0
+        self.statements = []
+        # id(Statement) -> (statement row id or None if already stored, account row id)
+        self.rows = {}
+        self.accounts = {}
+        self.date_strings = {}
+
+    def new_statement(self, reference):
+        statement = super().new_statement(reference)
+        self.statements.append(statement)
+        return statement
+
+    def make_transaction(self, fields, statement, description, subfields=None):
+        self.seen += 1
+        statement_id, account_id = self.rows.get(id(statement)) or self._insert_statement(statement)
+        if statement_id is None:
+            # Already imported from another file
+            return None
+
+        date = fields.value_date
+        date_string = self.date_strings.get(date)
+        if date_string is None:
+            date_string = self.date_strings[date] = date.strftime('%Y-%m-%d')
+        self.batch.append((
+            statement_id, account_id, date_string, fields.amount_minor,
+            statement.currency or 'Unknown', fields.bank_reference, description,
+        ) + subfield_details(subfields or {}))
+        if len(self.batch) >= self.batch_rows:
+            self.flush()
+        return None
+
+    def flush(self):
+        self.connection.executemany(
+            'INSERT INTO transactions (statement_id, account_id, date, amount_minor, currency, '
+            'bank_reference, description, transaction_code, counterparty_bank, '
+            'counterparty_account, counterparty_name, counterparty_iban, end_to_end_reference) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            self.batch,
+        )
+        self.count += len(self.batch)
+        self.batch = []
+
+    def finish(self):
+        """Write the remaining rows and the balances, which follow the transactions"""
+        self.flush()
+        for statement in self.statements:
+            statement_id, _ = self.rows.get(id(statement)) or self._insert_statement(statement)
+            if statement_id is None:
+                continue
+            self.connection.execute(
+                'UPDATE statements SET currency = ?, opening_date = ?, opening_minor = ?, '
+                'closing_date = ?, closing_minor = ? WHERE id = ?',
+                (statement.currency,) + _balance_columns(statement.opening)
+                + _balance_columns(statement.closing) + (statement_id,),
+            )
+
+    def _account_id(self, number):
+        if number is None:
+            return None
+        account_id = self.accounts.get(number)
+        if account_id is None:
+            self.connection.execute('INSERT OR IGNORE INTO accounts (number) VALUES (?)', (number,))
+            account_id = self.connection.execute(
+                'SELECT id FROM accounts WHERE number = ?', (number,)
+            ).fetchone()[0]
+            self.accounts[number] = account_id
+        return account_id
+
+    def _insert_statement(self, statement):
+        # Header fields (:20:, :25:, :28C:) always precede the first :61:
+        account_id = self._account_id(statement.account)
+        key = (account_id, statement.reference, statement.sequence)
+        if self.connection.execute(
+            'SELECT 1 FROM statements WHERE account_id IS ? AND reference IS ? AND sequence IS ?', key
+        ).fetchone():
+            statement_id = None
+        else:
+            statement_id = self.connection.execute(
+                'INSERT INTO statements (file_id, account_id, reference, sequence) VALUES (?, ?, ?, ?)',
+                (self.file_id,) + key,
+            ).lastrowid
+        self.rows[id(statement)] = (statement_id, account_id)
+        return statement_id, account_id
+
+
+def import_file(connection, file_path, use_mmap=False):
+    """Import one statement file into an open database
+
+    Returns a dict with status 'imported' or 'skipped' (file already
+    imported), the number of transactions inserted and the number of
+    statements that were already in the database. Raises MT940ParseError
+    if the file has no transactions.
+    """
+    digest = file_digest(file_path)
+    if connection.execute('SELECT 1 FROM files WHERE digest = ?', (digest,)).fetchone():
+        return {'status': 'skipped', 'transactions': 0, 'duplicate_statements': 0}
+
+    with connection:
+        file_id = connection.execute(
+            'INSERT INTO files (digest, path, imported_at, transactions) VALUES (?, ?, ?, 0)',
+            (digest, os.path.abspath(file_path), datetime.now().isoformat(timespec='seconds')),
+        ).lastrowid
+        parser = SQLiteParser(connection, file_id)
+        if use_mmap:
+            for _ in iter_transactions_mmap(file_path, parser):
+                pass
+        else:
+            with open(file_path, 'rb', buffering=SAMPLE_BYTES) as file:
+                parser.text_encoding = sniff_encoding(file)
+                for line in file:
+                    parser.feed(line.decode(ENCODING))
+        parser.close()
+        if not parser.seen:
+            # Rolls the file record back
+            raise MT940ParseError("Error parsing MT940 file: No transactions found in the file")
+        parser.finish()
+        connection.execute('UPDATE files SET transactions = ? WHERE id = ?', (parser.count, file_id))
+
+    duplicates = sum(1 for statement_id, _ in parser.rows.values() if statement_id is None)
+    return {'status': 'imported', 'transactions': parser.count, 'duplicate_statements': duplicates}
+
+
+def export_to_sqlite(input_path, db_path, use_mmap=False):
+    """Import input_path into the database at db_path (see import_file)"""
+    try:
+        connection = connect(db_path)
+        try:
+            return import_file(connection, input_path, use_mmap)
+        finally:
+            connection.close()
+    except (OSError, ValueError, sqlite3.Error) as e:
+        raise MT940ParseError(f"Error parsing MT940 file: {str(e)}") from e
@@ -0,0 +1,156 @@
+"""Statement-level splitting and parallel parsing
+
+Bank exports often concatenate many statements, each opening with :20:.
+index_statements() finds those boundaries with one pass over the raw
+bytes; parse_statements() then parses batches of statements on a process
+pool and returns them in file order, each with its own account, sequence
+number, currency and transactions.
+"""
+import mmap
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from mt940_aggregate import Aggregator
+from mt940_encoding import detect_file_encoding
+from mt940_parser import MT940ParseError, MT940Parser
+from mt940_scan import scan_buffer
+
+_STATEMENT_RE = re.compile(rb'^[ \t]*:20:', re.M)
+
+# Statements are grouped into batches of at least this many bytes per task
+BATCH_BYTES = 4 * 1024 * 1024
+
+# Files smaller than this are parsed in-process; the pool costs more than it saves
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+
+ParsedStatement = namedtuple('ParsedStatement', ['statement', 'transactions'])
+
+
+class StatementParser(MT940Parser):
+    """MT940Parser that groups emitted transactions by statement"""
+
+    def __init__(self):
+        super().__init__()
+        self.results = []
+
+    def new_statement(self, reference):
+        statement = super().new_statement(reference)
+        self.results.append(ParsedStatement(statement, []))
+        return statement
+
+    def make_transaction(self, fields, statement, description):
+        transaction = super().make_transaction(fields, statement, description)
+        # Transactions always finish before the next :20: opens a statement
+        self.results[-1].transactions.append(transaction)
+        return None
+
+
+def index_statements(file_path):
+    """Return (start, end) byte ranges of the statements in a file
+
+    Anything before the first :20: (such as SWIFT envelope blocks) is
+    folded into the first range. A file without :20: is one range.
+    """
+    with open(file_path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return []
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            starts = [match.start() for match in _STATEMENT_RE.finditer(buffer)]
+
+    if not starts:
+        return [(0, size)]
+    starts[0] = 0
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def batch_ranges(ranges, batch_bytes=BATCH_BYTES):
+    """Merge consecutive statement ranges into batches of about batch_bytes"""
+    batches = []
+    for start, end in ranges:
+        if batches and batches[-1][1] - batches[-1][0] < batch_bytes:
+            batches[-1] = (batches[-1][0], end)
+        else:
+            batches.append((start, end))
+    return batches
+
+
+def parse_range(file_path, start, end, encoding=None, aggregator=None):
+    """Worker: parse the statements in one byte range of a file
+
+    encoding is the file's code page; the range alone may be too little
+    to detect it from. aggregator, if given, is fed every transaction.
+    """
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    parser = StatementParser()
+    parser.text_encoding = encoding
+    parser.aggregator = aggregator
+    for _ in scan_buffer(data, parser):
+        pass
+    return parser.results
+
+
+def aggregate_range(file_path, start, end, encoding=None):
+    """Worker: parse_range() that also returns the range's Aggregator"""
+    aggregator = Aggregator()
+    return parse_range(file_path, start, end, encoding, aggregator), aggregator
+
+
+def parse_statements(file_path, jobs=None, progress=None, aggregator=None):
+    """Parse every statement in a file, in parallel, preserving file order
+
+    progress, if given, is called with (bytes_done, total_bytes) as
+    batches complete. aggregator, if given, receives the totals of every
+    batch. Returns a list of ParsedStatement.
+    """
+    ranges = batch_ranges(index_statements(file_path))
+    total = ranges[-1][1] if ranges else 0
+    encoding = detect_file_encoding(file_path)
+    results = []
+
+    if jobs == 1 or len(ranges) <= 1:
+        for start, end in ranges:
+            results.extend(parse_range(file_path, start, end, encoding, aggregator))
+            if progress is not None:
+                progress(end, total)
+        return results
+
+    pool = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        if aggregator is None:
+            futures = [pool.submit(parse_range, file_path, start, end, encoding) for start, end in ranges]
+        else:
+            futures = [pool.submit(aggregate_range, file_path, start, end, encoding) for start, end in ranges]
+        # Collect in submission order so statements stay in file order
+        for future, (start, end) in zip(futures, ranges):
+            if aggregator is None:
+                results.extend(future.result())
+            else:
+                statements, totals = future.result()
+                results.extend(statements)
+                aggregator.merge(totals)
+            if progress is not None:
+                progress(end, total)
+    except BaseException:
+        # Don't wait for queued batches if the caller gave up (e.g. cancelled)
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+    return results
+
+
+def parse_file_parallel(file_path, jobs=None, progress=None, aggregator=None):
+    """Parse a file across processes into one ordered list of transactions"""
+    try:
+        statements = parse_statements(file_path, jobs, progress, aggregator)
+    except (OSError, ValueError) as e:
+        raise MT940ParseError(f"Error parsing MT940 file: {str(e)}") from e
+
+    transactions = [t for parsed in statements for t in parsed.transactions]
+    if not transactions:
+        raise MT940ParseError("Error parsing MT940 file: No transactions found in the file")
+    return transactions
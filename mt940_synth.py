@@ -0,0 +1,244 @@
+"""Seeded generator of synthetic Pekao-style MT940 statements
+
+Produces files shaped like real Pekao exports: CRLF lines, :NS: header
+fields, NTRF transfers and NERR bank fees, and :86: blocks with the full
+set of <00/<20-<23/<27-<29/<30-<38/<61/<63 subfields. Output only depends
+on the arguments and the seed, and balances reconcile, so the files can be
+used for benchmarks and tests at any size.
+
+Usage: python mt940_synth.py output.sta [-n 100000] [--statements 10]
+"""
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+
+# Pekao exports use the DOS Central European code page
+ENCODING = 'cp852'
+
+NEWLINE = '\r\n'
+
+# Subfield line width used by Pekao inside :86: blocks
+SUBFIELD_WIDTH = 35
+
+# Characters buffered before each encode and write
+WRITE_BUFFER = 1024 * 1024
+
+START_DATE = datetime(2025, 1, 2)
+
+BANK_CODE = '12402092'
+
+_FEES = (
+    'Miesięczny abonament za korzystanie z systemu PekaoBIZNES24',
+    'Abonament za prezentowanie danych z okresu powyżej 3 miesięcy',
+    'Opłata za przelew krajowy wewnętrzny Banku Pekao',
+    'Opłata za przelew krajowy złotowy z rachunku',
+    'Prowizja od wypłaty gotówkowej w oddziale',
+)
+
+_TRANSFER_TYPES = (
+    ('2400', 'PRZELEW KRAJOWY MIĘDZYBANKOWY'),
+    ('7750', 'PRZELEW INTERNET M/B'),
+    ('2400', 'PRZELEW'),
+    ('6600', 'PRZELEW SEPA'),
+)
+
+_TITLES = (
+    'FV/{n}/2025', 'Zwrot z podatku VAT {n}', 'Zapłata za fakturę nr {n}',
+    'Wynagrodzenie za miesiąc {n}', 'Wymiana walut {n}', 'Czynsz lokal {n}',
+    'Zaliczka na poczet dostawy {n}', 'Składka ZUS {n}',
+)
+
+_COUNTERPARTIES = (
+    ('URZĄD SKARBOWY KRAKÓW-STARE MIASTO', '31-001 KRAKÓW GRODZKA 65'),
+    ('HOR.NET POLSKA Spółka z o.o.', 'ul. Żółkiewskiego 12 Warszawa'),
+    ('PRZEDSIĘBIORSTWO HANDLOWE ŁĄCZNOŚĆ', 'ul. Piękna 4 Łódź'),
+    ('Jan Kowalski', 'ul. Długa 1/3 Gdańsk'),
+    ('ZAKŁAD UBEZPIECZEŃ SPOŁECZNYCH', 'ul. Szamocka 3 Warszawa'),
+)
+
+
+def _format_amount(amount_minor):
+    return f"{amount_minor // 100},{amount_minor % 100:02d}"
+
+
+def _format_balance(tag, date, currency, amount_minor):
+    mark = 'C' if amount_minor >= 0 else 'D'
+    return f":{tag}:{mark}{date:%y%m%d}{currency}{_format_amount(abs(amount_minor))}"
+
+
+def _subfields(first_code, text, last_code, width=SUBFIELD_WIDTH):
+    """Split text into consecutive <nn subfields of at most width characters"""
+    lines = []
+    for code in range(first_code, last_code + 1):
+        if not text:
+            break
+        lines.append(f"<{code}{text[:width]}")
+        text = text[width:]
+    return lines
+
+
+class StatementGenerator:
+    """Writes synthetic statements; every call draws from one seeded RNG"""
+
+    def __init__(self, seed=0, accounts=1, currency='PLN', ntrf_ratio=0.7,
+                 long_descriptions=False):
+        self.random = random.Random(seed)
+        self.currency = currency
+        self.ntrf_ratio = ntrf_ratio
+        self.long_descriptions = long_descriptions
+        self.accounts = [self._account_number() for _ in range(accounts)]
+        # Running balance and :28C: sequence per account
+        self.balances = {account: self.random.randrange(0, 10000000) for account in self.accounts}
+        self.sequences = dict.fromkeys(self.accounts, 0)
+
+    def _digits(self, count):
+        return f"{self.random.randrange(10 ** count):0{count}d}"
+
+    def _account_number(self):
+        return f"PL{self._digits(2)}{BANK_CODE[:4]}{self._digits(20)}"
+
+    def statement(self, index, transactions):
+        """Yield the text of one statement with the given number of transactions
+
+        Header and balance fields come one line at a time, each transaction
+        as one block of lines; every piece ends with NEWLINE.
+        """
+        account = self.accounts[index % len(self.accounts)]
+        date = START_DATE + timedelta(days=index // len(self.accounts))
+        self.sequences[account] += 1
+        balance = self.balances[account]
+
+        yield (f":20:{date:%y%m%d}{NEWLINE}:25:{account}{NEWLINE}"
+               f":28C:{self.sequences[account]}{NEWLINE}:NS:22L-PL SPÓŁKA Z O.O.{NEWLINE}")
+        yield _format_balance('60F', date, self.currency, balance) + NEWLINE
+        for _ in range(transactions):
+            if self.random.random() < self.ntrf_ratio:
+                amount_minor, block = self._transfer(date)
+            else:
+                amount_minor, block = self._fee(date)
+            balance += amount_minor
+            yield NEWLINE.join(block) + NEWLINE
+        yield _format_balance('62F', date, self.currency, balance) + NEWLINE
+        yield _format_balance('64', date, self.currency, balance) + NEWLINE
+        yield '-' + NEWLINE
+
+        self.balances[account] = balance
+
+    def _statement_line(self, date, amount_minor, transaction_type, reference):
+        mark = 'C' if amount_minor >= 0 else 'D'
+        return (f":61:{date:%y%m%d%m%d}{mark}N{_format_amount(abs(amount_minor))}"
+                f"{transaction_type}NONREF//{reference}")
+
+    def _transfer(self, date):
+        rand = self.random
+        code, label = rand.choice(_TRANSFER_TYPES)
+        amount_minor = rand.randrange(100, 10000000)
+        if rand.random() < 0.5:
+            amount_minor = -amount_minor
+        prefix = rand.choice(('ZBD', ''))
+        reference = prefix + self._digits(16 - len(prefix))
+        name, address = rand.choice(_COUNTERPARTIES)
+        title = rand.choice(_TITLES).format(n=self._digits(rand.randint(2, 8)))
+        if self.long_descriptions:
+            title = ' '.join([title] + [rand.choice(_TITLES).format(n=self._digits(6)) for _ in range(4)])
+
+        counterparty = f"{name} {address}"
+        account = self._digits(26)
+        block = [
+            self._statement_line(date, amount_minor, 'NTRF', reference),
+            label,
+            f":86:{code}<00{label[:27]}<10",
+            *_subfields(20, title, 25 if self.long_descriptions else 23),
+            *_subfields(27, counterparty, 29),
+            f"<30{account[2:10]}<31{account[10:]}",
+            f"<32{name[:SUBFIELD_WIDTH - 8]}<33{name[SUBFIELD_WIDTH - 8:]}",
+            f"<38{account}",
+            "<61NONREF",
+            f"<63REF{reference}",
+        ]
+        return amount_minor, block
+
+    def _fee(self, date):
+        rand = self.random
+        amount_minor = -rand.randrange(10, 10000)
+        reference = f"M0150PB{rand.choice('ST')}{self._digits(8)}"
+        text = rand.choice(_FEES)
+        if self.long_descriptions:
+            text += f" za okres: {date - timedelta(days=28):%d.%m.%Y}-{date:%d.%m.%Y}"
+
+        account = BANK_CODE + self._digits(16)
+        block = [
+            self._statement_line(date, amount_minor, 'NERR', reference),
+            "PROWIZJE AUT.",
+            ":86:8300<00PROWIZJE AUT.<10",
+            *_subfields(20, text, 23),
+            "<27",
+            "<29",
+            f"<30{BANK_CODE}<31{account[8:]}",
+            "<32<33",
+            f"<38{self._digits(2)}{account}",
+            "<61NONREF",
+            f"<63REF{reference}",
+        ]
+        return amount_minor, block
+
+
+def write_statements(fileobj, transactions, statements=1, seed=0, encoding=ENCODING, **options):
+    """Write a synthetic file to a binary file object
+
+    The transactions are spread evenly over the statements. Extra keyword
+    arguments go to StatementGenerator (accounts, currency, ntrf_ratio,
+    long_descriptions). Returns the number of bytes written.
+    """
+    generator = StatementGenerator(seed=seed, **options)
+    statements = max(1, statements)
+    written = 0
+    buffer = []
+    buffered = 0
+
+    for index in range(statements):
+        # Earlier statements take the remainder so the total is exact
+        count = transactions // statements + (1 if index < transactions % statements else 0)
+        for text in generator.statement(index, count):
+            buffer.append(text)
+            buffered += len(text)
+            if buffered >= WRITE_BUFFER:
+                written += fileobj.write(''.join(buffer).encode(encoding))
+                buffer, buffered = [], 0
+
+    written += fileobj.write(''.join(buffer).encode(encoding))
+    return written
+
+
+def generate_file(file_path, transactions, statements=1, seed=0, **options):
+    """Write a synthetic statement file to file_path, returning its size in bytes"""
+    with open(file_path, 'wb') as file:
+        return write_statements(file, transactions, statements, seed, **options)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic Pekao-style MT940 file")
+    parser.add_argument('output', help="file to write")
+    parser.add_argument('-n', '--transactions', type=int, default=1000)
+    parser.add_argument('--statements', type=int, default=1)
+    parser.add_argument('--accounts', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ntrf-ratio', type=float, default=0.7,
+                        help="share of NTRF transfers; the rest are NERR fees")
+    parser.add_argument('--long-descriptions', action='store_true',
+                        help="fill every :86: description subfield")
+    args = parser.parse_args(argv)
+
+    size = generate_file(
+        args.output, args.transactions, args.statements, args.seed,
+        accounts=args.accounts, ntrf_ratio=args.ntrf_ratio,
+        long_descriptions=args.long_descriptions,
+    )
+    print(f"Wrote {args.transactions} transactions in {args.statements} statements "
+          f"({size / 1e6:.1f} MB) to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
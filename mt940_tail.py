@@ -0,0 +1,113 @@
+"""Incremental parsing of statement files that grow during the day
+
+Some banking connectors append intraday statements to one file. Instead of
+re-reading it from byte 0, read_appended() resumes from a Checkpoint: the
+byte offset of the last complete line, the parser state (open statement,
+open transaction and its description so far) and a few bytes from the start
+of the file and just before the offset to notice if it was replaced or
+truncated. Only bytes added since the checkpoint are read, so a refresh
+costs O(new data).
+"""
+import os
+import pickle
+
+from mt940_encoding import SAMPLE_BYTES, detect_encoding
+from mt940_parser import ENCODING, MT940Parser
+
+# Bytes before the offset remembered to detect a rewritten file
+ANCHOR_BYTES = 256
+
+# Read size for appended data
+READ_CHUNK = 1024 * 1024
+
+
+class Checkpoint:
+    """Resume point for read_appended()"""
+
+    def __init__(self, parser=None):
+        self.offset = 0
+        self.head = b''      # first bytes of the file
+        self.anchor = b''    # bytes just before offset
+        self.parser = MT940Parser() if parser is None else parser
+
+    def matches(self, file):
+        """True if the file still contains the data this checkpoint has seen"""
+        size = os.fstat(file.fileno()).st_size
+        if size < self.offset:
+            return False
+        file.seek(0)
+        if file.read(len(self.head)) != self.head:
+            return False
+        file.seek(self.offset - len(self.anchor))
+        return file.read(len(self.anchor)) == self.anchor
+
+    def save(self, checkpoint_path):
+        temp_path = f"{checkpoint_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as file:
+            pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, checkpoint_path)
+
+    @staticmethod
+    def load(checkpoint_path):
+        """Load a saved checkpoint, or return None if there is none"""
+        try:
+            with open(checkpoint_path, 'rb') as file:
+                return pickle.load(file)
+        except FileNotFoundError:
+            return None
+
+
+def read_appended(file_path, checkpoint=None, parser_factory=MT940Parser):
+    """Parse only what was appended to file_path since checkpoint
+
+    Returns (transactions, checkpoint). The transaction still open at the
+    end of the data is kept in the checkpoint rather than emitted, because
+    more description lines may follow; a trailing partial line is left for
+    the next call. If the file no longer matches the checkpoint (rotated or
+    rewritten), parsing restarts from the beginning with a fresh parser.
+    Unless the parser has a text_encoding, the code page is detected from
+    the first appended data that is not pure ASCII.
+    """
+    transactions = []
+    with open(file_path, 'rb') as file:
+        if checkpoint is None or not checkpoint.matches(file):
+            checkpoint = Checkpoint(parser_factory())
+
+        parser = checkpoint.parser
+        file.seek(checkpoint.offset)
+        pending = b''
+        while True:
+            chunk = file.read(READ_CHUNK)
+            if not chunk:
+                break
+            data = pending + chunk
+            # Only complete lines are consumed; the remainder waits for more data
+            last_newline = data.rfind(b'\n')
+            if last_newline == -1:
+                pending = data
+                continue
+            pending = data[last_newline + 1:]
+            if parser.text_encoding is None and not data.isascii():
+                # ASCII reads the same in every code page, so the choice waits
+                # for the first non-ASCII bytes and is then kept in the checkpoint
+                parser.text_encoding = detect_encoding(data[:SAMPLE_BYTES])
+            for line in data[:last_newline].split(b'\n'):
+                transaction = parser.feed(line.decode(ENCODING))
+                if transaction is not None:
+                    transactions.append(transaction)
+
+        end = file.tell() - len(pending)
+        if end != checkpoint.offset:
+            checkpoint.offset = end
+            file.seek(0)
+            checkpoint.head = file.read(min(end, ANCHOR_BYTES))
+            file.seek(max(0, end - ANCHOR_BYTES))
+            checkpoint.anchor = file.read(end - max(0, end - ANCHOR_BYTES))
+
+    return transactions, checkpoint
+
+
+def close_checkpoint(checkpoint):
+    """Emit the transaction still held open by a checkpoint (end of day)"""
+    transaction = checkpoint.parser.close()
+    return [] if transaction is None else [transaction]
@@ -0,0 +1,155 @@
+"""Sorted and filtered views over parsed transactions
+
+The transaction table shows a window of a list that can hold millions of
+rows, so sorting and filtering never touch the widgets. A TransactionView
+computes, once per parsed file, a sort permutation for every column, and
+keeps dates and amounts as integer NumPy arrays. Re-sorting then picks a
+permutation, and a date/amount range filter is one vectorised mask applied
+to it. Either way the result is an array of row indices (order) for the
+table to read through.
+
+NumPy is imported when the first view is built, not at startup.
+"""
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from mt940_fields import AMOUNT_SCALE
+from mt940_parser import COLUMNS
+
+# Columns sorted by their integer arrays rather than by Python comparisons
+NUMERIC_COLUMNS = ('Date', 'Amount')
+
+DATE_FORMAT = '%Y-%m-%d'
+
+
+def parse_date(text):
+    """Read a 'YYYY-MM-DD' filter bound; blank gives None"""
+    text = text.strip()
+    if not text:
+        return None
+    return datetime.strptime(text, DATE_FORMAT)
+
+
+def parse_amount(text):
+    """Read an amount filter bound as hundredths; blank gives None
+
+    Accepts a comma or a dot as the decimal separator and ignores spaces
+    and thousands separators ('1 234,50', '1,234.50').
+    """
+    text = text.strip().replace(' ', '').replace('\xa0', '')
+    if not text:
+        return None
+    if ',' in text and '.' in text:
+        text = text.replace(',', '')
+    else:
+        text = text.replace(',', '.')
+    try:
+        amount = Decimal(text)
+        if not amount.is_finite():
+            raise ValueError(f"invalid amount: {text}")
+        return int((amount * AMOUNT_SCALE).to_integral_value())
+    except (InvalidOperation, ArithmeticError):
+        raise ValueError(f"invalid amount: {text}") from None
+
+
+class TransactionView:
+    """Sort order and range filter over a list of transaction dicts
+
+    Building a view is the slow part (a few seconds for a million rows)
+    and belongs in a worker thread; sort() and filter() are then cheap
+    enough for the Tk thread. order is always the array of row indices
+    to display, in display order.
+    """
+
+    def __init__(self, transactions):
+        import numpy as np
+
+        self.transactions = transactions
+        count = len(transactions)
+        self.days = np.fromiter((t['Date'].toordinal() for t in transactions), dtype=np.int32, count=count)
+        self.amounts = np.fromiter(
+            (round(t['Amount'] * AMOUNT_SCALE) for t in transactions), dtype=np.int64, count=count
+        )
+
+        self.permutations = {
+            'Date': np.argsort(self.days, kind='stable'),
+            'Amount': np.argsort(self.amounts, kind='stable'),
+        }
+        for column in COLUMNS:
+            if column not in NUMERIC_COLUMNS:
+                values = [t[column] or '' for t in transactions]
+                self.permutations[column] = np.fromiter(
+                    sorted(range(count), key=values.__getitem__), dtype=np.intp, count=count
+                )
+
+        # Descending orders, built on first use; ties keep file order
+        self.descending_permutations = {}
+
+        self.unsorted = np.arange(count, dtype=np.intp)
+        self.sort_column = None
+        self.descending = False
+        # Rows passing the filter, or None when nothing is filtered
+        self.mask = None
+        self.order = self.unsorted
+
+    def __len__(self):
+        return len(self.order)
+
+    def sort(self, column=None, descending=False):
+        """Order rows by column (None restores file order); returns order"""
+        if column is not None and column not in self.permutations:
+            raise ValueError(f"unknown column {column!r}")
+        self.sort_column = column
+        self.descending = descending
+        return self._update()
+
+    def filter(self, date_from=None, date_to=None, amount_min=None, amount_max=None):
+        """Keep rows within the given inclusive bounds; returns order
+
+        Dates are datetimes, amounts hundredths; None leaves that side
+        open, and all None removes the filter.
+        """
+        mask = None
+        for values, bound, keep_above in (
+            (self.days, date_from, True),
+            (self.days, date_to, False),
+            (self.amounts, amount_min, True),
+            (self.amounts, amount_max, False),
+        ):
+            if bound is None:
+                continue
+            if isinstance(bound, datetime):
+                bound = bound.toordinal()
+            passed = values >= bound if keep_above else values <= bound
+            mask = passed if mask is None else mask & passed
+        self.mask = mask
+        return self._update()
+
+    def _descending(self, column):
+        import numpy as np
+
+        if column not in self.descending_permutations:
+            count = len(self.transactions)
+            if column == 'Date':
+                permutation = np.argsort(-self.days, kind='stable')
+            elif column == 'Amount':
+                permutation = np.argsort(-self.amounts, kind='stable')
+            else:
+                values = [t[column] or '' for t in self.transactions]
+                permutation = np.fromiter(
+                    sorted(range(count), key=values.__getitem__, reverse=True), dtype=np.intp, count=count
+                )
+            self.descending_permutations[column] = permutation
+        return self.descending_permutations[column]
+
+    def _update(self):
+        if self.sort_column is None:
+            order = self.unsorted[::-1] if self.descending else self.unsorted
+        elif self.descending:
+            order = self._descending(self.sort_column)
+        else:
+            order = self.permutations[self.sort_column]
+        if self.mask is not None:
+            order = order[self.mask[order]]
+        self.order = order
+        return order
@@ -0,0 +1,28 @@
+from bench_mt940 import bench_engines
+from mt940_synth import generate_file
+
+
+def test_bench_engines_report(tmp_path):
+    path = tmp_path / 'synthetic.sta'
+    generate_file(str(path), 40, statements=2)
+
+    results = bench_engines(str(path), ['parser', 'mmap', 'conv'], repeat=1,
+                            isolate=False, report=lambda line: None)
+
+    assert results['lines'] > 40
+    for name in ('parser', 'mmap', 'conv'):
+        result = results['results'][name]
+        assert result['transactions'] == 40
+        assert result['lines_per_s'] > 0
+        assert 'parse' in result['stages']
+
+
+def test_legacy_engines_match_baseline_counts(tmp_path):
+    path = tmp_path / 'synthetic.sta'
+    generate_file(str(path), 40, statements=2)
+
+    results = bench_engines(str(path), ['legacy', 'legacy-conv'], repeat=1,
+                            isolate=False, report=lambda line: None)
+
+    for name in ('legacy', 'legacy-conv'):
+        assert results['results'][name]['transactions'] == 40
@@ -0,0 +1,18 @@
+from bench_startup import bench_startup, check
+
+
+def test_imports_leave_heavy_modules_for_later():
+    summary = bench_startup('imports', runs=1, report=lambda line: None)
+
+    assert summary['loaded'] == []
+    assert 0 < summary['first'] == summary['median']
+
+
+def test_check_flags_budget_modules_and_regressions():
+    summary = {'median': 1.0, 'loaded': [], 'timestamp': 'then'}
+
+    assert check(summary, budget=2.0) == []
+    assert len(check(summary, budget=0.5)) == 1
+    assert len(check(dict(summary, loaded=['pandas']), budget=2.0)) == 1
+    assert check(summary, 2.0, previous={'median': 0.9, 'timestamp': 'then'}) == []
+    assert len(check(summary, 2.0, previous={'median': 0.5, 'timestamp': 'then'})) == 1
@@ -0,0 +1,31 @@
+import os
+
+from conv import main, parse_mt940
+from mt940_parser import parse_file
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f.mt940')
+
+
+def test_rows_follow_conv_conventions():
+    rows = parse_mt940(SAMPLE_FILE)
+    engine = parse_file(SAMPLE_FILE)
+
+    assert len(rows) == len(engine) == 39
+    for row, transaction in zip(rows, engine):
+        # Debits are positive in conv.py's output
+        assert row['Amount'] == -transaction['Amount']
+        assert row['Bank Reference'] == transaction['Bank Reference']
+        assert '<' not in row['Description'] and '  ' not in row['Description']
+
+
+def test_debug_output_is_opt_in(tmp_path, capsys):
+    output = tmp_path / 'out.csv'
+
+    main([SAMPLE_FILE, str(output)])
+    quiet = capsys.readouterr().out
+    main([SAMPLE_FILE, str(output), '--debug'])
+    verbose = capsys.readouterr().out
+
+    assert quiet.count('\n') == 1
+    assert verbose.count('Processing transaction') == 39
+    assert output.read_text(encoding='utf-8').count('\n') == 40
@@ -0,0 +1,93 @@
+import os
+import pickle
+
+import mt940_statements
+from mt940_aggregate import Aggregator, Totals
+from mt940_cache import ParseCache
+from mt940_parser import MT940Parser, parse_file
+from mt940_scan import iter_transactions_mmap
+from mt940_statements import parse_file_parallel
+from test_mt940_statements import write_multi
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f.mt940')
+
+PLN_ACCOUNT = 'PL63124026561111001135907105'
+EUR_ACCOUNT = 'PL11111111111111111111111111'
+
+
+def test_totals_match_the_rows():
+    aggregator = Aggregator()
+    transactions = parse_file(SAMPLE_FILE, aggregator=aggregator)
+
+    (key, totals), = aggregator.totals('account').items()
+    assert key == (PLN_ACCOUNT, 'PLN')
+    assert totals.count == len(transactions) == 39
+    assert totals.debit_count == sum(1 for t in transactions if t['Amount'] < 0)
+    assert totals.debit_count + totals.credit_count == totals.count
+    assert totals.debits == round(sum(t['Amount'] for t in transactions if t['Amount'] < 0) * 100)
+    assert totals.net == totals.debits + totals.credits == -284628
+
+
+def test_days_and_months_roll_up():
+    aggregator = Aggregator()
+    transactions = parse_file(SAMPLE_FILE, aggregator=aggregator)
+
+    days = aggregator.totals('day')
+    assert sum(totals.count for totals in days.values()) == len(transactions)
+    last = transactions[-1]
+    assert days[(PLN_ACCOUNT, 'PLN', last['Date'].strftime('%Y-%m-%d'))].count == sum(
+        1 for t in transactions if t['Date'] == last['Date']
+    )
+    month, = aggregator.monthly_report()
+    assert (month.account, month.currency, month.month) == (PLN_ACCOUNT, 'PLN', '2025-02')
+    assert month.net == aggregator.totals('total')[()].net
+
+
+def test_accounts_and_currencies_kept_apart(tmp_path):
+    aggregator = Aggregator()
+    parse_file(write_multi(tmp_path), aggregator=aggregator)
+
+    accounts = aggregator.totals('account')
+    assert list(accounts) == [(EUR_ACCOUNT, 'EUR'), (PLN_ACCOUNT, 'PLN')]
+    assert accounts[(EUR_ACCOUNT, 'EUR')] == Totals(1, 1, 0, -150, 0, -150)
+    assert accounts[(PLN_ACCOUNT, 'PLN')].count == 78
+    assert aggregator.currency_summary().startswith('EUR: 1 tx, debits -1.50')
+
+
+def test_engines_agree(tmp_path, monkeypatch):
+    path = write_multi(tmp_path)
+    expected = Aggregator()
+    parse_file(path, aggregator=expected)
+
+    parser = MT940Parser()
+    parser.aggregator = Aggregator()
+    list(iter_transactions_mmap(path, parser))
+    assert parser.aggregator.buckets == expected.buckets
+
+    monkeypatch.setattr(mt940_statements, 'BATCH_BYTES', 1)
+    parallel = Aggregator()
+    parse_file_parallel(path, jobs=2, aggregator=parallel)
+    assert parallel.buckets == expected.buckets
+
+
+def test_merge_adds_buckets():
+    first, second = Aggregator(), Aggregator()
+    parse_file(SAMPLE_FILE, aggregator=first)
+    parse_file(SAMPLE_FILE, aggregator=second)
+
+    merged = Aggregator().merge(first).merge(second)
+    assert len(merged) == 78
+    assert merged.totals('total')[()].net == 2 * first.totals('total')[()].net
+    # Merging copies buckets rather than sharing them
+    assert len(first) == 39
+
+
+def test_cache_keeps_totals(tmp_path):
+    cache = ParseCache(cache_dir=str(tmp_path / 'cache'))
+    parsed = cache.parse_summary(SAMPLE_FILE)
+
+    assert parsed.transactions is cache.parse(SAMPLE_FILE)
+    assert len(parsed.summary) == 39
+    reloaded = ParseCache(cache_dir=str(tmp_path / 'cache')).parse_summary(SAMPLE_FILE)
+    assert reloaded.summary.buckets == parsed.summary.buckets
+    assert pickle.loads(pickle.dumps(parsed.summary)).totals() == parsed.summary.totals()
@@ -0,0 +1,92 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from mt940_async import Ingestor, aiter_transactions, parse_stream
+from mt940_parser import MT940ParseError, MT940Parser, parse_file
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f.mt940')
+
+with open(SAMPLE_FILE, 'rb') as sample:
+    SAMPLE = sample.read()
+
+
+async def byte_chunks(data, size):
+    for start in range(0, len(data), size):
+        await asyncio.sleep(0)
+        yield data[start:start + size]
+
+
+def test_stream_reader_matches_parse_file():
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(SAMPLE)
+        reader.feed_eof()
+        return [transaction async for transaction in aiter_transactions(reader)]
+
+    assert asyncio.run(run()) == parse_file(SAMPLE_FILE)
+
+
+def test_chunk_boundaries_inside_lines():
+    ingestor = Ingestor(chunk_bytes=97)
+    try:
+        # Odd chunk sizes split lines and CRLF pairs
+        result = asyncio.run(ingestor.parse(byte_chunks(SAMPLE, 61)))
+    finally:
+        ingestor.close()
+
+    assert result == parse_file(SAMPLE_FILE)
+
+
+def test_process_pool_carries_parser_state():
+    ingestor = Ingestor(executor=ProcessPoolExecutor(max_workers=2), chunk_bytes=3000)
+    try:
+        result = asyncio.run(ingestor.parse(byte_chunks(SAMPLE, 3000)))
+    finally:
+        ingestor.executor.shutdown()
+
+    assert result == parse_file(SAMPLE_FILE)
+
+
+def test_empty_stream_raises():
+    with pytest.raises(MT940ParseError):
+        asyncio.run(parse_stream(byte_chunks(b':20:A\r\n', 4)))
+
+
+class SlowParser(MT940Parser):
+    """Records how many chunks are being parsed at the same time"""
+
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def feed(self, line):
+        if line.startswith(':20:'):
+            with self.lock:
+                SlowParser.active += 1
+                SlowParser.peak = max(SlowParser.peak, SlowParser.active)
+            time.sleep(0.01)
+            with self.lock:
+                SlowParser.active -= 1
+        return super().feed(line)
+
+
+def test_concurrent_uploads_respect_limit():
+    ingestor = Ingestor(concurrency=2, executor=ThreadPoolExecutor(max_workers=8), chunk_bytes=4096)
+
+    async def run():
+        uploads = [ingestor.parse(byte_chunks(SAMPLE, 1000), SlowParser()) for _ in range(6)]
+        return await asyncio.gather(*uploads)
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        ingestor.executor.shutdown()
+
+    expected = parse_file(SAMPLE_FILE)
+    assert all(result == expected for result in results)
+    assert SlowParser.peak <= 2
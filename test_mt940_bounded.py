@@ -0,0 +1,88 @@
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+from mt940_bounded import MIN_MEMORY_BUDGET, convert_bounded, iter_line_chunks
+from mt940_csv import convert_to_csv
+from mt940_parser import MT940ParseError
+from mt940_profile import Profile
+from mt940_synth import generate_file
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_FILE = os.path.join(HERE, 'f.mt940')
+
+# Peak RSS growth allowed while converting, for a MIN_MEMORY_BUDGET * 16 budget
+RSS_CEILING = 8 * 1024 * 1024
+
+_MEASURE_RSS = """
+import resource, sys
+from mt940_bounded import convert_bounded
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+convert_bounded(sys.argv[1], sys.argv[2], int(sys.argv[3]))
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print((after - before) * 1024)
+"""
+
+
+def test_matches_streaming_csv_at_any_chunk_size(tmp_path):
+    expected = tmp_path / 'expected.csv'
+    convert_to_csv(SAMPLE_FILE, str(expected))
+
+    # Small budgets put chunk boundaries inside lines and transactions
+    for budget in (MIN_MEMORY_BUDGET, MIN_MEMORY_BUDGET + 7, 10 ** 6):
+        output = tmp_path / f'{budget}.csv'
+        assert convert_bounded(SAMPLE_FILE, str(output), budget) == 39
+        assert output.read_bytes() == expected.read_bytes()
+
+
+def test_partial_lines_carry_over():
+    data = b':20:A\r\n:61:2501020102D1,00NTRFREF\r\nno newline at end'
+    lines = [line for chunk in iter_line_chunks(io.BytesIO(data), 28) for line in chunk]
+
+    assert lines == data.decode('ascii').split('\n')
+
+
+def test_overlong_line_and_empty_input_fail(tmp_path):
+    long_line = tmp_path / 'long.sta'
+    long_line.write_bytes(b'x' * (MIN_MEMORY_BUDGET * 2))
+    empty = tmp_path / 'empty.sta'
+    empty.write_bytes(b':20:A\r\n')
+
+    for source in (long_line, empty):
+        output = tmp_path / 'out.csv'
+        with pytest.raises(MT940ParseError):
+            convert_bounded(str(source), str(output), MIN_MEMORY_BUDGET)
+        assert not output.exists()
+
+
+def test_traced_memory_stays_within_budget(tmp_path):
+    source = tmp_path / 'big.sta'
+    generate_file(str(source), 20000, statements=2)
+    budget = MIN_MEMORY_BUDGET * 4
+
+    with Profile(trace_memory=True) as profile:
+        assert convert_bounded(str(source), str(tmp_path / 'big.csv'), budget) == 20000
+
+    # Parser, csv writer and file objects add a small fixed overhead
+    assert profile.report()['peak_memory_bytes'] < budget + 256 * 1024
+
+
+def test_peak_rss_is_flat_in_input_size(tmp_path):
+    pytest.importorskip('resource')
+    budget = MIN_MEMORY_BUDGET * 16
+    growth = []
+    for transactions in (2000, 40000):
+        source = tmp_path / f'{transactions}.sta'
+        generate_file(str(source), transactions, statements=2)
+        result = subprocess.run(
+            [sys.executable, '-c', _MEASURE_RSS, str(source), str(tmp_path / 'out.csv'), str(budget)],
+            cwd=HERE, capture_output=True, text=True, check=True,
+        )
+        growth.append(int(result.stdout))
+
+    assert max(growth) < RSS_CEILING
+    # Twenty times the input, about the same peak
+    assert growth[1] - growth[0] < budget
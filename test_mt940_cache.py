@@ -0,0 +1,59 @@
+import os
+import shutil
+
+from mt940_cache import ParseCache
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f.mt940')
+
+
+def test_parse_is_cached_in_memory(tmp_path, monkeypatch):
+    path = tmp_path / 'statement.sta'
+    shutil.copy(SAMPLE_FILE, path)
+    cache = ParseCache()
+
+    first = cache.parse(str(path))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("statement parsed twice")
+
+    monkeypatch.setattr('mt940_cache.parse_file', fail)
+    assert cache.parse(str(path)) is first
+
+
+def test_modified_file_is_reparsed(tmp_path):
+    path = tmp_path / 'statement.sta'
+    shutil.copy(SAMPLE_FILE, path)
+    cache = ParseCache()
+
+    first = cache.parse(str(path))
+    with open(path, 'ab') as file:
+        file.write(b':61:2503010301CN1,00NTRFNONREF//X\r\n')
+
+    assert len(cache.parse(str(path))) == len(first) + 1
+
+
+def test_lru_eviction(tmp_path):
+    cache = ParseCache(max_entries=1)
+    paths = []
+    for name in ('a.sta', 'b.sta'):
+        path = tmp_path / name
+        shutil.copy(SAMPLE_FILE, path)
+        paths.append(str(path))
+        cache.parse(str(path))
+
+    assert len(cache.entries) == 1
+    assert next(iter(cache.entries))[0] == paths[1]
+
+
+def test_disk_store_survives_new_session(tmp_path, monkeypatch):
+    path = tmp_path / 'statement.sta'
+    shutil.copy(SAMPLE_FILE, path)
+    cache_dir = str(tmp_path / 'cache')
+
+    expected = ParseCache(cache_dir=cache_dir).parse(str(path))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("statement parsed twice")
+
+    monkeypatch.setattr('mt940_cache.parse_file', fail)
+    assert ParseCache(cache_dir=cache_dir).parse(str(path)) == expected
@@ -0,0 +1,52 @@
+import os
+import shutil
+
+from mt940_cli import main, run_batch
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f.mt940')
+
+
+def test_batch_converts_then_skips_unchanged(tmp_path):
+    inputs = []
+    for name in ('a.sta', 'b.sta'):
+        path = tmp_path / name
+        shutil.copy(SAMPLE_FILE, path)
+        inputs.append(str(path))
+    output_dir = str(tmp_path / 'out')
+
+    first = run_batch(inputs, output_dir, jobs=2, report=lambda message: None)
+    second = run_batch(inputs, output_dir, jobs=2, report=lambda message: None)
+
+    assert [r['status'] for r in first] == ['converted', 'converted']
+    assert [r['status'] for r in second] == ['skipped', 'skipped']
+    assert os.path.exists(os.path.join(output_dir, 'a.csv'))
+
+
+def test_failures_set_exit_code(tmp_path, capsys):
+    bad = tmp_path / 'bad.sta'
+    bad.write_text('not a statement\n')
+
+    assert main([str(bad), '-o', str(tmp_path / 'out'), '-j', '1']) == 1
+    assert '1 failed' in capsys.readouterr().out
+
+
+def test_sqlite_import_skips_known_files(tmp_path, capsys):
+    db_path = str(tmp_path / 'statements.db')
+
+    assert main([SAMPLE_FILE, '--sqlite', db_path]) == 0
+    assert main([SAMPLE_FILE, '--sqlite', db_path]) == 0
+    assert '0 converted, 1 up to date' in capsys.readouterr().out
+
+
+def test_mmap_with_memory_budget_is_refused(tmp_path, capsys):
+    assert main([SAMPLE_FILE, '-o', str(tmp_path / 'out'), '--mmap', '--memory-budget', '8']) == 2
+    assert "can't be combined" in capsys.readouterr().err
+    assert not (tmp_path / 'out').exists()
+
+
+def test_profile_with_sqlite_is_refused(tmp_path, capsys):
+    report_path = tmp_path / 'profile.json'
+
+    assert main([SAMPLE_FILE, '--sqlite', str(tmp_path / 'db.sqlite'), '--profile', str(report_path)]) == 2
+    assert "can't be combined" in capsys.readouterr().err
+    assert not report_path.exists()
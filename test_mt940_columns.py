@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from mt940_columns import read_columns
+from mt940_parser import parse_file
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f.mt940')
+
+
+def load_columns():
+    with open(SAMPLE_FILE, 'rb') as file:
+        return read_columns(file)
+
+
+def test_columns_match_dict_parser():
+    columns = load_columns()
+
+    assert [columns.row(i) for i in range(len(columns))] == parse_file(SAMPLE_FILE)
+
+
+def test_detail_columns_match_dict_parser():
+    with open(SAMPLE_FILE, 'rb') as file:
+        columns = read_columns(file, details=True)
+
+    assert [columns.row(i) for i in range(len(columns))] == parse_file(SAMPLE_FILE, subfields=True)
+    ibans = columns.details[4]
+    assert len(ibans.values) < len(ibans)
+
+
+def test_currency_is_dictionary_encoded():
+    columns = load_columns()
+
+    assert columns.currencies.values == ['PLN']
+    assert set(columns.currencies.codes) == {0}
+
+
+def test_dataframe_shares_amount_buffer():
+    np = pytest.importorskip('numpy')
+    pytest.importorskip('pandas')
+    columns = load_columns()
+
+    df = columns.to_dataframe(minor_units=True)
+
+    assert np.shares_memory(df['Amount'].to_numpy(), np.frombuffer(columns.amounts, dtype=np.int64))
+    assert df['Amount'].iloc[0] == -2000
+    assert str(df['Date'].iloc[0].date()) == '2025-02-28'
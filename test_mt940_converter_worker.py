@@ -0,0 +1,64 @@
+import queue
+import threading
+
+import mt940_converter
+from mt940_converter import run_worker
+
+
+def drain(events):
+    items = []
+    while not events.empty():
+        items.append(events.get_nowait())
+    return items
+
+
+def test_progress_is_throttled(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(mt940_converter, 'PROGRESS_INTERVAL', 1.0)
+    monkeypatch.setattr(mt940_converter.time, 'monotonic', lambda: clock[0])
+
+    def work(report):
+        for step in range(10):
+            report(f"step {step}", step)
+            clock[0] += 0.25
+        return 'result'
+
+    events = queue.Queue()
+    run_worker(work, events, threading.Event())
+
+    assert drain(events) == [('progress', 'step 0', 0), ('progress', 'step 4', 4),
+                             ('progress', 'step 8', 8), ('done', 'result')]
+
+
+def test_cancel_event_stops_work():
+    cancel = threading.Event()
+    steps = []
+
+    def work(report):
+        for step in range(10):
+            if step == 3:
+                cancel.set()
+            report("working", step)
+            steps.append(step)
+        return 'result'
+
+    events = queue.Queue()
+    run_worker(work, events, cancel)
+
+    assert steps == [0, 1, 2]
+    assert drain(events)[-1] == ('cancelled',)
+
+
+def test_error_is_posted_without_result():
+    error = ValueError("bad statement")
+
+    def work(report):
+        report("working", 0)
+        raise error
+
+    events = queue.Queue()
+    run_worker(work, events, threading.Event())
+
+    items = drain(events)
+    assert items[-1] == ('error', error)
+    assert not [item for item in items if item[0] == 'done']
@@ -0,0 +1,57 @@
+import io
+import os
+
+import pytest
+
+from mt940_csv import convert_to_csv, open_output, write_csv
+from mt940_parser import MT940ParseError, parse_file
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f.mt940')
+
+
+def test_streamed_csv_matches_dict_writer(tmp_path):
+    streamed = tmp_path / 'streamed.csv'
+    written = tmp_path / 'written.csv'
+
+    assert convert_to_csv(SAMPLE_FILE, str(streamed)) == 39
+    with open_output(str(written)) as output:
+        write_csv(parse_file(SAMPLE_FILE), output)
+
+    assert streamed.read_bytes() == written.read_bytes()
+
+
+def test_csv_matches_pandas(tmp_path):
+    pd = pytest.importorskip('pandas')
+    streamed = tmp_path / 'streamed.csv'
+    expected = tmp_path / 'pandas.csv'
+
+    convert_to_csv(SAMPLE_FILE, str(streamed))
+    df = pd.DataFrame(parse_file(SAMPLE_FILE))
+    df['Date'] = pd.to_datetime(df['Date']).dt.strftime('%Y-%m-%d')
+    df['Amount'] = pd.to_numeric(df['Amount']).round(2)
+    df.to_csv(str(expected), index=False)
+
+    assert streamed.read_bytes() == expected.read_bytes()
+
+
+def test_quoting():
+    output = io.StringIO()
+    write_csv([{
+        'Date': parse_file(SAMPLE_FILE)[0]['Date'],
+        'Amount': -1234.5,
+        'Currency': 'PLN',
+        'Bank Reference': '',
+        'Description': 'a, "b"',
+    }], output)
+
+    assert output.getvalue().splitlines()[1] == '2025-02-28,-1234.5,PLN,,"a, ""b"""'
+
+
+def test_no_transactions_leaves_no_output(tmp_path):
+    source = tmp_path / 'empty.sta'
+    source.write_text(':20:250228\n')
+    target = tmp_path / 'empty.csv'
+
+    with pytest.raises(MT940ParseError):
+        convert_to_csv(str(source), str(target))
+    assert not target.exists()
@@ -0,0 +1,114 @@
+import io
+import os
+
+import pytest
+
+from mt940_columns import read_columns, read_mt940
+from mt940_csv import iter_csv_rows
+from mt940_encoding import ReplayReader, detect_encoding, detect_file_encoding, transcode
+from mt940_parser import iter_transactions, parse_file
+from mt940_scan import parse_file_mmap
+from mt940_synth import write_statements
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f.mt940')
+
+TEXT = 'Opłata za przelew krajowy, Miesięczny abonament, Śląsk, źródło, ŻÓŁW'
+
+
+def test_detects_polish_code_pages():
+    for encoding in ('cp852', 'cp1250', 'iso-8859-2', 'utf-8'):
+        assert detect_encoding(TEXT.encode(encoding)) == encoding
+    assert detect_encoding(b'plain ascii') == 'cp852'
+    # A sample cut inside a UTF-8 character
+    assert detect_encoding(TEXT.encode('utf-8')[:-1]) == 'utf-8'
+
+
+def test_sample_file_is_cp852():
+    assert detect_file_encoding(SAMPLE_FILE) == 'cp852'
+    descriptions = ' '.join(t['Description'] for t in parse_file(SAMPLE_FILE))
+
+    assert 'Miesięczny' in descriptions and 'powyżej' in descriptions
+    assert '©' not in descriptions and '¾' not in descriptions
+
+
+def test_transcode_leaves_decoded_text_alone():
+    assert transcode('Miesi\xa9czny', 'cp852') == 'Miesięczny'
+    assert transcode(TEXT, 'cp852') == TEXT
+    assert transcode('ascii', 'cp852') == 'ascii'
+
+
+@pytest.mark.parametrize('encoding', ['cp852', 'cp1250', 'utf-8'])
+def test_every_engine_decodes_every_code_page(tmp_path, encoding):
+    reference = io.BytesIO()
+    write_statements(reference, 300, statements=3, seed=5)
+    expected = list(iter_transactions(io.BytesIO(reference.getvalue()), encoding='cp852'))
+
+    path = tmp_path / f'{encoding}.sta'
+    with open(path, 'wb') as file:
+        write_statements(file, 300, statements=3, seed=5, encoding=encoding)
+
+    assert parse_file(str(path)) == expected
+    assert parse_file_mmap(str(path)) == expected
+    assert read_mt940(str(path))['Description'].tolist() == [t['Description'] for t in expected]
+
+
+def test_only_ascii_whitespace_is_stripped(tmp_path):
+    # 0xA0 is 'á' in CP852 and 0x85 'ů'; Unicode would strip both as spaces
+    data = (b':20:REF\r\n:25:PL1\r\n:60F:C250101PLN0,00\r\n'
+            b':61:2501020102D1,00NTRFREF//X\r\n:86:020\r\n<00ab\xa0\r\n<20\x85cd\r\n'
+            b':62F:D250102PLN1,00\r\n')
+    path = tmp_path / 'edge.sta'
+    path.write_bytes(data)
+
+    assert parse_file(str(path))[0]['Description'] == 'abá ůcd'
+    assert parse_file_mmap(str(path)) == parse_file(str(path))
+
+
+class Unbuffered:
+    """A stream with neither peek() nor seek(), like a socket reader"""
+
+    def __init__(self, data):
+        self.data = io.BytesIO(data)
+
+    def read(self, size=-1):
+        return self.data.read(min(size, 100) if size and size > 0 else size)
+
+    def readline(self, size=-1):
+        return self.data.readline(size)
+
+    def __iter__(self):
+        return iter(self.data.readline, b'')
+
+
+@pytest.mark.parametrize('encoding', ['cp1250', 'utf-8'])
+def test_streams_without_peek_are_detected(encoding):
+    cp852 = io.BytesIO()
+    write_statements(cp852, 300, statements=3, seed=5)
+    expected = list(iter_transactions(io.BytesIO(cp852.getvalue()), encoding='cp852'))
+    data = io.BytesIO()
+    write_statements(data, 300, statements=3, seed=5, encoding=encoding)
+
+    assert list(iter_transactions(io.BytesIO(data.getvalue()))) == expected
+    assert list(iter_transactions(Unbuffered(data.getvalue()))) == expected
+    assert [row[4] for row in iter_csv_rows(Unbuffered(data.getvalue()))] == [
+        t['Description'] for t in expected
+    ]
+    assert list(read_columns(io.BytesIO(data.getvalue())).descriptions) == [t['Description'] for t in expected]
+
+
+def test_replay_reader_rejoins_split_line():
+    stream = ReplayReader(b'first\nsec', io.BytesIO(b'ond\nthird\n'))
+
+    assert list(stream) == [b'first\n', b'second\n', b'third\n']
+    assert ReplayReader(b'ab', io.BytesIO(b'cd')).read() == b'abcd'
+
+
+def test_replay_reader_readline_honours_size():
+    stream = ReplayReader(b'first\nsec', io.BytesIO(b'ond\nthird\n'))
+
+    assert stream.readline(3) == b'fir'
+    assert stream.readline(0) == b''
+    assert stream.readline() == b'st\n'
+    assert stream.readline(5) == b'secon'
+    assert stream.readline(-1) == b'd\n'
+    assert stream.readline(2) == b'th'
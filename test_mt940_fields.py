@@ -0,0 +1,84 @@
+from datetime import datetime
+
+import pytest
+
+from mt940_fields import (
+    parse_minor_units, parse_subfields, subfield_details, tokenize_balance, tokenize_statement_line,
+)
+
+
+def test_tokenize_debit_with_entry_date():
+    fields = tokenize_statement_line(':61:2502280228DN20,00NERRNONREF//M0150PBT00043355')
+
+    assert fields.value_date == datetime(2025, 2, 28)
+    assert fields.entry_date == datetime(2025, 2, 28)
+    assert fields.mark == 'D'
+    assert fields.funds_code == 'N'
+    assert fields.amount_minor == -2000
+    assert fields.transaction_type == 'NERR'
+    assert fields.customer_reference == 'NONREF'
+    assert fields.bank_reference == 'M0150PBT00043355'
+
+
+def test_d_in_reference_does_not_flip_credit():
+    fields = tokenize_statement_line(':61:2502040204CN3475,00NTRFNONREF//ZBD0000001004729')
+
+    assert fields.mark == 'C'
+    assert fields.amount_minor == 347500
+    assert fields.bank_reference == 'ZBD0000001004729'
+
+
+def test_reversal_without_entry_date_or_funds_code():
+    fields = tokenize_statement_line(':61:250103RC1,5NMSCREF123')
+
+    assert fields.entry_date is None
+    assert fields.mark == 'RC'
+    assert fields.funds_code == ''
+    assert fields.amount_minor == -150
+    assert fields.transaction_type == 'NMSC'
+    assert fields.customer_reference == 'REF123'
+    assert fields.bank_reference == ''
+
+
+def test_entry_date_across_year_end():
+    fields = tokenize_statement_line(':61:2501021231D5,00NTRFNONREF')
+
+    assert fields.entry_date == datetime(2024, 12, 31)
+
+
+def test_invalid_mark():
+    with pytest.raises(ValueError):
+        tokenize_statement_line(':61:250228X20,00NTRF')
+
+
+def test_parse_minor_units():
+    assert parse_minor_units('20,') == 2000
+    assert parse_minor_units('3,6') == 360
+    assert parse_minor_units('0,005') == 1
+
+
+def test_tokenize_balance():
+    balance = tokenize_balance(':60F:C250201PLN2846,28')
+
+    assert balance.mark == 'C'
+    assert balance.date == datetime(2025, 2, 1)
+    assert balance.currency == 'PLN'
+    assert balance.amount_minor == 284628
+    assert tokenize_balance(':64:D250228PLN0,10').amount_minor == -10
+
+
+def test_parse_subfields():
+    block = ('2400<00PRZELEW<10<20Zwrot z podatku<21 VAT<3010100071<312222524296213600'
+             '<32URZAD SKARBOWY KRAKOW-STARE<33 MIASTO<3885101000712222524296213600'
+             '<61NONREF<63REFZBD0000001004729')
+
+    subfields = parse_subfields(block)
+
+    assert subfields[''] == '2400'
+    assert subfields['20'] == 'Zwrot z podatku'
+    assert subfields['10'] == ''
+    assert subfield_details(subfields) == (
+        '2400', '10100071', '2222524296213600', 'URZAD SKARBOWY KRAKOW-STARE MIASTO',
+        '85101000712222524296213600', 'ZBD0000001004729',
+    )
+    assert subfield_details({}) == ('',) * 6
@@ -0,0 +1,58 @@
+import os
+from decimal import Decimal
+
+import pytest
+
+from mt940_parquet import convert_to_parquet
+from mt940_parser import MT940ParseError, parse_file
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f.mt940')
+
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+def test_parquet_matches_parser(tmp_path, use_mmap):
+    output = str(tmp_path / 'f.parquet')
+
+    count = convert_to_parquet(SAMPLE_FILE, output, row_group_rows=10, use_mmap=use_mmap)
+
+    expected = parse_file(SAMPLE_FILE)
+    assert count == len(expected) == 39
+    assert pq.ParquetFile(output).metadata.num_row_groups == 4
+    table = pq.read_table(output)
+    assert str(table.schema.field('Amount').type) == 'decimal128(18, 2)'
+    for row, transaction in zip(table.to_pylist(), expected):
+        assert row['Date'] == transaction['Date'].date()
+        assert row['Amount'] == Decimal(f"{transaction['Amount']:.2f}")
+        assert row['Currency'] == transaction['Currency']
+        assert row['Bank Reference'] == transaction['Bank Reference']
+        assert row['Description'] == transaction['Description']
+
+
+def test_failed_export_removes_output(tmp_path):
+    output = tmp_path / 'f.parquet'
+
+    def cancel(consumed):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        convert_to_parquet(SAMPLE_FILE, str(output), progress=cancel)
+    assert not output.exists()
+
+    empty = tmp_path / 'empty.sta'
+    empty.write_text(':20:250228\n')
+    with pytest.raises(MT940ParseError):
+        convert_to_parquet(str(empty), str(output))
+    assert not output.exists()
+
+
+def test_parquet_detail_columns(tmp_path):
+    output = str(tmp_path / 'f.parquet')
+
+    convert_to_parquet(SAMPLE_FILE, output, details=True)
+
+    table = pq.read_table(output, columns=['Amount', 'Counterparty IBAN', 'End-to-End Reference'])
+    expected = parse_file(SAMPLE_FILE, subfields=True)
+    assert table.column('Counterparty IBAN').to_pylist() == [t['Counterparty IBAN'] for t in expected]
+    assert table.column('End-to-End Reference').to_pylist() == [t['End-to-End Reference'] for t in expected]
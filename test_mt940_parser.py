@@ -0,0 +1,76 @@
+import io
+import os
+
+import pytest
+
+from mt940_parser import MT940ParseError, iter_transactions, parse_file
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f.mt940')
+
+SAMPLE = """:20:250228
+:25:PL63124026561111001135907105
+:28C:2
+:60F:C250201PLN2846,28
+:61:2502280228DN20,00NERRNONREF//M0150PBT00043355
+PROWIZJE AUT.
+:86:8300<00PROWIZJE AUT.<10
+<20Abonament
+<21za 03.2025
+<3012402092<311362991111000000
+:61:2502260226CN97812,95NTRFNONREF//001252Q685000268
+PRZELEW
+:86:2400<00PRZELEW<10
+<20Wymiana walut
+"""
+
+
+def test_iter_transactions_text_stream():
+    transactions = list(iter_transactions(io.StringIO(SAMPLE)))
+
+    assert len(transactions) == 2
+    first, second = transactions
+    assert first['Date'].strftime('%Y-%m-%d') == '2025-02-28'
+    assert first['Amount'] == -20.0
+    assert first['Currency'] == 'PLN'
+    assert first['Bank Reference'] == 'M0150PBT00043355'
+    assert first['Description'] == 'PROWIZJE AUT. Abonament za 03.2025'
+    assert second['Amount'] == 97812.95
+    assert second['Bank Reference'] == '001252Q685000268'
+
+
+def test_iter_transactions_binary_stream_matches_text():
+    text = list(iter_transactions(io.StringIO(SAMPLE)))
+    binary = list(iter_transactions(io.BytesIO(SAMPLE.encode('iso-8859-1'))))
+
+    assert text == binary
+
+
+def test_iter_transactions_is_lazy():
+    stream = io.StringIO(SAMPLE)
+    transactions = iter_transactions(stream)
+
+    next(transactions)
+    # The first transaction is complete once the second :61: is seen
+    assert stream.tell() < len(SAMPLE)
+
+
+def test_statement_fields_end_description():
+    text = SAMPLE + ":62F:C250228PLN0,00\n:64:C250228PLN0,00\n-\n:20:250301\n:60F:C250301EUR1,00\n"
+    transactions = list(iter_transactions(io.StringIO(text)))
+
+    assert transactions[-1]['Description'] == 'PRZELEW Wymiana walut'
+
+
+def test_parse_file_sample():
+    transactions = parse_file(SAMPLE_FILE)
+
+    assert len(transactions) == 39
+    assert all(t['Currency'] == 'PLN' for t in transactions)
+
+
+def test_parse_file_without_transactions(tmp_path):
+    path = tmp_path / 'empty.sta'
+    path.write_text(':20:250228\n:25:PL63124026561111001135907105\n')
+
+    with pytest.raises(MT940ParseError):
+        parse_file(str(path))
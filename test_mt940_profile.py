@@ -0,0 +1,81 @@
+import json
+import os
+import tracemalloc
+
+from mt940_cli import main
+from mt940_csv import convert_to_csv
+from mt940_parser import parse_file
+from mt940_profile import Profile, format_report
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f.mt940')
+
+
+def test_profiled_parse_matches_plain_parse():
+    reports = []
+    with Profile(trace_memory=True, callback=reports.append) as profile:
+        transactions = parse_file(SAMPLE_FILE, profile=profile)
+
+    assert transactions == parse_file(SAMPLE_FILE)
+    report, = reports
+    assert report['counters']['transactions'] == 39
+    assert report['counters']['bytes'] == os.path.getsize(SAMPLE_FILE)
+    assert report['stages']['tokenize']['calls'] == 39
+    assert {'read', 'fields', 'describe', 'emit'} <= set(report['stages'])
+    assert report['peak_memory_bytes'] > 0
+    assert report['wall_seconds'] >= sum(s['seconds'] for s in report['stages'].values())
+    assert '39 tx' in format_report(report)
+
+
+def test_profiled_csv_matches_plain_csv(tmp_path):
+    plain = tmp_path / 'plain.csv'
+    convert_to_csv(SAMPLE_FILE, str(plain))
+    for use_mmap in (False, True):
+        profiled = tmp_path / f'profiled-{use_mmap}.csv'
+        with Profile() as profile:
+            convert_to_csv(SAMPLE_FILE, str(profiled), use_mmap, profile)
+        report = profile.report()
+
+        assert profiled.read_bytes() == plain.read_bytes()
+        assert report['counters']['transactions'] == 39
+        assert report['stages']['emit']['calls'] >= 39
+        assert 'write' in report['stages']
+        assert report['peak_memory_bytes'] is None
+
+
+def test_cli_writes_profile_report(tmp_path):
+    report_path = tmp_path / 'profile.json'
+
+    assert main([SAMPLE_FILE, '-o', str(tmp_path / 'out'), '-j', '1', '-f',
+                 '--profile', str(report_path)]) == 0
+
+    report = json.loads(report_path.read_text())
+    entry, = report['files']
+    assert entry['status'] == 'converted'
+    assert entry['profile']['counters']['lines'] > 39
+
+
+def test_cli_profiles_bounded_conversion(tmp_path):
+    report_path = tmp_path / 'profile.json'
+
+    assert main([SAMPLE_FILE, '-o', str(tmp_path / 'out'), '-j', '1', '-f',
+                 '--memory-budget', '1', '--profile', str(report_path)]) == 0
+
+    profile = json.loads(report_path.read_text())['files'][0]['profile']
+    assert profile['counters']['transactions'] == 39
+    assert profile['counters']['bytes'] == os.path.getsize(SAMPLE_FILE)
+    assert {'read', 'tokenize', 'write'} <= set(profile['stages'])
+
+
+def test_stop_releases_tracing_without_callback():
+    reports = []
+    profile = Profile(trace_memory=True, callback=reports.append).start()
+    assert tracemalloc.is_tracing()
+
+    report = profile.stop()
+
+    assert not tracemalloc.is_tracing()
+    assert reports == [] and report['wall_seconds'] is not None
+    # The next profile owns tracing again
+    with Profile(trace_memory=True) as second:
+        assert second.owns_tracing
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,61 @@
+import os
+
+from mt940_reconcile import StatementLedger, main, parse_sequence, reconcile
+from mt940_synth import generate_file
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f.mt940')
+
+
+def test_sample_reconciles():
+    ledger = StatementLedger()
+    ledger.add_file(SAMPLE_FILE)
+
+    assert reconcile(ledger) == []
+    assert ledger.statements[0].available.amount_minor == 0
+
+
+def test_parse_sequence():
+    assert parse_sequence('2') == (2, 1)
+    assert parse_sequence('12/3') == (12, 3)
+    assert parse_sequence('') is None
+    assert parse_sequence('x') is None
+
+
+def test_balance_and_sequence_issues(tmp_path):
+    first, second = tmp_path / 'a.sta', tmp_path / 'b.sta'
+    generate_file(str(first), 20, statements=4, accounts=1)
+    data = first.read_bytes()
+    # Tamper with the third statement's closing balance, and load the
+    # file twice under another name so every :28C: repeats
+    start = data.index(b':62F:', data.index(b':28C:3'))
+    end = data.index(b'\r\n', start)
+    first.write_bytes(data[:start] + b':62F:C250104PLN1,00' + data[end:])
+    second.write_bytes(data.replace(b':28C:4', b':28C:6'))
+
+    ledger = StatementLedger()
+    ledger.add_file(str(first))
+    ledger.add_file(str(second))
+    issues = reconcile(ledger)
+
+    balance = [i for i in issues if i.kind == 'balance']
+    assert [(i.source, i.sequence) for i in balance] == [(str(first), '3')]
+    assert 'off by' in balance[0].detail
+    duplicates = {(i.source, i.sequence) for i in issues if i.kind == 'duplicate sequence'}
+    assert duplicates == {(str(second), '1'), (str(second), '2'), (str(second), '3')}
+    gaps = [(i.source, i.sequence) for i in issues if i.kind == 'sequence gap']
+    assert gaps == [(str(second), '6')]
+
+
+def test_main_exit_code(tmp_path, capsys):
+    assert main([SAMPLE_FILE]) == 0
+    assert '0 issues' in capsys.readouterr().out
+
+
+def test_unreadable_file_is_an_issue(tmp_path, capsys):
+    missing = str(tmp_path / 'missing.sta')
+
+    assert main([missing, SAMPLE_FILE]) == 1
+
+    out = capsys.readouterr().out
+    assert f"{missing}: unreadable - Error parsing MT940 file" in out
+    assert out.splitlines()[-1] == "1 statements, 39 transactions, 1 issues"
@@ -0,0 +1,50 @@
+import io
+import os
+
+from mt940_csv import convert_to_csv
+from mt940_parser import MT940Parser, iter_transactions, parse_file
+from mt940_scan import iter_transactions_mmap, parse_file_mmap, scan_buffer
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f.mt940')
+
+
+def test_mmap_scan_matches_line_parser():
+    assert parse_file_mmap(SAMPLE_FILE) == parse_file(SAMPLE_FILE)
+
+
+def test_mmap_subfields_match_line_parser():
+    parser = MT940Parser()
+    parser.keep_subfields = True
+
+    scanned = list(iter_transactions_mmap(SAMPLE_FILE, parser))
+
+    assert scanned == parse_file(SAMPLE_FILE, subfields=True)
+    assert scanned[-1]['Counterparty IBAN'] == '35102028922178000000002274'
+
+
+def test_edge_cases_match_line_parser():
+    data = (
+        b":61:2501010101CN1,00NTRF//X\r\n"
+        b"  \r\n"
+        b"  <20kept \xa0\n"
+        b"<30dropped\n"
+        b":86:skipped\n"
+        b"free text\n"
+        b":60F:C250101EUR1,00\n"
+        b":61:2501020102DN5,00NTRF"
+    )
+
+    scanned = list(scan_buffer(data))
+
+    assert scanned == list(iter_transactions(io.BytesIO(data)))
+    assert [t['Currency'] for t in scanned] == ['Unknown', 'EUR']
+
+
+def test_mmap_csv_matches_line_csv(tmp_path):
+    lines_csv = tmp_path / 'lines.csv'
+    mmap_csv = tmp_path / 'mmap.csv'
+
+    convert_to_csv(SAMPLE_FILE, str(lines_csv))
+    convert_to_csv(SAMPLE_FILE, str(mmap_csv), use_mmap=True)
+
+    assert lines_csv.read_bytes() == mmap_csv.read_bytes()
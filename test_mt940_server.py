@@ -0,0 +1,132 @@
+import csv
+import http.client
+import io
+import json
+import os
+import socket
+import threading
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from mt940_csv import convert_to_csv
+from mt940_load import run_load
+from mt940_parser import COLUMNS
+from mt940_server import ConversionServer
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f.mt940')
+
+with open(SAMPLE_FILE, 'rb') as sample:
+    SAMPLE = sample.read()
+
+
+@pytest.fixture(scope='module')
+def server():
+    server = ConversionServer(('127.0.0.1', 0), jobs=2, max_queue=8)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(server, method, path, body=None):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=30)
+    try:
+        connection.request(method, path, body=body)
+        response = connection.getresponse()
+        return response.status, response.getheader('Transfer-Encoding'), response.read()
+    finally:
+        connection.close()
+
+
+def test_csv_rows_match_converter(server, tmp_path):
+    expected = tmp_path / 'expected.csv'
+    convert_to_csv(SAMPLE_FILE, str(expected))
+
+    status, encoding, body = request(server, 'POST', '/convert', SAMPLE)
+
+    assert status == 200 and encoding == 'chunked'
+    with open(expected, newline='', encoding='utf-8') as file:
+        assert list(csv.reader(io.StringIO(body.decode('utf-8')))) == list(csv.reader(file))
+
+
+def test_json_lines(server):
+    status, _, body = request(server, 'POST', '/convert?format=json', SAMPLE)
+    rows = [json.loads(line) for line in body.decode('utf-8').splitlines()]
+
+    assert status == 200
+    assert len(rows) == 39 and list(rows[-1]) == list(COLUMNS)
+    assert rows[-1]['Amount'] == -984.0 and rows[-1]['Date'] == '2025-02-03'
+
+
+def test_bad_requests(server):
+    assert request(server, 'POST', '/convert', b'not a statement\n')[0] == 422
+    assert request(server, 'POST', '/convert?format=xml', SAMPLE)[0] == 400
+    assert request(server, 'GET', '/nothing')[0] == 404
+
+
+def test_full_queue_is_refused(server):
+    server.metrics.pending_batches += 100
+    try:
+        assert request(server, 'POST', '/convert', SAMPLE)[0] == 503
+    finally:
+        server.metrics.pending_batches -= 100
+
+
+def test_full_queue_refuses_before_reading_upload(server):
+    server.metrics.pending_batches += 100
+    try:
+        with socket.create_connection(server.server_address, timeout=10) as client:
+            # Announce a large upload but send none of it
+            client.sendall(b"POST /convert HTTP/1.1\r\nHost: localhost\r\n"
+                           b"Content-Length: %d\r\n\r\n" % (512 * 1024 * 1024))
+            received = client.recv(65536)
+    finally:
+        server.metrics.pending_batches -= 100
+
+    assert received.startswith(b'HTTP/1.1 503')
+    assert b'Connection: close' in received
+
+
+def test_load_client_and_metrics(server):
+    url = 'http://%s:%d' % server.server_address
+    summary = run_load(url, SAMPLE, requests=6, concurrency=3)
+
+    assert summary['statuses'] == {'200': 6} and not summary['errors']
+    metrics = summary['server']
+    # Counted as soon as they arrive; this /metrics request is one of them
+    assert metrics['requests'] >= 7 and metrics['in_flight'] >= 1
+    assert metrics['queue_depth'] == 0
+    assert metrics['latency_seconds']['p50'] > 0
+
+
+def test_refused_upload_closes_connection(server):
+    # The unread body must not be parsed as a second request
+    smuggled = b"GET /health HTTP/1.1\r\nHost: localhost\r\n\r\n"
+    with socket.create_connection(server.server_address, timeout=30) as client:
+        client.sendall(b"POST /convert?format=xml HTTP/1.1\r\nHost: localhost\r\n"
+                       b"Content-Length: %d\r\n\r\n" % len(smuggled) + smuggled)
+        received = b''
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            received += chunk
+
+    assert received.count(b'HTTP/1.1 ') == 1
+    assert received.startswith(b'HTTP/1.1 400')
+
+
+def test_broken_pool_gets_json_error(server, monkeypatch):
+    def submit(*args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return [future]
+
+    monkeypatch.setattr(server, 'submit', submit)
+    status, _, body = request(server, 'POST', '/convert', SAMPLE)
+
+    assert status == 500
+    assert 'worker died' in json.loads(body)['error']
@@ -0,0 +1,97 @@
+import os
+import shutil
+
+import pytest
+
+from mt940_parser import MT940ParseError, parse_file
+from mt940_sqlite import connect, export_to_sqlite, import_file
+from mt940_synth import generate_file
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f.mt940')
+
+
+def test_export_matches_parser(tmp_path):
+    db_path = str(tmp_path / 'statements.db')
+
+    result = export_to_sqlite(SAMPLE_FILE, db_path)
+
+    assert result == {'status': 'imported', 'transactions': 39, 'duplicate_statements': 0}
+    connection = connect(db_path)
+    assert connection.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    rows = connection.execute(
+        'SELECT date, amount, currency, bank_reference, description, account, sequence '
+        'FROM transaction_rows ORDER BY rowid'
+    ).fetchall()
+    expected = parse_file(SAMPLE_FILE)
+    assert [(r[0], r[1], r[3]) for r in rows] == [
+        (t['Date'].strftime('%Y-%m-%d'), t['Amount'], t['Bank Reference']) for t in expected
+    ]
+    assert rows[0][5:] == ('PL63124026561111001135907105', '2')
+    statement = connection.execute(
+        'SELECT reference, currency, opening_minor, closing_minor FROM statements'
+    ).fetchone()
+    assert statement == ('250228', 'PLN', 284628, 0)
+
+
+def test_lookup_by_counterparty_iban(tmp_path):
+    db_path = str(tmp_path / 'statements.db')
+    export_to_sqlite(SAMPLE_FILE, db_path)
+    connection = connect(db_path)
+
+    rows = connection.execute(
+        'SELECT amount, end_to_end_reference FROM transaction_rows WHERE counterparty_iban = ?',
+        ('35102028922178000000002274',),
+    ).fetchall()
+    plan = connection.execute(
+        'EXPLAIN QUERY PLAN SELECT id FROM transactions WHERE counterparty_iban = ?', ('x',)
+    ).fetchall()
+
+    assert rows == [(-984.0, '3560203608902792')]
+    assert 'transactions_iban' in plan[0][-1]
+
+
+def test_reimport_is_idempotent(tmp_path):
+    db_path = str(tmp_path / 'statements.db')
+    source = tmp_path / 'a.sta'
+    generate_file(str(source), 30, statements=3)
+    # Same statements in a file with different bytes
+    copy = tmp_path / 'b.sta'
+    shutil.copy(source, copy)
+    with open(copy, 'ab') as file:
+        file.write(b'\r\n')
+
+    connection = connect(db_path)
+    first = import_file(connection, str(source))
+    again = import_file(connection, str(source))
+    other = import_file(connection, str(copy))
+
+    assert first['transactions'] == 30
+    assert again['status'] == 'skipped'
+    assert other == {'status': 'imported', 'transactions': 0, 'duplicate_statements': 3}
+    assert connection.execute('SELECT COUNT(*) FROM transactions').fetchone()[0] == 30
+
+
+def test_statement_without_account_or_sequence_is_not_duplicated(tmp_path):
+    with open(SAMPLE_FILE, 'rb') as file:
+        data = file.read()
+    data = data.replace(b':25:PL63124026561111001135907105\r\n', b'').replace(b':28C:2\r\n', b'')
+    source, copy = tmp_path / 'a.sta', tmp_path / 'b.sta'
+    source.write_bytes(data)
+    copy.write_bytes(data + b'\r\n')
+
+    connection = connect(str(tmp_path / 'statements.db'))
+    import_file(connection, str(source))
+    other = import_file(connection, str(copy))
+
+    assert other == {'status': 'imported', 'transactions': 0, 'duplicate_statements': 1}
+    assert connection.execute('SELECT COUNT(*) FROM transactions').fetchone()[0] == 39
+
+
+def test_empty_file_leaves_no_record(tmp_path):
+    db_path = str(tmp_path / 'statements.db')
+    empty = tmp_path / 'empty.sta'
+    empty.write_text(':20:250228\n:25:PL63124026561111001135907105\n')
+
+    with pytest.raises(MT940ParseError):
+        export_to_sqlite(str(empty), db_path)
+    assert connect(db_path).execute('SELECT COUNT(*) FROM files').fetchone()[0] == 0
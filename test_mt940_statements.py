@@ -0,0 +1,57 @@
+import os
+
+import mt940_statements
+from mt940_parser import parse_file
+from mt940_statements import index_statements, parse_file_parallel, parse_statements
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f.mt940')
+
+EUR_STATEMENT = b"""{1:F01XXXX}
+:20:250301
+:25:PL11111111111111111111111111
+:28C:7
+:60F:C250301EUR100,00
+:61:2503010301DN1,50NTRFNONREF//EUR0000000000001
+OPLATA
+:86:020<00OPLATA
+<20fee
+:62F:C250301EUR98,50
+-
+"""
+
+
+def write_multi(tmp_path):
+    path = tmp_path / 'multi.sta'
+    with open(SAMPLE_FILE, 'rb') as file:
+        sample = file.read()
+    path.write_bytes(EUR_STATEMENT + sample + sample)
+    return str(path)
+
+
+def test_index_statements(tmp_path):
+    ranges = index_statements(write_multi(tmp_path))
+
+    assert len(ranges) == 3
+    # The envelope before the first :20: belongs to the first statement
+    assert ranges[0][0] == 0
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+
+
+def test_statements_keep_their_own_header_and_currency(tmp_path):
+    statements = parse_statements(write_multi(tmp_path), jobs=1)
+
+    first, second, third = statements
+    assert first.statement.account == 'PL11111111111111111111111111'
+    assert first.statement.sequence == '7'
+    assert first.statement.currency == 'EUR'
+    assert [t['Currency'] for t in first.transactions] == ['EUR']
+    assert first.transactions[0]['Description'] == 'OPLATA fee'
+    assert second.statement.currency == 'PLN'
+    assert len(second.transactions) == len(third.transactions) == 39
+
+
+def test_parallel_matches_serial(tmp_path, monkeypatch):
+    path = write_multi(tmp_path)
+    monkeypatch.setattr(mt940_statements, 'BATCH_BYTES', 1)
+
+    assert parse_file_parallel(path, jobs=2) == parse_file(path)
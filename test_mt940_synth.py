@@ -0,0 +1,64 @@
+import io
+
+from mt940_parser import MT940Parser, parse_file
+from mt940_synth import generate_file, write_statements
+
+
+class BalanceParser(MT940Parser):
+    """Collects statements so their balances can be checked"""
+
+    def __init__(self):
+        super().__init__()
+        self.statements = []
+        self.sums = []
+
+    def new_statement(self, reference):
+        statement = super().new_statement(reference)
+        self.statements.append(statement)
+        self.sums.append(0)
+        return statement
+
+    def make_transaction(self, fields, statement, description):
+        self.sums[-1] += fields.amount_minor
+        return super().make_transaction(fields, statement, description)
+
+
+def test_same_seed_same_file():
+    first, second, other = io.BytesIO(), io.BytesIO(), io.BytesIO()
+    write_statements(first, 50, seed=7)
+    write_statements(second, 50, seed=7)
+    write_statements(other, 50, seed=8)
+
+    assert first.getvalue() == second.getvalue()
+    assert first.getvalue() != other.getvalue()
+    assert b'\r\n' in first.getvalue()
+
+
+def test_generated_file_parses(tmp_path):
+    path = tmp_path / 'synthetic.sta'
+    size = generate_file(str(path), 101, statements=3, long_descriptions=True)
+
+    transactions = parse_file(str(path))
+
+    assert size == path.stat().st_size
+    assert len(transactions) == 101
+    kinds = {t['Bank Reference'].startswith('M0150PB') for t in transactions}
+    assert kinds == {True, False}  # both NERR fees and NTRF transfers
+
+
+def test_balances_reconcile_and_sequences_continue():
+    buffer = io.BytesIO()
+    write_statements(buffer, 60, statements=4, accounts=2, seed=3)
+
+    parser = BalanceParser()
+    for line in buffer.getvalue().decode('iso-8859-1').splitlines():
+        parser.feed(line)
+    parser.close()
+
+    assert len(parser.statements) == 4
+    for statement, total in zip(parser.statements, parser.sums):
+        assert statement.opening.amount_minor + total == statement.closing.amount_minor
+    first, second = parser.statements[0], parser.statements[2]
+    assert first.account == second.account
+    assert (first.sequence, second.sequence) == ('1', '2')
+    assert first.closing.amount_minor == second.opening.amount_minor
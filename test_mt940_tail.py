@@ -0,0 +1,82 @@
+import os
+import random
+
+from mt940_parser import parse_file
+from mt940_tail import Checkpoint, close_checkpoint, read_appended
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f.mt940')
+
+
+def read_sample():
+    with open(SAMPLE_FILE, 'rb') as file:
+        return file.read()
+
+
+def test_appends_at_arbitrary_offsets_match_full_parse(tmp_path):
+    data = read_sample()
+    path = tmp_path / 'growing.sta'
+    path.write_bytes(b'')
+    cuts = sorted(random.Random(940).sample(range(1, len(data)), 25)) + [len(data)]
+
+    transactions = []
+    checkpoint = None
+    written = 0
+    for cut in cuts:
+        with open(path, 'ab') as file:
+            file.write(data[written:cut])
+        written = cut
+        new, checkpoint = read_appended(str(path), checkpoint)
+        transactions.extend(new)
+    transactions.extend(close_checkpoint(checkpoint))
+
+    assert transactions == parse_file(SAMPLE_FILE)
+
+
+def test_only_new_bytes_are_read(tmp_path):
+    data = read_sample()
+    path = tmp_path / 'growing.sta'
+    path.write_bytes(data)
+
+    first, checkpoint = read_appended(str(path))
+    offset = checkpoint.offset
+    again, checkpoint = read_appended(str(path), checkpoint)
+
+    assert len(first) == 39
+    assert again == []
+    assert checkpoint.offset == offset
+
+
+def test_checkpoint_round_trip_and_rewrite(tmp_path):
+    data = read_sample()
+    path = tmp_path / 'growing.sta'
+    path.write_bytes(data)
+    checkpoint_path = str(tmp_path / 'tail.ckpt')
+
+    _, checkpoint = read_appended(str(path))
+    checkpoint.save(checkpoint_path)
+    restored = Checkpoint.load(checkpoint_path)
+    assert restored.offset == checkpoint.offset
+
+    # A rotated file no longer matches and is parsed from the start
+    path.write_bytes(data.replace(b'PROWIZJE', b'PROVISION'))
+    transactions, _ = read_appended(str(path), restored)
+    assert len(transactions) == 39
+    assert transactions[0]['Description'].startswith('PROVISION')
+
+
+def test_code_page_waits_for_non_ascii(tmp_path):
+    # The header arrives first and is plain ASCII; Windows-1250 text follows
+    header = b':20:REF\r\n:25:PL1\r\n:28C:1\r\n:60F:C250101PLN0,00\r\n'
+    body = (':61:2501020102D1,00NTRFREF//X\r\n:86:020\r\n<00Opłata za przelew, miesiąc\r\n'
+            ':62F:D250102PLN1,00\r\n').encode('cp1250')
+    path = tmp_path / 'growing.sta'
+    path.write_bytes(header)
+
+    first, checkpoint = read_appended(str(path))
+    assert first == [] and checkpoint.parser.text_encoding is None
+    with open(path, 'ab') as file:
+        file.write(body)
+    new, checkpoint = read_appended(str(path), checkpoint)
+
+    assert checkpoint.parser.text_encoding == 'cp1250'
+    assert [t['Description'] for t in new] == ['Opłata za przelew, miesiąc']
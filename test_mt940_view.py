@@ -0,0 +1,77 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from mt940_parser import COLUMNS, parse_file
+from mt940_view import TransactionView, parse_amount, parse_date
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f.mt940')
+
+
+@pytest.fixture(scope='module')
+def transactions():
+    return parse_file(SAMPLE_FILE)
+
+
+def test_every_column_sorts_like_sorted(transactions):
+    view = TransactionView(transactions)
+
+    for column in COLUMNS:
+        keys = [view.transactions[i][column] or '' for i in view.sort(column)]
+        assert keys == sorted(t[column] or '' for t in transactions)
+        descending = [view.transactions[i][column] or '' for i in view.sort(column, descending=True)]
+        assert descending == keys[::-1]
+
+    assert list(view.sort(None)) == list(range(len(transactions)))
+
+
+def test_descending_sort_keeps_file_order_of_ties(transactions):
+    view = TransactionView(transactions)
+
+    for column in COLUMNS:
+        # sorted(reverse=True) is stable: equal keys stay in file order
+        expected = sorted(range(len(transactions)), key=lambda i: transactions[i][column] or '', reverse=True)
+        assert list(view.sort(column, descending=True)) == expected
+
+
+def test_range_filter_keeps_sort_order(transactions):
+    view = TransactionView(transactions)
+    view.sort('Amount', descending=True)
+    order = view.filter(amount_min=parse_amount('-100'), amount_max=parse_amount('0,00'))
+
+    amounts = [transactions[i]['Amount'] for i in order]
+    assert amounts == sorted((t['Amount'] for t in transactions if -100 <= t['Amount'] <= 0), reverse=True)
+    assert len(view) == 9
+
+    # Sorting again keeps the filter; clearing it brings every row back
+    view.sort('Date')
+    assert len(view) == 9
+    assert len(view.filter()) == len(transactions)
+
+
+def test_date_filter_is_inclusive(transactions):
+    view = TransactionView(transactions)
+    last = transactions[-1]['Date']
+
+    order = view.filter(date_from=last, date_to=last)
+    assert [transactions[i] for i in order] == [t for t in transactions if t['Date'] == last]
+    assert len(view.filter(date_from=datetime(2030, 1, 1))) == 0
+
+
+def test_unknown_column():
+    with pytest.raises(ValueError):
+        TransactionView([]).sort('Balance')
+
+
+def test_parse_bounds():
+    assert parse_amount('') is None
+    assert parse_amount('-1 234,5') == -123450
+    assert parse_amount('1,234.50') == 123450
+    assert parse_date(' 2025-02-03 ') == datetime(2025, 2, 3)
+    assert parse_date('') is None
+    for text in ('abc', 'inf', '-Infinity', 'NaN', '1e999999999'):
+        with pytest.raises(ValueError):
+            parse_amount(text)
+    with pytest.raises(ValueError):
+        parse_date('03.02.2025')
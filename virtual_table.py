@@ -0,0 +1,154 @@
+"""Virtualized table widget for very large transaction lists
+
+A ttk.Treeview slows down linearly with the number of items it holds and
+becomes unusable beyond a few tens of thousands of rows. VirtualTable keeps
+only as many Treeview items as fit on screen and re-fills them from the
+backing sequence as the scrollbar moves, so widget memory stays constant
+and loading a million rows costs nothing up front.
+"""
+import tkinter as tk
+from tkinter import ttk
+
+# Fallback geometry used before the first row has been drawn
+DEFAULT_ROW_HEIGHT = 20
+DEFAULT_HEADING_HEIGHT = 25
+
+
+class VirtualTable:
+    """Treeview front-end over any sequence of row tuples
+
+    rows only needs __len__ and __getitem__; values are fetched for the
+    visible window only, so formatting can happen lazily in the sequence.
+    """
+
+    def __init__(self, parent, columns):
+        self.frame = tk.Frame(parent)
+
+        y_scrollbar = ttk.Scrollbar(self.frame, command=self.yview)
+        y_scrollbar.pack(side='right', fill='y')
+
+        x_scrollbar = ttk.Scrollbar(self.frame, orient='horizontal')
+        x_scrollbar.pack(side='bottom', fill='x')
+
+        self.tree = ttk.Treeview(
+            self.frame,
+            columns=columns,
+            show='headings',
+            selectmode='browse',
+            xscrollcommand=x_scrollbar.set
+        )
+        x_scrollbar.config(command=self.tree.xview)
+        self.tree.pack(expand=True, fill='both')
+
+        self.y_scrollbar = y_scrollbar
+        self.rows = ()
+        self.top = 0
+        self.visible = 1
+        self.selected = None
+
+        self.tree.bind('<Configure>', self._on_configure)
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda event: self._scroll_by(-3))
+        self.tree.bind('<Button-5>', lambda event: self._scroll_by(3))
+        self.tree.bind('<Up>', lambda event: self._move_selection(-1))
+        self.tree.bind('<Down>', lambda event: self._move_selection(1))
+        self.tree.bind('<Prior>', lambda event: self._scroll_by(-self.visible))
+        self.tree.bind('<Next>', lambda event: self._scroll_by(self.visible))
+        self.tree.bind('<Home>', lambda event: self._scroll_to(0))
+        self.tree.bind('<End>', lambda event: self._scroll_to(len(self.rows)))
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def set_rows(self, rows):
+        """Replace the backing sequence and jump back to the top"""
+        self.rows = rows
+        self.top = 0
+        self.selected = None
+        self.refresh()
+
+    def clear(self):
+        self.set_rows(())
+
+    def yview(self, *args):
+        """Scrollbar command: 'moveto fraction' or 'scroll n units|pages'"""
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self._scroll_to(int(float(args[1]) * len(self.rows)))
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= self.visible
+            self._scroll_by(step)
+
+    def refresh(self):
+        """Re-fill the visible window from the backing rows"""
+        total = len(self.rows)
+        self.top = max(0, min(self.top, total - self.visible))
+        count = min(self.visible, total - self.top)
+
+        # Grow or shrink the pool of Treeview items to the window size
+        items = self.tree.get_children()
+        for slot in range(len(items), count):
+            self.tree.insert('', 'end', iid=str(slot))
+        if len(items) > count:
+            self.tree.delete(*items[count:])
+
+        for slot in range(count):
+            self.tree.item(str(slot), values=self.rows[self.top + slot])
+
+        # Keep the selection attached to the data row, not the slot
+        slot = None if self.selected is None else self.selected - self.top
+        if slot is not None and 0 <= slot < count:
+            self.tree.selection_set(str(slot))
+        else:
+            self.tree.selection_set(())
+
+        if total:
+            self.y_scrollbar.set(self.top / total, (self.top + count) / total)
+        else:
+            self.y_scrollbar.set(0, 1)
+
+    def _scroll_to(self, top):
+        self.top = top
+        self.refresh()
+        return 'break'
+
+    def _scroll_by(self, step):
+        return self._scroll_to(self.top + step)
+
+    def _move_selection(self, step):
+        if self.selected is None:
+            self.selected = self.top
+        else:
+            self.selected = max(0, min(self.selected + step, len(self.rows) - 1))
+        if self.selected < self.top:
+            self.top = self.selected
+        elif self.selected >= self.top + self.visible:
+            self.top = self.selected - self.visible + 1
+        self.refresh()
+        return 'break'
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120, macOS reports small deltas
+        delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self._scroll_by(-delta * 3)
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if selection:
+            self.selected = self.top + int(selection[0])
+
+    def _on_configure(self, event):
+        heading_height = DEFAULT_HEADING_HEIGHT
+        row_height = DEFAULT_ROW_HEIGHT
+        bbox = self.tree.bbox('0') if self.tree.exists('0') else None
+        if bbox:
+            heading_height, row_height = bbox[1], bbox[3]
+
+        visible = max(1, (event.height - heading_height) // row_height)
+        if visible != self.visible:
+            self.visible = visible
+            self.refresh()